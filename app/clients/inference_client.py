@@ -1,14 +1,15 @@
 import json
 import logging
 from io import BytesIO
-from typing import List
+from typing import Dict, List, Optional
 from zipfile import ZipFile
 
 import httpx
 from PIL import Image
 
-from app.env import INFERENCE_API_URL
+from app.env import AESTHETIC_SCORE_MAX_SIZE, INFERENCE_API_URL
 from app.schemas.common_schemas import Box, GeneratedMask, MaskLabeledPoint
+from app.utils.image_utils import resize_image_to_max_size
 
 logger = logging.getLogger(__name__)
 
@@ -95,6 +96,78 @@ class InferenceClient:
 
         return masks
 
+    async def sam3_generate_masks_by_boxes(
+        self, image: Image.Image, boxes: List[Box]
+    ) -> List[Image.Image]:
+        """Generate one mask per box prompt, uploading the image only once."""
+        url = f"{self._api_url}/sam3/generate-mask/batch"
+
+        if not boxes:
+            raise ValueError("At least one box must be provided")
+
+        image_bytes = BytesIO()
+        image.save(image_bytes, format="PNG")
+        image_bytes.seek(0)
+
+        files = {"image": ("image.png", image_bytes, "image/png")}
+        data = {"boxes": json.dumps([box.model_dump() for box in boxes])}
+
+        response = await self._client.post(url, files=files, data=data)
+        response.raise_for_status()
+
+        # Read zip file from response (format: "<box_index>.png")
+        masks: List[Optional[Image.Image]] = [None] * len(boxes)
+        with ZipFile(BytesIO(response.content), "r") as zip_file:
+            for filename in zip_file.namelist():
+                index = int(filename.replace(".png", ""))
+                mask_data = zip_file.read(filename)
+                masks[index] = Image.open(BytesIO(mask_data)).convert("L")
+
+        if any(mask is None for mask in masks):
+            raise ValueError("Inference server returned fewer masks than boxes")
+
+        return masks
+
+    async def sam3_generate_masks_by_texts(
+        self, image: Image.Image, texts: List[str]
+    ) -> List[List[GeneratedMask]]:
+        """Generate masks for several text prompts, uploading the image only once.
+
+        Returns one list of masks per prompt, in the same order as `texts`.
+        """
+        url = f"{self._api_url}/sam3/generate-masks/batch"
+
+        if not texts:
+            raise ValueError("At least one text prompt must be provided")
+
+        image_bytes = BytesIO()
+        image.save(image_bytes, format="PNG")
+        image_bytes.seek(0)
+
+        files = {"image": ("image.png", image_bytes, "image/png")}
+        data = {"texts": json.dumps(texts)}
+
+        response = await self._client.post(url, files=files, data=data)
+        response.raise_for_status()
+
+        # Read zip file from response (format: "<prompt_index>/<score>.png")
+        grouped_masks: List[List[GeneratedMask]] = [[] for _ in texts]
+        with ZipFile(BytesIO(response.content), "r") as zip_file:
+            for filename in zip_file.namelist():
+                index_str, _, mask_name = filename.partition("/")
+                try:
+                    score = float(mask_name.replace(".png", ""))
+                except ValueError:
+                    score = 0.0
+
+                mask_data = zip_file.read(filename)
+                mask_image = Image.open(BytesIO(mask_data)).convert("L")
+                grouped_masks[int(index_str)].append(
+                    GeneratedMask(image=mask_image, score=score)
+                )
+
+        return grouped_masks
+
     async def object_clear_inpaint(
         self, image: Image.Image, mask: Image.Image, prompt: str
     ) -> Image.Image:
@@ -240,5 +313,32 @@ class InferenceClient:
         result_bytes = BytesIO(response.content)
         return Image.open(result_bytes).convert("RGB")
 
+    async def aesthetic_regressor_score(
+        self, image: Image.Image, timeout: float = 30.0
+    ) -> Dict[str, float]:
+        """
+        Predict the adjustments that would make an image most aesthetic.
+
+        The regressor only looks at global statistics, so it is sent a copy
+        downscaled to AESTHETIC_SCORE_MAX_SIZE.
+
+        Returns:
+            Adjustment in percent per filter, keyed by "brightness",
+            "saturation" and "contrast" (e.g. 6.64 means +6.64%)
+        """
+        url = f"{self._api_url}/aesthetic-regressor/score"
+
+        proxy_image = resize_image_to_max_size(image, AESTHETIC_SCORE_MAX_SIZE)
+        image_bytes = BytesIO()
+        proxy_image.convert("RGB").save(image_bytes, format="PNG")
+        image_bytes.seek(0)
+
+        files = {"image": ("image.png", image_bytes, "image/png")}
+
+        response = await self._client.post(url, files=files, timeout=timeout)
+        response.raise_for_status()
+
+        return {key: float(value) for key, value in response.json().items()}
+
 
 inference_client = InferenceClient(INFERENCE_API_URL)
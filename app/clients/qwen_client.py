@@ -0,0 +1,169 @@
+import asyncio
+import base64
+import logging
+import time
+from io import BytesIO
+from typing import Any, Dict, Optional
+
+import httpx
+from PIL import Image
+
+from app.env import (
+    DASHSCOPE_API_KEY,
+    DASHSCOPE_API_URL,
+    QWEN_POLL_INITIAL_INTERVAL,
+    QWEN_POLL_MAX_INTERVAL,
+    QWEN_TASK_TIMEOUT,
+)
+
+logger = logging.getLogger(__name__)
+
+QWEN_IMAGE_EDIT_MODEL = "qwen-image-edit"
+
+
+class QwenClient:
+    """Client of the DashScope Qwen image edit API.
+
+    One HTTP client is shared by all requests so connections are reused. When
+    the API answers with an asynchronous task, its status is polled at
+    intervals growing from `poll_initial_interval` to `poll_max_interval`, until
+    it finishes or `task_timeout` seconds have passed since the request.
+    """
+
+    def __init__(
+        self,
+        api_url: str,
+        api_key: Optional[str],
+        poll_initial_interval: float = QWEN_POLL_INITIAL_INTERVAL,
+        poll_max_interval: float = QWEN_POLL_MAX_INTERVAL,
+        task_timeout: float = QWEN_TASK_TIMEOUT,
+    ):
+        self._api_url = api_url.rstrip("/")
+        self._api_key = api_key.strip("\"'") if api_key else None
+        self._poll_initial_interval = poll_initial_interval
+        self._poll_max_interval = poll_max_interval
+        self._task_timeout = task_timeout
+        self._client = httpx.AsyncClient(timeout=300.0)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self._client.aclose()
+
+    async def close(self):
+        await self._client.aclose()
+
+    async def edit_image(self, image: Image.Image, text: str) -> Image.Image:
+        """Edit an image following a text instruction and return the RGB result."""
+        if not self._api_key:
+            raise ValueError("DASHSCOPE_API_KEY is not configured")
+
+        deadline = time.monotonic() + self._task_timeout
+        image_data_url = await asyncio.to_thread(_encode_jpeg_data_url, image)
+        payload = {
+            "model": QWEN_IMAGE_EDIT_MODEL,
+            "input": {
+                "messages": [
+                    {
+                        "role": "user",
+                        "content": [{"image": image_data_url}, {"text": text}],
+                    }
+                ]
+            },
+        }
+
+        url = f"{self._api_url}/services/aigc/multimodal-generation/generation"
+        response = await self._client.post(url, json=payload, headers=self._headers)
+        _raise_for_status(response, "Qwen API error")
+        result = response.json()
+
+        task_id = result.get("output", {}).get("task_id")
+        if task_id:
+            result = await self._wait_for_task(task_id, deadline)
+
+        output_url = _get_output_url(result)
+        logger.info(f"Qwen result image: {output_url}")
+        return await self._download_image(output_url)
+
+    @property
+    def _headers(self) -> Dict[str, str]:
+        return {
+            "Authorization": f"Bearer {self._api_key}",
+            "Content-Type": "application/json",
+        }
+
+    async def _wait_for_task(self, task_id: str, deadline: float) -> Dict[str, Any]:
+        url = f"{self._api_url}/tasks/{task_id}"
+        interval = self._poll_initial_interval
+
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise RuntimeError(
+                    f"Qwen task {task_id} did not finish in {self._task_timeout:g}s"
+                )
+            await asyncio.sleep(min(interval, remaining))
+            # Short tasks are noticed quickly, long ones are not polled needlessly
+            interval = min(interval * 1.5, self._poll_max_interval)
+
+            response = await self._client.get(url, headers=self._headers)
+            _raise_for_status(response, "Qwen task status check error")
+            result = response.json()
+
+            output = result.get("output", {})
+            task_status = output.get("task_status")
+            if task_status == "SUCCEEDED":
+                return result
+            if task_status in ["FAILED", "CANCELED"]:
+                raise RuntimeError(f"Qwen task {task_status}: {output.get('message')}")
+
+    async def _download_image(self, url: str) -> Image.Image:
+        buffer = BytesIO()
+        async with self._client.stream("GET", url) as response:
+            if response.is_error:
+                await response.aread()
+                _raise_for_status(response, "Failed to download Qwen result image")
+            async for chunk in response.aiter_bytes():
+                buffer.write(chunk)
+
+        buffer.seek(0)
+        return await asyncio.to_thread(lambda: Image.open(buffer).convert("RGB"))
+
+
+def _encode_jpeg_data_url(image: Image.Image) -> str:
+    buffer = BytesIO()
+    rgb_image = image.convert("RGB") if image.mode != "RGB" else image
+    rgb_image.save(buffer, format="JPEG", quality=85)
+    encoded = base64.b64encode(buffer.getvalue()).decode("utf-8")
+    return f"data:image/jpeg;base64,{encoded}"
+
+
+def _get_output_url(result: Dict[str, Any]) -> str:
+    output = result.get("output", {})
+
+    # Primary path: output.choices[0].message.content[i].image
+    # (actual response format from qwen-image-edit intl endpoint)
+    choices = output.get("choices", [])
+    if choices:
+        content = choices[0].get("message", {}).get("content", [])
+        if isinstance(content, list):
+            for item in content:
+                if "image" in item:
+                    return item["image"]
+
+    # Fallback path: output.results[0].url (older/async task format)
+    results = output.get("results", [])
+    if results and results[0].get("url"):
+        return results[0]["url"]
+
+    raise RuntimeError(f"Could not extract result image URL from Qwen response: {result}")
+
+
+def _raise_for_status(response: httpx.Response, message: str) -> None:
+    if response.is_error:
+        logger.error(f"{message}: {response.status_code} {response.text}")
+        raise RuntimeError(f"{message} (HTTP {response.status_code}): {response.text}")
+
+
+qwen_client = QwenClient(DASHSCOPE_API_URL, DASHSCOPE_API_KEY)
@@ -1,12 +1,53 @@
+import asyncio
+import hashlib
+import logging
+import secrets
+from pathlib import Path
+from typing import (
+    AsyncIterable,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    Optional,
+    Tuple,
+)
+
 import httpx
 
-from app.env import STORAGE_API_URL
+from app.env import (
+    STORAGE_API_URL,
+    STORAGE_CACHE_DIR,
+    STORAGE_CACHE_DISK_SIZE,
+    STORAGE_CACHE_MEMORY_SIZE,
+    STORAGE_COMPRESSION,
+    STORAGE_COMPRESSION_LEVEL,
+    STORAGE_UPLOAD_CONCURRENCY,
+    STORAGE_UPLOAD_RETRIES,
+    STORAGE_ZSTD_DICTIONARY,
+)
+from app.utils.compression import FileCompressor
+from app.utils.file_cache import FileCache
+
+logger = logging.getLogger(__name__)
 
 
 class StorageClient:
-    def __init__(self, api_url: str):
+    def __init__(
+        self,
+        api_url: str,
+        cache: Optional[FileCache] = None,
+        compressor: Optional[FileCompressor] = None,
+    ):
         self._api_url = api_url
         self._client = httpx.AsyncClient(timeout=60.0)
+        # Compresses uploads that ask for it; downloads are decompressed either way
+        self._compressor = compressor
+        self._decompressor = compressor or FileCompressor()
+        # Read-through cache by file id; files only change through this client
+        self._cache = cache
+        # In-flight downloads, shared by concurrent requests for the same file
+        self._downloads: Dict[str, asyncio.Task] = {}
 
     async def __aenter__(self):
         return self
@@ -17,11 +58,21 @@ class StorageClient:
     async def close(self):
         await self._client.aclose()
 
-    async def upload_file(self, file_bytes: bytes, filename: str) -> str:
-        """Upload a file and return the file ID."""
+    async def upload_file(
+        self, file_bytes: bytes, filename: str, compress: bool = False
+    ) -> str:
+        """Upload a file and return the file ID.
+
+        With `compress` (and a compressor configured), the stored file is
+        compressed and its name gets the compression suffix.
+        """
         url = f"{self._api_url}/files"
 
-        files = {"file": (filename, file_bytes)}
+        stored_bytes = file_bytes
+        if compress and self._compressor is not None:
+            stored_bytes = await asyncio.to_thread(self._compressor.compress, file_bytes)
+            filename += self._compressor.suffix
+        files = {"file": (filename, stored_bytes)}
 
         response = await self._client.post(url, files=files)
         if response.is_error:
@@ -31,17 +82,94 @@ class StorageClient:
                 response=response,
             )
 
+        result = response.json()
+        file_id = result["file_id"]
+        # The next turn usually downloads what this one uploaded
+        await self._cache_file(file_id, file_bytes)
+        return file_id
+
+    async def upload_file_stream(
+        self, chunks: AsyncIterable[bytes], filename: str, compress: bool = False
+    ) -> str:
+        """Upload a file from chunks as they are produced and return the file ID.
+
+        The body is sent with chunked encoding, so the file is never held in
+        memory as a whole; for the same reason it is not added to the cache.
+        """
+        url = f"{self._api_url}/files"
+        boundary = secrets.token_hex(16)
+        if compress and self._compressor is not None:
+            chunks = self._compressor.compress_chunks(chunks)
+            filename += self._compressor.suffix
+
+        async def _body() -> AsyncIterator[bytes]:
+            yield (
+                f"--{boundary}\r\n"
+                f'Content-Disposition: form-data; name="file"; filename="{filename}"\r\n'
+                "Content-Type: application/octet-stream\r\n\r\n"
+            ).encode("utf-8")
+            async for chunk in chunks:
+                yield chunk
+            yield f"\r\n--{boundary}--\r\n".encode("utf-8")
+
+        response = await self._client.post(
+            url,
+            content=_body(),
+            headers={"Content-Type": f"multipart/form-data; boundary={boundary}"},
+        )
+        if response.is_error:
+            raise httpx.HTTPStatusError(
+                f"{response.status_code} for {url}: {response.text}",
+                request=response.request,
+                response=response,
+            )
+
         result = response.json()
         return result["file_id"]
 
+    async def download_file_stream(self, file_id: str) -> AsyncIterator[bytes]:
+        """Yield the bytes of a file as they arrive (or at once, if it is cached)."""
+        if self._cache is not None:
+            file_bytes = await asyncio.to_thread(self._cache.get, file_id)
+            if file_bytes is not None:
+                yield file_bytes
+                return
+
+        url = f"{self._api_url}/files/{file_id}"
+        async with self._client.stream("GET", url) as response:
+            response.raise_for_status()
+            async for chunk in self._decompressor.decompress_chunks(
+                response.aiter_bytes()
+            ):
+                yield chunk
+
     async def download_file(self, file_id: str) -> bytes:
         """Download a file by its ID and return the file bytes."""
+        if self._cache is not None:
+            file_bytes = await asyncio.to_thread(self._cache.get, file_id)
+            if file_bytes is not None:
+                return file_bytes
+
+        task = self._downloads.get(file_id)
+        if task is None:
+            task = asyncio.create_task(self._download_file(file_id))
+            self._downloads[file_id] = task
+            task.add_done_callback(lambda _: self._downloads.pop(file_id, None))
+
+        # Cancelling one caller must not cancel the download shared with others
+        return await asyncio.shield(task)
+
+    async def _download_file(self, file_id: str) -> bytes:
         url = f"{self._api_url}/files/{file_id}"
 
         response = await self._client.get(url)
         response.raise_for_status()
 
-        return response.content
+        file_bytes = await asyncio.to_thread(
+            self._decompressor.decompress, response.content
+        )
+        await self._cache_file(file_id, file_bytes)
+        return file_bytes
 
     async def replace_file(self, file_id: str, file_bytes: bytes, filename: str) -> str:
         """Replace an existing file with new content and return the file ID."""
@@ -53,6 +181,8 @@ class StorageClient:
         response.raise_for_status()
 
         result = response.json()
+        self._forget_file(file_id)
+        await self._cache_file(result["file_id"], file_bytes)
         return result["file_id"]
 
     async def delete_file(self, file_id: str) -> str:
@@ -62,8 +192,120 @@ class StorageClient:
         response = await self._client.delete(url)
         response.raise_for_status()
 
+        self._forget_file(file_id)
         result = response.json()
         return result["file_id"]
 
+    async def _cache_file(self, file_id: str, file_bytes: bytes) -> None:
+        if self._cache is not None:
+            await asyncio.to_thread(self._cache.set, file_id, file_bytes)
+
+    def _forget_file(self, file_id: str) -> None:
+        if self._cache is not None:
+            self._cache.pop(file_id)
+
+
+def get_content_id(file_bytes: bytes) -> str:
+    """Identifier of file contents, the key `UploadBatch` deduplicates uploads by.
+
+    Not a storage file id; it is never sent to clients.
+    """
+    return f"sha256:{hashlib.sha256(file_bytes).hexdigest()}"
+
+
+class UploadBatch:
+    """Uploads belonging to one response, run concurrently but bounded.
+
+    Identical files (same bytes, name and compression) are uploaded once and
+    share the file id, e.g. an attachment returned twice. The context is a
+    single file of its own, so images inside it are stored again. Failed
+    uploads are retried with exponential backoff; streamed uploads are retried
+    by producing their chunks again, and are not shared.
+    """
+
+    def __init__(
+        self,
+        storage_client: StorageClient,
+        max_concurrency: int = STORAGE_UPLOAD_CONCURRENCY,
+        max_attempts: int = STORAGE_UPLOAD_RETRIES,
+    ):
+        self._storage_client = storage_client
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._max_attempts = max(1, max_attempts)
+        self._uploads: Dict[Tuple[str, str, bool], asyncio.Task] = {}
+
+    async def upload_file(
+        self, file_bytes: bytes, filename: str, compress: bool = False
+    ) -> str:
+        key = (get_content_id(file_bytes), filename, compress)
+        task = self._uploads.get(key)
+        if task is None:
+            task = asyncio.create_task(
+                self._upload_file(file_bytes, filename, compress)
+            )
+            self._uploads[key] = task
+        return await task
+
+    async def upload_file_stream(
+        self,
+        create_chunks: Callable[[], AsyncIterable[bytes]],
+        filename: str,
+        compress: bool = False,
+    ) -> str:
+        """Upload the chunks of `create_chunks()`, called again for each attempt."""
+        return await self._retry(
+            lambda: self._storage_client.upload_file_stream(
+                create_chunks(), filename, compress=compress
+            ),
+            filename,
+        )
+
+    async def _upload_file(
+        self, file_bytes: bytes, filename: str, compress: bool
+    ) -> str:
+        return await self._retry(
+            lambda: self._storage_client.upload_file(
+                file_bytes, filename, compress=compress
+            ),
+            filename,
+        )
+
+    async def _retry(self, upload: Callable[[], Awaitable[str]], filename: str) -> str:
+        for attempt in range(self._max_attempts):
+            try:
+                async with self._semaphore:
+                    return await upload()
+            except httpx.HTTPError as e:
+                if attempt + 1 == self._max_attempts or not _is_retryable(e):
+                    raise
+                logger.warning(f"Upload of {filename} failed, retrying: {e}")
+                await asyncio.sleep(0.5 * 2**attempt)
+
+
+def _is_retryable(error: httpx.HTTPError) -> bool:
+    if isinstance(error, httpx.HTTPStatusError):
+        return error.response.status_code >= 500 or error.response.status_code == 429
+    return True
+
 
-storage_client = StorageClient(STORAGE_API_URL)
+storage_client = StorageClient(
+    STORAGE_API_URL,
+    cache=FileCache(
+        memory_max_bytes=STORAGE_CACHE_MEMORY_SIZE * 1024 * 1024,
+        disk_dir=STORAGE_CACHE_DIR or None,
+        disk_max_bytes=STORAGE_CACHE_DISK_SIZE * 1024 * 1024,
+    ),
+    compressor=(
+        FileCompressor(
+            STORAGE_COMPRESSION,
+            level=STORAGE_COMPRESSION_LEVEL,
+            zstd_dictionary=(
+                Path(STORAGE_ZSTD_DICTIONARY).read_bytes()
+                if STORAGE_ZSTD_DICTIONARY
+                else None
+            ),
+        )
+        if STORAGE_COMPRESSION
+        else None
+    ),
+)
@@ -12,7 +12,6 @@ from chat2edit.execution.signaling import set_feedback
 from chat2edit.models import Feedback
 from chat2edit.prompting.stubbing.decorators import exclude_coroutine
 
-from app.clients.inference_client import inference_client
 from app.core.chat2edit.models import Image, Object
 from app.core.chat2edit.models.fabric.filters import (
     BlackWhiteFilter,
@@ -23,6 +22,10 @@ from app.core.chat2edit.models.fabric.filters import (
     SaturationFilter,
 )
 from app.core.chat2edit.utils import get_own_objects
+from app.core.chat2edit.utils.aesthetic_utils import (
+    get_aesthetic_scores,
+    prewarm_aesthetic_scores,
+)
 
 
 @feedback_ignored_return_value
@@ -101,13 +104,9 @@ async def apply_filter(
     if (filter_value is not None 
         and filter_name in ["brightness", "saturation", "contrast"]
         and not image.aesthetic_feedback_given):
-        try:
-            # Get image BEFORE applying the new filter (current state)
-            # We need to temporarily remove the filter we're about to apply
-            # But actually, we should check BEFORE applying, so get current image state
-            pil_image = image.get_image()
-            scores = await inference_client.aesthetic_regressor_score(pil_image)
-            
+        # Scores of the current state, before the new filter is applied
+        scores = await get_aesthetic_scores(image)
+        if scores is not None:
             # Map filter names to aesthetic score keys
             filter_to_score_key = {
                 "brightness": "brightness",
@@ -149,9 +148,6 @@ async def apply_filter(
                         contextualized=True,
                     )
                 )
-        except Exception as e:
-            # Silently fail if aesthetic regressor is unavailable - don't block the filter operation
-            pass
 
     if entities:
         own_objects = get_own_objects(image, entities)
@@ -162,5 +158,6 @@ async def apply_filter(
                 obj.filters.append(filter_obj)
     else:
         image = image.apply_filter(filter_obj)
+        prewarm_aesthetic_scores(image)
 
     return image
@@ -8,6 +8,7 @@ from chat2edit.prompting.stubbing.decorators import exclude_coroutine
 
 from app.clients.inference_client import inference_client
 from app.core.chat2edit.models import Image, Scribble
+from app.core.chat2edit.utils.inpaint_utils import inpaint_region
 from app.core.chat2edit.utils.object_utils import create_object_from_image_and_mask
 from app.core.chat2edit.utils.scribble_utils import convert_scribble_to_mask_image
 from app.utils.image_utils import convert_data_url_to_image, expand_mask_image
@@ -22,10 +23,14 @@ async def generate_object(image: Image, prompt: str, location: Scribble) -> Imag
     mask = convert_scribble_to_mask_image(location, image)
     expanded_mask = expand_mask_image(mask)
     pil_image = image.get_image()
-    inpainted_image = await inference_client.sd_inpaint(
-        image=pil_image,
-        mask=expanded_mask,
-        prompt=prompt,
+    inpainted_image = await inpaint_region(
+        pil_image,
+        expanded_mask,
+        lambda region_image, region_mask: inference_client.sd_inpaint(
+            image=region_image,
+            mask=region_mask,
+            prompt=prompt,
+        ),
     )
     obj = create_object_from_image_and_mask(inpainted_image, mask)
     obj.left -= pil_image.width / 2
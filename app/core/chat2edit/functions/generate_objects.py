@@ -12,6 +12,7 @@ from chat2edit.prompting.stubbing.decorators import exclude_coroutine
 
 from app.clients.inference_client import inference_client
 from app.core.chat2edit.models import Box, Image
+from app.core.chat2edit.utils.aesthetic_utils import prewarm_aesthetic_scores
 
 
 @feedback_ignored_return_value
@@ -59,4 +60,5 @@ async def generate_objects(
     )
 
     image.set_image(result_image)
+    prewarm_aesthetic_scores(image)
     return image
@@ -38,4 +38,5 @@ async def rotate_entities(
         # Fabric-style angle is in degrees
         entity.angle = (entity.angle or 0) + delta
 
+    image.update_objects(own_entities)
     return image
@@ -43,4 +43,5 @@ async def scale_entities(
             entity.scaleX = (entity.scaleX or 1.0) * scale
             entity.scaleY = (entity.scaleY or 1.0) * scale
 
+    image.update_objects(own_entities)
     return image
@@ -1,4 +1,4 @@
-from typing import List, Optional
+from typing import List, Optional, Union
 
 from chat2edit.execution.decorators import (
     feedback_ignored_return_value,
@@ -12,7 +12,13 @@ from app.clients.inference_client import inference_client
 from app.core.chat2edit.models import Box, Image, Object, Point, Scribble
 from app.core.chat2edit.utils.object_utils import create_object_from_image_and_mask
 from app.core.chat2edit.utils.scribble_utils import convert_scribble_to_mask_image
-from app.schemas.common_schemas import Box as InferenceBox
+from app.core.chat2edit.utils.segment_utils import (
+    create_inference_box,
+    create_mask_labeled_points,
+    create_segmentation_proxy,
+    pop_prefetched_mask,
+    restore_mask_resolution,
+)
 from app.schemas.common_schemas import MaskLabeledPoint
 from app.utils.image_utils import convert_mask_image_to_points
 from app.core.chat2edit.utils import get_same_objects
@@ -33,66 +39,102 @@ from app.core.chat2edit.utils import get_same_objects
 @exclude_coroutine
 async def segment_object(
     image: Image,
-    box: Optional[Box] = None,
+    box: Optional[Union[Box, List[Box]]] = None,
     positive_points: Optional[List[Point]] = None,
     negative_points: Optional[List[Point]] = None,
     positive_scribble: Optional[Scribble] = None,
     negative_scribble: Optional[Scribble] = None,
-) -> Object:
+) -> Union[Object, List[Object]]:
     pil_image = image.get_image()
     img_width = pil_image.width
     img_height = pil_image.height
+    proxy_image, scale = create_segmentation_proxy(pil_image)
+
+    # Batched mode: one request for all boxes, one object per box
+    if isinstance(box, list):
+        if positive_points or negative_points or positive_scribble or negative_scribble:
+            raise ValueError(
+                "Points and scribbles cannot be combined with a list of boxes"
+            )
+
+        inference_boxes = [
+            create_inference_box(b, img_width, img_height, scale) for b in box
+        ]
+        masks = await inference_client.sam3_generate_masks_by_boxes(
+            proxy_image, inference_boxes
+        )
+        objects = [
+            create_object_from_image_and_mask(
+                pil_image, restore_mask_resolution(mask, pil_image)
+            )
+            for mask in masks
+        ]
+        for obj in objects:
+            obj.image_id = image.id
+
+        image.remove_objects(get_same_objects(image, objects))
+        image.add_objects(objects)
+
+        return objects
 
     inference_box = None
     points = []
 
     if box is not None:
-        adjusted_left = int(box.left + img_width / 2)
-        adjusted_top = int(box.top + img_height / 2)
-        adjusted_right = int(adjusted_left + box.width)
-        adjusted_bottom = int(adjusted_top + box.height)
-
-        inference_box = InferenceBox(
-            x_min=adjusted_left,
-            y_min=adjusted_top,
-            x_max=adjusted_right,
-            y_max=adjusted_bottom,
-        )
+        inference_box = create_inference_box(box, img_width, img_height, scale)
 
     if positive_points:
-        for point in positive_points:
-            x = int(point.left + img_width / 2)
-            y = int(point.top + img_height / 2)
-            points.append(MaskLabeledPoint(x=x, y=y, label=1))
+        points.extend(
+            create_mask_labeled_points(
+                positive_points, 1, img_width, img_height, scale
+            )
+        )
 
     if negative_points:
-        for point in negative_points:
-            x = int(point.left + img_width / 2)
-            y = int(point.top + img_height / 2)
-            points.append(MaskLabeledPoint(x=x, y=y, label=0))
+        points.extend(
+            create_mask_labeled_points(
+                negative_points, 0, img_width, img_height, scale
+            )
+        )
 
     if positive_scribble:
         scribble_mask = convert_scribble_to_mask_image(positive_scribble, image)
         scribble_points = convert_mask_image_to_points(scribble_mask)
         for x, y in scribble_points:
-            points.append(MaskLabeledPoint(x=x, y=y, label=1))
+            points.append(
+                MaskLabeledPoint(x=int(x * scale), y=int(y * scale), label=1)
+            )
 
     if negative_scribble:
         scribble_mask = convert_scribble_to_mask_image(negative_scribble, image)
         scribble_points = convert_mask_image_to_points(scribble_mask)
         for x, y in scribble_points:
-            points.append(MaskLabeledPoint(x=x, y=y, label=0))
+            points.append(
+                MaskLabeledPoint(x=int(x * scale), y=int(y * scale), label=0)
+            )
 
-    mask = await inference_client.sam3_generate_mask(
-        pil_image,
-        points=points if points else None,
-        box=inference_box,
-    )
+    # A lone box or point may already have been segmented speculatively
+    mask = None
+    if not (negative_points or positive_scribble or negative_scribble):
+        if box is not None and not positive_points:
+            mask = await pop_prefetched_mask(image, box=box)
+        elif box is None and positive_points and len(positive_points) == 1:
+            mask = await pop_prefetched_mask(image, point=positive_points[0])
 
-    obj = create_object_from_image_and_mask(pil_image, mask)
+    if mask is None:
+        mask = await inference_client.sam3_generate_mask(
+            proxy_image,
+            points=points if points else None,
+            box=inference_box,
+        )
+
+    obj = create_object_from_image_and_mask(
+        pil_image, restore_mask_resolution(mask, pil_image)
+    )
     obj.image_id = image.id
 
     image.remove_objects(get_same_objects(image, [obj]))
     image.add_object(obj)
     
     return obj
+
@@ -1,5 +1,5 @@
 from copy import deepcopy
-from typing import List
+from typing import List, Union
 from chat2edit.execution.signaling import set_feedback
 from chat2edit.models import Feedback
 from chat2edit.execution.decorators import (
@@ -8,11 +8,16 @@ from chat2edit.execution.decorators import (
     feedback_unexpected_error,
 )
 from chat2edit.prompting.stubbing.decorators import exclude_coroutine
+from PIL.Image import Image as PILImage
 
 from app.clients.inference_client import inference_client
 
 from app.core.chat2edit.models import Box, Image, Object, Text
 from app.core.chat2edit.utils.object_utils import create_object_from_image_and_mask
+from app.core.chat2edit.utils.segment_utils import (
+    create_segmentation_proxy,
+    restore_mask_resolution,
+)
 from app.core.chat2edit.utils import get_same_objects
 
 
@@ -21,61 +26,110 @@ from app.core.chat2edit.utils import get_same_objects
 @feedback_invalid_parameter_type
 @exclude_coroutine
 async def segment_objects(
-    image: Image, prompt: str, expected_quantity: int
-) -> List[Object]:
+    image: Image,
+    prompt: Union[str, List[str]],
+    expected_quantity: Union[int, List[int]],
+) -> Union[List[Object], List[List[Object]]]:
     pil_image = image.get_image()
+    proxy_image, _ = create_segmentation_proxy(pil_image)
+
+    # Batched mode: one request for all prompts, one list of objects per prompt
+    if isinstance(prompt, list):
+        expected_quantities = (
+            expected_quantity
+            if isinstance(expected_quantity, list)
+            else [expected_quantity] * len(prompt)
+        )
+        if len(expected_quantities) != len(prompt):
+            raise ValueError(
+                "The number of expected quantities must match the number of prompts"
+            )
+
+        grouped_masks = await inference_client.sam3_generate_masks_by_texts(
+            proxy_image, prompt
+        )
+        grouped_objects = [
+            _create_objects(image, pil_image, masks) for masks in grouped_masks
+        ]
+        all_objects = [obj for objects in grouped_objects for obj in objects]
+        image.remove_objects(get_same_objects(image, all_objects))
+        image.add_objects(all_objects)
+
+        for text, quantity, objects in zip(
+            prompt, expected_quantities, grouped_objects
+        ):
+            if len(objects) != quantity:
+                _set_quantity_mismatch_feedback(image, objects, text, quantity)
+                break
+
+        return grouped_objects
+
     generated_masks = await inference_client.sam3_generate_masks_by_text(
-        pil_image, prompt
+        proxy_image, prompt
     )
-    objects = [
-        create_object_from_image_and_mask(pil_image, mask.image)
-        for mask in generated_masks
-    ]
-    for obj in objects:
-        obj.image_id = image.id
+    objects = _create_objects(image, pil_image, generated_masks)
 
     image.remove_objects(get_same_objects(image, objects))
     image.add_objects(objects)
 
     if len(generated_masks) != expected_quantity:
-        annotated_image = deepcopy(image)
-        for i, obj in enumerate(objects):
-            index = Text(
-                text=f"{i + 1}",
-                left=obj.left,
-                top=obj.top,
-                fontSize=min(obj.width, obj.height) / 2,
-                fill="red",
-                ephemeral=True,
-            )
-            bbox = Box(
-                left=obj.left,
-                top=obj.top,
-                width=obj.width,
-                height=obj.height,
-                stroke="red",
-                strokeWidth=min(obj.width, obj.height) / 20,
-                fill="transparent",
-                ephemeral=True,
-            )
-            annotated_image.add_object(index)
-            annotated_image.add_object(bbox)
-
-        # Persist a stable variable name on the annotated image so the context
-        # strategy can use it when generating varnames.
-        annotated_image.name = "annotated_image"
-
-        set_feedback(
-            Feedback(
-                type="prompt_based_object_detection_quantity_mismatch",
-                severity="warning",
-                attachments=[annotated_image],
-                details={
-                    "prompt": prompt,
-                    "expected_quantity": expected_quantity,
-                    "detected_quantity": len(generated_masks),
-                },
-            )
+        _set_quantity_mismatch_feedback(image, objects, prompt, expected_quantity)
+
+    return objects
+
+
+def _create_objects(image: Image, pil_image: PILImage, masks: List) -> List[Object]:
+    objects = [
+        create_object_from_image_and_mask(
+            pil_image, restore_mask_resolution(mask.image, pil_image)
         )
+        for mask in masks
+    ]
+    for obj in objects:
+        obj.image_id = image.id
 
     return objects
+
+
+def _set_quantity_mismatch_feedback(
+    image: Image, objects: List[Object], prompt: str, expected_quantity: int
+) -> None:
+    annotated_image = deepcopy(image)
+    for i, obj in enumerate(objects):
+        index = Text(
+            text=f"{i + 1}",
+            left=obj.left,
+            top=obj.top,
+            fontSize=min(obj.width, obj.height) / 2,
+            fill="red",
+            ephemeral=True,
+        )
+        bbox = Box(
+            left=obj.left,
+            top=obj.top,
+            width=obj.width,
+            height=obj.height,
+            stroke="red",
+            strokeWidth=min(obj.width, obj.height) / 20,
+            fill="transparent",
+            ephemeral=True,
+        )
+        annotated_image.add_object(index)
+        annotated_image.add_object(bbox)
+
+    # Persist a stable variable name on the annotated image so the context
+    # strategy can use it when generating varnames.
+    annotated_image.name = "annotated_image"
+
+    set_feedback(
+        Feedback(
+            type="prompt_based_object_detection_quantity_mismatch",
+            severity="warning",
+            attachments=[annotated_image],
+            details={
+                "prompt": prompt,
+                "expected_quantity": expected_quantity,
+                "detected_quantity": len(objects),
+            },
+        )
+    )
@@ -43,4 +43,5 @@ async def shift_entities(
             entity.left = entity.left + dx_pixels
             entity.top = entity.top + dy_pixels
 
+    image.update_objects(own_entities)
     return deepcopy(image)
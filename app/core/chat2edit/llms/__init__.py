@@ -0,0 +1,12 @@
+from app.core.chat2edit.llms.llm_pool import LlmPool, llm_pool
+from app.core.chat2edit.llms.mic2e_google_llm import Mic2eGoogleLlm
+from app.core.chat2edit.llms.mic2e_openai_llm import Mic2eOpenAILlm
+from app.core.chat2edit.llms.streaming_llm import StreamingLlm
+
+__all__ = [
+    "LlmPool",
+    "Mic2eGoogleLlm",
+    "Mic2eOpenAILlm",
+    "StreamingLlm",
+    "llm_pool",
+]
@@ -0,0 +1,71 @@
+import json
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+import aiohttp
+from chat2edit.prompting.llms import Llm
+
+from app.core.chat2edit.llms.mic2e_google_llm import Mic2eGoogleLlm
+from app.core.chat2edit.llms.mic2e_openai_llm import Mic2eOpenAILlm
+from app.env import GOOGLE_API_KEY, OPENAI_API_KEY
+
+
+class LlmPool:
+    """Reuses LLM clients across requests.
+
+    Clients are keyed by (provider, model, API key, params) and the least
+    recently used ones are dropped once `max_size` is reached. OpenAI clients
+    share a single HTTP session so connections are kept alive between turns.
+    """
+
+    def __init__(self, max_size: int = 32):
+        self._max_size = max_size
+        self._llms: "OrderedDict[Hashable, Llm]" = OrderedDict()
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    def get(
+        self,
+        provider: str,
+        model: str,
+        api_key: Optional[str] = None,
+        params: Optional[Dict[str, Any]] = None,
+    ) -> Llm:
+        params = params or {}
+        if provider == "openai":
+            api_key = api_key or OPENAI_API_KEY
+        elif provider == "google":
+            api_key = api_key or GOOGLE_API_KEY
+        else:
+            raise ValueError(f"Invalid LLM provider: {provider}")
+
+        key = (provider, model, api_key, json.dumps(params, sort_keys=True, default=str))
+        llm = self._llms.get(key)
+        if llm is not None:
+            self._llms.move_to_end(key)
+            return llm
+
+        if provider == "openai":
+            llm = Mic2eOpenAILlm(model, session=self._get_session(), **params)
+        else:
+            llm = Mic2eGoogleLlm(model, **params)
+        llm.set_api_key(api_key)
+
+        self._llms[key] = llm
+        while len(self._llms) > self._max_size:
+            self._llms.popitem(last=False)
+
+        return llm
+
+    async def close(self) -> None:
+        self._llms.clear()
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession()
+        return self._session
+
+
+llm_pool = LlmPool()
@@ -0,0 +1,192 @@
+import asyncio
+import datetime
+import hashlib
+import logging
+from typing import AsyncIterator, Iterable, List, Optional, Set, Tuple
+
+import google.generativeai as genai
+from chat2edit.models import Message
+from chat2edit.prompting.llms import GoogleLlm
+from google.generativeai import caching
+from google.generativeai.generative_models import ChatSession
+
+from app.core.chat2edit.llms.prefixed_message import get_prompt_prefix
+from app.core.chat2edit.llms.streaming_llm import StreamingLlm
+from app.env import GEMINI_PROMPT_CACHE_TTL, LLM_PROMPT_CACHE_ENABLED
+from app.utils.caches import TtlCache
+
+logger = logging.getLogger(__name__)
+
+# `genai.configure` is global and drops the cached gRPC clients, so it is only
+# called again when a different API key is needed
+_configured_api_key: Optional[str] = None
+
+
+class Mic2eGoogleLlm(GoogleLlm, StreamingLlm):
+    """Google LLM that puts the static prompt prefix into a Gemini context cache.
+
+    Prompts created by `Mic2ePromptingStrategy` start with the function stubs
+    and exemplars. That prefix is uploaded once as `CachedContent` and later
+    requests only send the rest of the prompt. Models or prefixes that cannot be
+    cached (e.g. below the minimum token count) fall back to the full prompt.
+
+    The cached prefix is a user turn of its own, so the rest of the prompt
+    follows it as a second user turn. This is how Gemini context caching is
+    meant to be used: cached contents come first and the request is appended
+    to them, and consecutive user turns are accepted.
+    """
+
+    def __init__(
+        self,
+        model_name: str,
+        *,
+        system_instruction: Optional[str] = None,
+        stop_sequences: Optional[Iterable[str]] = None,
+        max_out_tokens: Optional[int] = None,
+        temperature: Optional[float] = None,
+        top_p: Optional[int] = None,
+        top_k: Optional[int] = None,
+    ) -> None:
+        self._api_key: Optional[str] = None
+        self._system_instruction = system_instruction
+        # Refreshed slightly before the server-side cache expires
+        self._cached_models: TtlCache[genai.GenerativeModel] = TtlCache(
+            ttl=GEMINI_PROMPT_CACHE_TTL * 0.9, max_size=8
+        )
+        self._uncacheable_prefixes: Set[str] = set()
+        self._cache_lock = asyncio.Lock()
+        super().__init__(
+            model_name,
+            system_instruction=system_instruction,
+            stop_sequences=stop_sequences,
+            max_out_tokens=max_out_tokens,
+            temperature=temperature,
+            top_p=top_p,
+            top_k=top_k,
+        )
+
+    def set_api_key(self, api_key: str) -> None:
+        self._api_key = api_key
+        self._cached_models.clear()
+        self._configure()
+
+    async def generate(
+        self, prompt: Message, history: List[Tuple[Message, Message]]
+    ) -> Message:
+        chat_session, text = await self._start_chat(prompt, history)
+        try:
+            response = await chat_session.send_message_async(text)
+        except Exception:
+            if text == prompt.text:
+                raise
+            self._drop_cached_model(prompt, history)
+            return await super().generate(prompt, history)
+
+        return Message(text=response.text)
+
+    async def stream(
+        self, prompt: Message, history: List[Tuple[Message, Message]]
+    ) -> AsyncIterator[str]:
+        chat_session, text = await self._start_chat(prompt, history)
+        try:
+            response = await chat_session.send_message_async(text, stream=True)
+        except Exception:
+            if text == prompt.text:
+                raise
+            self._drop_cached_model(prompt, history)
+            chat_session = self._model.start_chat(
+                history=self._create_input_history(history)
+            )
+            response = await chat_session.send_message_async(prompt.text, stream=True)
+
+        async for chunk in response:
+            # Chunks without text parts (e.g. the final one carrying the finish
+            # reason) raise on `.text`
+            try:
+                text = chunk.text
+            except ValueError:
+                continue
+            if text:
+                yield text
+
+    async def _start_chat(
+        self, prompt: Message, history: List[Tuple[Message, Message]]
+    ) -> Tuple[ChatSession, str]:
+        self._configure()
+
+        prefix = self._get_prefix(prompt, history)
+        cached_model = await self._get_cached_model(prefix) if prefix else None
+        if cached_model is None:
+            chat_session = self._model.start_chat(
+                history=self._create_input_history(history)
+            )
+            return chat_session, prompt.text
+
+        # The cached content already holds the prefix of every prompt
+        input_history = self._create_input_history(
+            [(Message(text=_strip_prefix(p.text, prefix)), a) for p, a in history]
+        )
+        chat_session = cached_model.start_chat(history=input_history)
+        return chat_session, _strip_prefix(prompt.text, prefix)
+
+    async def _get_cached_model(self, prefix: str) -> Optional[genai.GenerativeModel]:
+        key = hashlib.sha256(prefix.encode("utf-8")).hexdigest()
+        if key in self._uncacheable_prefixes:
+            return None
+
+        async with self._cache_lock:
+            cached_model = self._cached_models.get(key)
+            if cached_model is not None:
+                return cached_model
+
+            try:
+                cached_content = await asyncio.to_thread(
+                    caching.CachedContent.create,
+                    model=self._model.model_name,
+                    display_name=f"mic2e-prompt-prefix-{key[:16]}",
+                    system_instruction=self._system_instruction,
+                    contents=[{"role": "user", "parts": [prefix]}],
+                    ttl=datetime.timedelta(seconds=GEMINI_PROMPT_CACHE_TTL),
+                )
+            except Exception as e:
+                logger.warning(f"Prompt prefix caching unavailable: {e}")
+                self._uncacheable_prefixes.add(key)
+                return None
+
+            cached_model = genai.GenerativeModel.from_cached_content(
+                cached_content, generation_config=self._generation_config
+            )
+            self._cached_models.set(key, cached_model)
+            return cached_model
+
+    def _drop_cached_model(
+        self, prompt: Message, history: List[Tuple[Message, Message]]
+    ) -> None:
+        prefix = self._get_prefix(prompt, history)
+        key = hashlib.sha256(prefix.encode("utf-8")).hexdigest()
+        self._cached_models.pop(key)
+
+    def _get_prefix(
+        self, prompt: Message, history: List[Tuple[Message, Message]]
+    ) -> str:
+        if not LLM_PROMPT_CACHE_ENABLED:
+            return ""
+
+        # Refine prompts have no prefix, but the first prompt in the history does
+        for message in [prompt, *(p for p, _ in history)]:
+            prefix = get_prompt_prefix(message)
+            if prefix:
+                return prefix
+
+        return ""
+
+    def _configure(self) -> None:
+        global _configured_api_key
+
+        if self._api_key and self._api_key != _configured_api_key:
+            genai.configure(api_key=self._api_key)
+            _configured_api_key = self._api_key
+
+
+def _strip_prefix(text: str, prefix: str) -> str:
+    return text[len(prefix) :] if text.startswith(prefix) else text
@@ -0,0 +1,89 @@
+import hashlib
+from typing import Any, AsyncIterator, Iterable, List, Optional, Tuple
+
+import aiohttp
+import openai
+from chat2edit.models import Message
+from chat2edit.prompting.llms import OpenAILlm
+
+from app.core.chat2edit.llms.prefixed_message import get_prompt_prefix
+from app.core.chat2edit.llms.streaming_llm import StreamingLlm
+from app.env import LLM_PROMPT_CACHE_ENABLED
+
+
+class Mic2eOpenAILlm(OpenAILlm, StreamingLlm):
+    """OpenAI LLM that keeps its API key per instance and can share an HTTP session.
+
+    The base class sets the global `openai.api_key` and lets the OpenAI client
+    open a new connection for every call, which prevents reusing instances with
+    different keys and pays a TLS handshake on every turn.
+    """
+
+    def __init__(
+        self,
+        model: str,
+        *,
+        session: Optional[aiohttp.ClientSession] = None,
+        system_message: Optional[str] = None,
+        max_tokens: Optional[int] = None,
+        temperature: Optional[float] = None,
+        stop: Optional[Iterable[str]] = None,
+        top_p: Optional[int] = None,
+    ) -> None:
+        self._api_key: Optional[str] = None
+        self._session = session
+        super().__init__(
+            model,
+            system_message=system_message,
+            max_tokens=max_tokens,
+            temperature=temperature,
+            stop=stop,
+            top_p=top_p,
+        )
+
+    def set_api_key(self, api_key: str) -> None:
+        self._api_key = api_key
+
+    async def generate(
+        self, prompt: Message, history: List[Tuple[Message, Message]]
+    ) -> Message:
+        response = await self._create_completion(prompt, history)
+        return Message(text=response.choices[0].message.content)
+
+    async def stream(
+        self, prompt: Message, history: List[Tuple[Message, Message]]
+    ) -> AsyncIterator[str]:
+        response = await self._create_completion(prompt, history, stream=True)
+
+        async for chunk in response:
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta.get("content")
+            if delta:
+                yield delta
+
+    async def _create_completion(
+        self, prompt: Message, history: List[Tuple[Message, Message]], **kwargs: Any
+    ) -> Any:
+        # OpenAI caches long prompt prefixes automatically; the cache key routes
+        # requests sharing the static prefix to the same cache
+        prefix = get_prompt_prefix(prompt)
+        if LLM_PROMPT_CACHE_ENABLED and prefix:
+            kwargs["prompt_cache_key"] = hashlib.sha256(prefix.encode("utf-8")).hexdigest()[:32]
+
+        # The OpenAI client picks up the session from this context variable
+        token = openai.aiosession.set(self._session) if self._session else None
+        try:
+            return await openai.ChatCompletion.acreate(
+                messages=self._create_messages(prompt, history),
+                model=self._model,
+                max_tokens=self._max_tokens,
+                temperature=self._temperature,
+                stop=self._stop,
+                top_p=self._top_p,
+                api_key=self._api_key,
+                **kwargs,
+            )
+        finally:
+            if token is not None:
+                openai.aiosession.reset(token)
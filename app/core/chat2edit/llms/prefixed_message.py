@@ -0,0 +1,15 @@
+from chat2edit.models import Message
+from pydantic import Field
+
+
+class PrefixedMessage(Message):
+    """Prompt whose first `prefix_length` characters are shared by every request.
+
+    LLMs use the prefix for provider-side prompt caching.
+    """
+
+    prefix_length: int = Field(default=0, exclude=True)
+
+
+def get_prompt_prefix(message: Message) -> str:
+    return message.text[: getattr(message, "prefix_length", 0)]
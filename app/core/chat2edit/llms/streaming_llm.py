@@ -0,0 +1,13 @@
+from abc import abstractmethod
+from typing import AsyncIterator, List, Tuple
+
+from chat2edit.models import Message
+from chat2edit.prompting.llms import Llm
+
+
+class StreamingLlm(Llm):
+    @abstractmethod
+    def stream(
+        self, prompt: Message, history: List[Tuple[Message, Message]]
+    ) -> AsyncIterator[str]:
+        """Yield the answer text in chunks as they are generated."""
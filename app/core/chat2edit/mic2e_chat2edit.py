@@ -0,0 +1,280 @@
+import asyncio
+import logging
+from typing import Any, Callable, Dict, List, Optional, Tuple, cast
+
+from chat2edit import Chat2Edit, Chat2EditCallbacks
+from chat2edit.models import (
+    ChatCycle,
+    ExecutionBlock,
+    Message,
+    PromptCycle,
+    PromptExchange,
+)
+from chat2edit.models.prompt_error import PromptError
+from pydantic import Field
+
+from app.core.chat2edit.llms import StreamingLlm
+
+logger = logging.getLogger(__name__)
+
+COMMANDS_MARKER = "commands:"
+CODE_BLOCK_START = "```python"
+CODE_BLOCK_END = "```"
+
+
+class Mic2eChat2EditCallbacks(Chat2EditCallbacks):
+    on_answer_delta: Optional[Callable[[str], None]] = Field(default=None)
+
+
+class Mic2eChat2Edit(Chat2Edit):
+    """Chat2Edit with an optional streaming mode.
+
+    When `stream` is enabled and the LLM is a `StreamingLlm`, answer chunks are
+    reported through `on_answer_delta` and the `commands:` code block is parsed
+    while it is being generated. Each top-level statement is executed as soon as
+    it is complete, so slow calls start before the LLM has finished answering.
+
+    The streaming path follows `Chat2Edit.generate` and `Chat2Edit._prompt` and
+    executes each statement with `Chat2Edit._execute`, so the cycles it records
+    match those of the base class (see tests/test_mic2e_chat2edit.py).
+    """
+
+    def __init__(self, *, stream: bool = False, **kwargs: Any) -> None:
+        if kwargs.get("callbacks") is None:
+            kwargs["callbacks"] = Mic2eChat2EditCallbacks()
+        super().__init__(**kwargs)
+        self._stream = stream
+
+    async def generate(
+        self,
+        request: Message,
+        cycles: Optional[List[ChatCycle]] = None,
+        context: Optional[Dict[str, Any]] = None,
+    ) -> Tuple[Optional[Message], ChatCycle, Dict[str, Any]]:
+        if not self._stream or not isinstance(self._llm, StreamingLlm):
+            return await super().generate(request, cycles, context)
+
+        cycles = list(cycles) if cycles is not None else []
+        context = dict(context) if context is not None else {}
+
+        context.update(self._context_provider.get_context())
+        contextualized_request = self._context_strategy.contextualize_message(
+            request, context
+        )
+        chat_cycle = ChatCycle(request=contextualized_request)
+        cycles.append(chat_cycle)
+
+        if self._callbacks.on_request:
+            self._callbacks.on_request(chat_cycle.request)
+
+        while len(chat_cycle.cycles) < self._config.max_prompt_cycles:
+            prompt_cycle = PromptCycle()
+            chat_cycle.cycles.append(prompt_cycle)
+            prompt_cycle.exchanges, prompt_cycle.blocks = await self._prompt_and_execute(
+                cycles, context
+            )
+
+            # As in the base class, an LLM error ends the cycle, even when
+            # statements streamed before the error have already been executed
+            last_exchange = prompt_cycle.exchanges[-1] if prompt_cycle.exchanges else None
+            if not last_exchange or last_exchange.error or not last_exchange.code:
+                break
+
+            executed_blocks = [block for block in prompt_cycle.blocks if block.executed]
+            if (
+                executed_blocks
+                and (executed_blocks[-1].response or executed_blocks[-1].error)
+                and not executed_blocks[-1].feedback
+            ):
+                break
+
+        return (
+            self._get_response(chat_cycle, context),
+            chat_cycle,
+            self._context_strategy.filter_context(context),
+        )
+
+    async def _prompt_and_execute(
+        self, cycles: List[ChatCycle], context: Dict[str, Any]
+    ) -> Tuple[List[PromptExchange], List[ExecutionBlock]]:
+        llm = cast(StreamingLlm, self._llm)
+        exchanges: List[PromptExchange] = []
+        blocks: List[ExecutionBlock] = []
+
+        while len(exchanges) < self._config.max_llm_exchanges:
+            prompt = (
+                self._prompting_strategy.get_refine_prompt()
+                if exchanges
+                else self._prompting_strategy.create_prompt(
+                    cycles, self._exemplars, self._context_provider.get_context()
+                )
+            )
+            exchange = PromptExchange(prompt=prompt)
+            exchanges.append(exchange)
+
+            if self._callbacks.on_prompt:
+                self._callbacks.on_prompt(prompt)
+
+            history: List[Tuple[Message, Message]] = [
+                (e.prompt, e.answer) for e in exchanges[:-1] if e.answer
+            ]
+            parser = _CommandStreamParser(self._execution_strategy.parse)
+            statements: asyncio.Queue = asyncio.Queue()
+            stream_failed = asyncio.Event()
+            executor = asyncio.create_task(
+                self._execute_statements(statements, stream_failed, context, blocks)
+            )
+
+            text = ""
+            try:
+                async for delta in llm.stream(prompt, history):
+                    text += delta
+                    if self._callbacks.on_answer_delta:
+                        self._callbacks.on_answer_delta(delta)
+                    for statement in parser.feed(delta):
+                        statements.put_nowait(statement)
+
+                for statement in parser.close():
+                    statements.put_nowait(statement)
+            except Exception as e:
+                error = PromptError.from_exception(e)
+                error.llm = llm.get_info()
+                exchange.error = error
+                stream_failed.set()
+            finally:
+                statements.put_nowait(None)
+                await executor
+
+            if exchange.error:
+                break
+
+            answer = Message(text=text)
+            exchange.answer = answer
+            if self._callbacks.on_answer:
+                self._callbacks.on_answer(answer)
+
+            code = self._prompting_strategy.extract_code(answer.text)
+            if not code and blocks:
+                # Statements were already executed, so they must be recorded
+                code = "\n".join(block.generated_code for block in blocks)
+            exchange.code = code
+
+            if code:
+                if self._callbacks.on_extract:
+                    self._callbacks.on_extract(code)
+                self._check_streamed_statements(code, blocks)
+                break
+
+        return exchanges, blocks
+
+    async def _execute_statements(
+        self,
+        statements: asyncio.Queue,
+        stream_failed: asyncio.Event,
+        context: Dict[str, Any],
+        blocks: List[ExecutionBlock],
+    ) -> None:
+        stopped = False
+        while True:
+            statement = await statements.get()
+            if statement is None:
+                return
+
+            # Remaining statements are recorded but not executed, as in `_execute`;
+            # after a stream error, statements not yet started are not executed
+            if stopped or stream_failed.is_set():
+                blocks.append(
+                    ExecutionBlock(
+                        generated_code=statement,
+                        processed_code=self._execution_strategy.process(
+                            statement, context
+                        ),
+                    )
+                )
+                continue
+
+            # `_execute` marks its last block as an incomplete cycle unless it
+            # stopped; only the last statement executed may keep the mark
+            if blocks and _is_incomplete_cycle(blocks[-1]):
+                blocks[-1].feedback = None
+
+            executed_blocks = await super()._execute(statement, context)
+            blocks.extend(executed_blocks)
+            stopped = not _is_incomplete_cycle(executed_blocks[-1])
+
+    def _check_streamed_statements(self, code: str, blocks: List[ExecutionBlock]) -> None:
+        try:
+            expected = self._execution_strategy.parse(code)
+        except SyntaxError:
+            return
+
+        streamed = [block.generated_code for block in blocks]
+        if streamed != expected[: len(streamed)]:
+            logger.warning(
+                "Streamed statements differ from the extracted code block: "
+                f"{streamed} != {expected}"
+            )
+
+
+def _is_incomplete_cycle(block: ExecutionBlock) -> bool:
+    return bool(
+        block.feedback
+        and getattr(block.feedback, "type", None) == "incomplete_cycle"
+        and not block.response
+        and not block.error
+    )
+
+
+class _CommandStreamParser:
+    """Incrementally extracts complete top-level statements from a streamed answer.
+
+    Only the code inside the ```python block following the last `commands:`
+    marker is considered. While the block is still open, the last parsed
+    statement is held back because later lines may still extend it.
+    """
+
+    def __init__(self, parse: Callable[[str], List[str]]) -> None:
+        self._parse = parse
+        self._text = ""
+        self._marker_index = -1
+        self._num_emitted = 0
+
+    def feed(self, delta: str) -> List[str]:
+        self._text += delta
+        return self._extract(final=False)
+
+    def close(self) -> List[str]:
+        return self._extract(final=True)
+
+    def _extract(self, final: bool) -> List[str]:
+        marker_index = self._text.rfind(COMMANDS_MARKER)
+        if marker_index < 0:
+            return []
+
+        # A later marker starts a new block, whose statements are all new
+        if marker_index != self._marker_index:
+            self._marker_index = marker_index
+            self._num_emitted = 0
+
+        start_index = self._text.find(CODE_BLOCK_START, marker_index)
+        if start_index < 0:
+            return []
+
+        code_start = start_index + len(CODE_BLOCK_START)
+        end_index = self._text.find(CODE_BLOCK_END, code_start)
+        closed = end_index >= 0
+        code = self._text[code_start:end_index] if closed else self._text[code_start:]
+        if not closed and not final:
+            code = code[: code.rfind("\n") + 1]
+
+        try:
+            statements = self._parse(code)
+        except SyntaxError:
+            return []
+
+        if not closed and not final:
+            statements = statements[:-1]
+
+        new_statements = statements[self._num_emitted :]
+        self._num_emitted = max(self._num_emitted, len(statements))
+        return new_statements
@@ -1,4 +1,5 @@
-from typing import Any, Dict, List
+from functools import lru_cache
+from typing import Any, Dict, List, Tuple
 
 from chat2edit.context.providers import ContextProvider
 from chat2edit.models import Exemplar
@@ -53,5 +54,14 @@ class Mic2eContextProvider(ContextProvider):
         return context
 
     def get_exemplars(self) -> List[Exemplar]:
-        """Get exemplars based on interactive mode."""
-        return create_mic2e_exemplars(interactive=self.interactive)
+        """Get exemplars based on interactive mode.
+
+        The exemplars are built once per mode and shared, so that contextualizing
+        them and rendering them into the prompt only happens once as well.
+        """
+        return list(_get_mic2e_exemplars(self.interactive))
+
+
+@lru_cache(maxsize=None)
+def _get_mic2e_exemplars(interactive: bool) -> Tuple[Exemplar, ...]:
+    return tuple(create_mic2e_exemplars(interactive=interactive))
@@ -1,16 +1,23 @@
 import re
 from copy import deepcopy
-from typing import Any, Dict, List, Union
+from typing import Annotated, Any, Dict, List, Union
 
 from chat2edit.context.strategies import ContextStrategy
 from chat2edit.context.utils import assign_context_values, path_to_value
 from chat2edit.models import Message
-from pydantic import TypeAdapter
+from pydantic import BaseModel, Discriminator, Tag, TypeAdapter
 from chat2edit.utils import to_snake_case
 
 from app.core.chat2edit.models import Box, Image, Object, Point, Scribble, Text
 from app.core.chat2edit.models.image import Entity
 from app.core.chat2edit.models.referent import Reference
+from app.core.chat2edit.utils.aesthetic_utils import prewarm_aesthetic_scores
+from app.core.chat2edit.utils.context_utils import (
+    LazyContextValue,
+    get_context_path_varname,
+    materialize_context_values,
+)
+from app.core.chat2edit.utils.segment_utils import prefetch_mask
 
 CONTEXT_VALUE_BASE_TYPE = Union[
     Image,
@@ -24,22 +31,65 @@ CONTEXT_VALUE_BASE_TYPE = Union[
     float,
     bool,
 ]
+# Fabric `type` of each entity model in CONTEXT_VALUE_BASE_TYPE
+ENTITY_TYPES = {"Group", "Image", "Rect", "Circle", "Text", "Path"}
+
+
+def _get_context_value_tag(value: Any) -> str:
+    if isinstance(value, dict):
+        entity_type = value.get("type")
+    elif isinstance(value, BaseModel):
+        entity_type = getattr(value, "type", None)
+    else:
+        return "other"
+
+    return entity_type if entity_type in ENTITY_TYPES else "other"
+
+
+# Same values as CONTEXT_VALUE_BASE_TYPE, but entities are dispatched on `type`
+# instead of being tried against every model
+CONTEXT_VALUE_TYPE = Annotated[
+    Union[
+        Annotated[Image, Tag("Group")],
+        Annotated[Object, Tag("Image")],
+        Annotated[Box, Tag("Rect")],
+        Annotated[Point, Tag("Circle")],
+        Annotated[Text, Tag("Text")],
+        Annotated[Scribble, Tag("Path")],
+        Annotated[CONTEXT_VALUE_BASE_TYPE, Tag("other")],
+    ],
+    Discriminator(_get_context_value_tag),
+]
 # Single allowed item type (value or list of values) used for filtering
-CONTEXT_ITEM_TYPE = Union[CONTEXT_VALUE_BASE_TYPE, List[CONTEXT_VALUE_BASE_TYPE]]
-CONTEXT_TYPE = Dict[str, Union[CONTEXT_VALUE_BASE_TYPE, List[CONTEXT_VALUE_BASE_TYPE]]]
+CONTEXT_ITEM_TYPE = Union[CONTEXT_VALUE_TYPE, List[CONTEXT_VALUE_TYPE]]
+CONTEXT_TYPE = Dict[str, CONTEXT_ITEM_TYPE]
+
+# Building an adapter compiles a validator, so they are created once
+CONTEXT_ITEM_ADAPTER = TypeAdapter(CONTEXT_ITEM_TYPE)
+CONTEXT_ADAPTER = TypeAdapter(CONTEXT_TYPE)
 
 
 class Mic2eContextStrategy(ContextStrategy):
-    def __init__(self) -> None:
+    def __init__(
+        self, prefetch_masks: bool = False, prewarm_aesthetic_scores: bool = False
+    ) -> None:
         super().__init__()
+        # Speculatively segment annotated boxes/points while the LLM is generating
+        self._prefetch_masks = prefetch_masks
+        # Score uploaded and returned images before apply_filter needs the scores
+        self._prewarm_aesthetic_scores = prewarm_aesthetic_scores
 
     def filter_context(self, context: Dict[str, Any]) -> Dict[str, Any]:
         filtered_context: Dict[str, Any] = {}
-        item_adapter = TypeAdapter(CONTEXT_ITEM_TYPE)
 
         for key, value in context.items():
+            # Never used, so still as validated when the context was stored
+            if isinstance(value, LazyContextValue):
+                filtered_context[key] = value
+                continue
+
             try:
-                item_adapter.validate_python(value)
+                CONTEXT_ITEM_ADAPTER.validate_python(value)
                 filtered_context[key] = value
             except Exception:
                 continue
@@ -69,6 +119,16 @@ class Mic2eContextStrategy(ContextStrategy):
                 if getattr(obj, "reference", None) is not None:
                     referenced_entity_to_image_ref[obj.reference.value] = attachment.id
 
+        if self._prefetch_masks:
+            self._prefetch_annotation_masks(
+                message.attachments, referenced_entities, referenced_entity_to_image_id
+            )
+
+        if self._prewarm_aesthetic_scores:
+            for attachment in message.attachments:
+                if isinstance(attachment, Image):
+                    prewarm_aesthetic_scores(attachment)
+
         self._remove_ephemeral_entities(message.attachments)
         referenced_varnames = assign_context_values(referenced_entities, context)
         message.text = self._contextualize_message_text(
@@ -136,6 +196,10 @@ class Mic2eContextStrategy(ContextStrategy):
             return message
 
         varnames = self._extract_varnames_from_text(message.text)
+        materialize_context_values(
+            context,
+            [get_context_path_varname(path) for path in varnames + message.attachments],
+        )
         references = self._extract_references_from_varnames(varnames, context)
         message.text = self._decontextualize_message_text(
             message.text, varnames, references
@@ -211,11 +275,36 @@ class Mic2eContextStrategy(ContextStrategy):
 
         return referenced_entities
 
+    def _prefetch_annotation_masks(
+        self,
+        attachments: List[Image],
+        entities: List[Entity],
+        entity_to_image_id: Dict[str, str],
+    ) -> None:
+        attachment_by_id = {attachment.id: attachment for attachment in attachments}
+
+        for entity in entities:
+            if not isinstance(entity, (Box, Point)):
+                continue
+
+            attachment = attachment_by_id.get(entity_to_image_id.get(entity.id))
+            if attachment is None:
+                continue
+
+            try:
+                if isinstance(entity, Box):
+                    prefetch_mask(attachment, box=entity)
+                else:
+                    prefetch_mask(attachment, point=entity)
+            except Exception:
+                # Prefetching is best-effort; segment_object falls back to a live call
+                continue
+
     def _remove_ephemeral_entities(self, attachments: List[Image]) -> None:
         for attachment in attachments:
-            for obj in attachment.get_objects():
-                if obj.ephemeral:
-                    attachment.remove_object(obj)
+            attachment.remove_objects(
+                [obj for obj in attachment.get_objects() if obj.ephemeral]
+            )
 
     def _contextualize_message_text(
         self, text: str, references: List[Reference], varnames: List[str]
@@ -0,0 +1,44 @@
+import ast
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from chat2edit.execution.strategies.impl.default_execution_strategy import (
+    DefaultExecutionStrategy,
+)
+from chat2edit.models import ExecutionError, Feedback, Message
+
+from app.core.chat2edit.utils.context_utils import materialize_context_values
+
+
+class Mic2eExecutionStrategy(DefaultExecutionStrategy):
+    """Default execution that first materializes the lazy context values it uses.
+
+    Variables are materialized when the code names them, so values loaded
+    lazily from a stored context are only validated if the program needs them.
+    """
+
+    def process(self, code: str, context: Dict[str, Any]) -> str:
+        materialize_context_values(context, _get_used_names(code))
+        return super().process(code, context)
+
+    async def execute(
+        self,
+        code: str,
+        context: Dict[str, Any],
+        on_log: Optional[Callable[[str], None]] = None,
+    ) -> Tuple[
+        Optional[ExecutionError],
+        Optional[Feedback],
+        Optional[Message],
+        List[str],
+    ]:
+        materialize_context_values(context, _get_used_names(code))
+        return await super().execute(code, context, on_log=on_log)
+
+
+def _get_used_names(code: str) -> Set[str]:
+    try:
+        tree = ast.parse(code)
+    except SyntaxError:
+        return set()
+
+    return {node.id for node in ast.walk(tree) if isinstance(node, ast.Name)}
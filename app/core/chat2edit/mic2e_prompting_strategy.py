@@ -1,5 +1,12 @@
-from chat2edit.models import Feedback
+from typing import Any, Dict, Hashable, List
+
+from chat2edit.models import ChatCycle, Exemplar, Feedback, Message
 from chat2edit.prompting.strategies import OtcPromptingStrategy
+from chat2edit.prompting.strategies.impl.otc_prompting_strategy import (
+    OTC_PROMPT_TEMPLATE,
+)
+
+from app.core.chat2edit.llms.prefixed_message import PrefixedMessage
 
 PROMPT_BASED_OBJECT_DETECTION_QUANTITY_MISMATCH_FEEDBACK_TEXT = "Expected to extract {expected_quantity} object(s) with prompt '{prompt}', but found {detected_quantity} object(s)."
 MISSING_FILTER_VALUE_FEEDBACK_TEXT = (
@@ -12,9 +19,55 @@ FILTER_VALUE_OFFSET_FROM_OPTIMAL_FEEDBACK_TEXT = (
 )
 
 
+MAX_CACHED_PROMPT_PREFIXES = 8
+
+
 class Mic2ePromptingStrategy(OtcPromptingStrategy):
     def __init__(self) -> None:
         super().__init__()
+        self._prompt_prefixes: Dict[Hashable, str] = {}
+
+    def create_prompt(
+        self,
+        cycles: List[ChatCycle],
+        exemplars: List[Exemplar],
+        context: Dict[str, Any],
+    ) -> Message:
+        # Same text as OtcPromptingStrategy.create_prompt, but the part before the
+        # current sequences (function stubs and exemplars) is rendered only once
+        prefix = self.get_prompt_prefix(exemplars, context)
+        current_otc_sequences = "\n".join(map(self.create_otc_sequence, cycles))
+        return PrefixedMessage(
+            text=prefix + current_otc_sequences, prefix_length=len(prefix)
+        )
+
+    def get_prompt_prefix(
+        self, exemplars: List[Exemplar], context: Dict[str, Any]
+    ) -> str:
+        prompting_context = self.filter_context(context)
+        # Exemplars are shared per interactive mode (see Mic2eContextProvider)
+        key = (
+            tuple(map(id, exemplars)),
+            tuple(sorted((name, id(value)) for name, value in prompting_context.items())),
+        )
+        prefix = self._prompt_prefixes.get(key)
+        if prefix is not None:
+            return prefix
+
+        exemplary_otc_sequences = "\n\n".join(
+            f"Exemplar {idx + 1}:\n{''.join(self.create_otc_sequence(cycle) for cycle in exemplar.cycles)}"
+            for idx, exemplar in enumerate(exemplars)
+        )
+        prefix = OTC_PROMPT_TEMPLATE.format(
+            context_code=self.create_context_code(prompting_context),
+            exemplary_otc_sequences=exemplary_otc_sequences,
+            current_otc_sequences="",
+        )
+
+        if len(self._prompt_prefixes) >= MAX_CACHED_PROMPT_PREFIXES:
+            self._prompt_prefixes.clear()
+        self._prompt_prefixes[key] = prefix
+        return prefix
 
     def create_feedback_text(self, feedback: Feedback) -> str:
         feedback_type = feedback.type
@@ -1,4 +1,6 @@
-from typing import Union
+from typing import Annotated, Any, Union
+
+from pydantic import Discriminator, Tag
 
 from app.core.chat2edit.models.fabric.filters.base_filter import BaseFilter
 from app.core.chat2edit.models.fabric.filters.black_white_filter import BlackWhiteFilter
@@ -8,14 +10,38 @@ from app.core.chat2edit.models.fabric.filters.contrast_filter import ContrastFil
 from app.core.chat2edit.models.fabric.filters.invert_filter import InvertFilter
 from app.core.chat2edit.models.fabric.filters.saturation_filter import SaturationFilter
 
-FabricFilter = Union[
-    BaseFilter,
-    BlackWhiteFilter,
-    BlurFilter,
-    BrightnessFilter,
-    ContrastFilter,
-    InvertFilter,
-    SaturationFilter,
+# Filter types with a dedicated model; any other type is kept as a BaseFilter
+FILTER_TYPES = {
+    "BlackWhite",
+    "Blur",
+    "Brightness",
+    "Contrast",
+    "Invert",
+    "Saturation",
+}
+
+
+def _get_filter_tag(value: Any) -> str:
+    if isinstance(value, dict):
+        filter_type = value.get("type")
+    else:
+        filter_type = getattr(value, "type", None)
+
+    return filter_type if filter_type in FILTER_TYPES else "BaseFilter"
+
+
+# Dispatch on `type` so that each filter is validated against one model only
+FabricFilter = Annotated[
+    Union[
+        Annotated[BaseFilter, Tag("BaseFilter")],
+        Annotated[BlackWhiteFilter, Tag("BlackWhite")],
+        Annotated[BlurFilter, Tag("Blur")],
+        Annotated[BrightnessFilter, Tag("Brightness")],
+        Annotated[ContrastFilter, Tag("Contrast")],
+        Annotated[InvertFilter, Tag("Invert")],
+        Annotated[SaturationFilter, Tag("Saturation")],
+    ],
+    Discriminator(_get_filter_tag),
 ]
 
 __all__ = [
@@ -1,9 +1,12 @@
-from typing import List, Literal, Optional
+from typing import List, Literal, Optional, Tuple
 
-from pydantic import Field
+from PIL.Image import Image as PILImage
+from pydantic import Field, PrivateAttr
 
 from app.core.chat2edit.models.fabric.filters import FabricFilter
 from app.core.chat2edit.models.fabric.objects.fabric_object import FabricObject
+from app.utils.filter_utils import get_filtered_image
+from app.utils.image_utils import get_data_url_digest
 
 
 class FabricImage(FabricObject):
@@ -27,3 +30,18 @@ class FabricImage(FabricObject):
     # Override default dimensions
     width: float = Field(default=200, description="Image width")
     height: float = Field(default=300, description="Image height")
+
+    # `src` and its digest, computed again only when `src` is replaced
+    _src_digest: Optional[Tuple[str, str]] = PrivateAttr(default=None)
+
+    def get_src_digest(self) -> str:
+        if self._src_digest is None or self._src_digest[0] is not self.src:
+            self._src_digest = (self.src, get_data_url_digest(self.src))
+        return self._src_digest[1]
+
+    def get_image(self) -> PILImage:
+        """The image's own pixels with its filters applied, cached by content."""
+        if not self.src:
+            raise ValueError("No image src found")
+
+        return get_filtered_image(self.src, self.filters, self.get_src_digest())
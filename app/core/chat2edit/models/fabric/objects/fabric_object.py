@@ -1,7 +1,17 @@
-from typing import Optional
+from typing import Any, Dict, Optional
 
-from pydantic import BaseModel, Field
+from pydantic import (
+    BaseModel,
+    Field,
+    SerializationInfo,
+    SerializerFunctionWrapHandler,
+    model_serializer,
+)
 
+from app.core.chat2edit.models.fabric.serialization import (
+    compact_fabric_dump,
+    is_compact,
+)
 from app.utils.factories import create_uuid4
 
 
@@ -61,3 +71,12 @@ class FabricObject(BaseModel):
 
     class Config:
         extra = "allow"  # Allow additional fields for extensibility
+
+    @model_serializer(mode="wrap")
+    def _serialize(
+        self, handler: SerializerFunctionWrapHandler, info: SerializationInfo
+    ) -> Dict[str, Any]:
+        data = handler(self)
+        if is_compact(info):
+            data = compact_fabric_dump(self, data)
+        return data
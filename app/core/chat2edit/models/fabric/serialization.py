@@ -0,0 +1,52 @@
+from typing import Any, Dict, Type
+
+from pydantic import BaseModel, SerializationInfo
+
+# Pass as `context` to `model_dump`/`dump_json` to omit Fabric.js defaults
+COMPACT_CONTEXT = {"compact": True}
+
+# Always kept: the discriminator used to parse the object back
+_ALWAYS_KEPT_FIELDS = {"type"}
+
+# Default field values by model class
+_default_values: Dict[Type[BaseModel], Dict[str, Any]] = {}
+
+
+def is_compact(info: SerializationInfo) -> bool:
+    return isinstance(info.context, dict) and bool(info.context.get("compact"))
+
+
+def compact_fabric_dump(model: BaseModel, data: Dict[str, Any]) -> Dict[str, Any]:
+    """Drop the fields of a dumped Fabric model that hold their default value.
+
+    Parsing the result with the same model restores every dropped field, so
+    dumping it again in full gives the original Fabric.js JSON.
+    """
+    defaults = _get_default_values(type(model))
+    return {
+        key: value
+        for key, value in data.items()
+        if key in _ALWAYS_KEPT_FIELDS or key not in defaults or defaults[key] != value
+    }
+
+
+def _get_default_values(model_class: Type[BaseModel]) -> Dict[str, Any]:
+    defaults = _default_values.get(model_class)
+    if defaults is not None:
+        return defaults
+
+    defaults = {}
+    for name, field in model_class.model_fields.items():
+        if field.is_required():
+            continue
+        if field.default_factory is not None:
+            # Factory defaults (ids, nested models) are only dropped when empty
+            default = field.default_factory()
+            if default not in ([], {}):
+                continue
+        else:
+            default = field.default
+        defaults[field.alias or name] = default
+
+    _default_values[model_class] = defaults
+    return defaults
@@ -1,69 +1,33 @@
-from typing import Annotated, ClassVar, List, Optional, Union
+from typing import Annotated, ClassVar, Iterable, List, Optional, Union
 
-from PIL import ImageEnhance, ImageFilter, ImageOps
 from PIL.Image import Image as PILImage
-from pydantic import Field
+from pydantic import Field, PrivateAttr
 
 from app.core.chat2edit.models.box import Box
 from app.core.chat2edit.models.fabric.filters import FabricFilter
-from app.core.chat2edit.models.fabric.filters.black_white_filter import BlackWhiteFilter
-from app.core.chat2edit.models.fabric.filters.blur_filter import BlurFilter
-from app.core.chat2edit.models.fabric.filters.brightness_filter import BrightnessFilter
-from app.core.chat2edit.models.fabric.filters.contrast_filter import ContrastFilter
-from app.core.chat2edit.models.fabric.filters.invert_filter import InvertFilter
-from app.core.chat2edit.models.fabric.filters.saturation_filter import SaturationFilter
 from app.core.chat2edit.models.fabric.objects import (
     FabricGroup,
     FabricImage,
     FabricObject,
 )
 from app.core.chat2edit.models.object import Object
+from app.core.chat2edit.models.object_index import (
+    BBox,
+    ObjectIndex,
+    get_object_geometry,
+)
 from app.core.chat2edit.models.point import Point
 from app.core.chat2edit.models.referent import Referent
 from app.core.chat2edit.models.scribble import Scribble
 from app.core.chat2edit.models.text import Text
 from app.utils.factories import create_image_filename
-from app.utils.image_utils import convert_data_url_to_image, convert_image_to_data_url
+from app.utils.image_utils import convert_image_to_data_url
 
 Entity: ClassVar = Annotated[
     Union["Image", Object, Box, Point, Scribble, Text], Field(discriminator="type")
 ]
 
 
-def _apply_filter_to_pil_image(image: PILImage, filter: FabricFilter) -> PILImage:
-    """
-    Apply a filter to a PIL image.
-    
-    Filter values are in range [-1.0, 1.0], which corresponds to [-100%, +100%].
-    """
-    if isinstance(filter, BrightnessFilter):
-        enhancer = ImageEnhance.Brightness(image)
-        factor = 1.0 + filter.brightness  # brightness in [-1.0, 1.0] -> factor in [0.0, 2.0]
-        return enhancer.enhance(factor)
-    elif isinstance(filter, ContrastFilter):
-        enhancer = ImageEnhance.Contrast(image)
-        factor = 1.0 + filter.contrast  # contrast in [-1.0, 1.0] -> factor in [0.0, 2.0]
-        return enhancer.enhance(factor)
-    elif isinstance(filter, SaturationFilter):
-        enhancer = ImageEnhance.Color(image)
-        factor = 1.0 + filter.saturation  # saturation in [-1.0, 1.0] -> factor in [0.0, 2.0]
-        return enhancer.enhance(factor)
-    elif isinstance(filter, BlurFilter):
-        # Blur filter value in [-1.0, 1.0] -> radius in [0, ~10]
-        # Convert to positive radius (0 means no blur, positive means blur)
-        radius = max(0, abs(filter.blur) * 10)
-        if radius > 0:
-            return image.filter(ImageFilter.GaussianBlur(radius=radius))
-        return image
-    elif isinstance(filter, InvertFilter):
-        return ImageOps.invert(image.convert('RGB')).convert(image.mode)
-    elif isinstance(filter, BlackWhiteFilter):
-        return image.convert('L').convert('RGB')
-    else:
-        # Unknown filter type, return original image
-        return image
-
-
 class Image(FabricGroup, Referent):
     src: Optional[str] = Field(default=None, description="Image source URL or data")
     filename: str = Field(
@@ -79,6 +43,9 @@ class Image(FabricGroup, Referent):
         description="Track if aesthetic feedback has been given for this image"
     )
 
+    # Built on first use; rebuilt if `objects` is replaced or changed directly
+    _object_index: Optional[ObjectIndex] = PrivateAttr(default=None)
+
     def from_image(image: PILImage) -> "Image":
         base_image = FabricImage(
             src=convert_image_to_data_url(image), width=image.width, height=image.height
@@ -97,39 +64,90 @@ class Image(FabricGroup, Referent):
         if len(self.objects) == 0 or not isinstance(self.objects[0], FabricImage):
             raise ValueError("No base image found")
 
-        if not self.objects[0].src:
-            raise ValueError("No image src found")
-
-        # Get the base image
-        pil_image = convert_data_url_to_image(self.objects[0].src)
-        
-        # Apply all filters in sequence
-        base_image = self.objects[0]
-        for filter in base_image.filters:
-            pil_image = _apply_filter_to_pil_image(pil_image, filter)
-        
-        return pil_image
+        # Filtered images are RGB, or RGBA with alpha; unfiltered ones keep their mode
+        return self.objects[0].get_image()
 
     def get_objects(self) -> List[FabricObject]:
         return self.objects[1:] if len(self.objects) > 1 else []
 
+    def get_object(self, object_id: str) -> Optional[FabricObject]:
+        position = self._get_object_index().position_of(object_id)
+        return self.objects[position] if position is not None else None
+
+    def get_objects_by_ids(self, object_ids: Iterable[str]) -> List[FabricObject]:
+        """Child objects (excluding the base image) with these ids, in stacking order."""
+        index = self._get_object_index()
+        positions = sorted(
+            position
+            for object_id in set(object_ids)
+            if (position := index.position_of(object_id)) is not None and position > 0
+        )
+        return [self.objects[position] for position in positions]
+
+    def get_objects_with_geometry(self, object: FabricObject) -> List[FabricObject]:
+        """Child objects with exactly the same position and size as `object`."""
+        index = self._get_object_index()
+        return self.get_objects_by_ids(
+            index.ids_with_geometry(get_object_geometry(object))
+        )
+
+    def get_objects_overlapping(self, bbox: BBox) -> List[FabricObject]:
+        """Child objects whose bounding box may intersect `bbox`.
+
+        `bbox` is (left, top, right, bottom) relative to the image center; the
+        result can include objects that are close to but outside of it.
+        """
+        return self.get_objects_by_ids(self._get_object_index().ids_overlapping(bbox))
+
     def add_object(self, object: FabricObject) -> "Image":
+        index = self._get_object_index()
         self.objects.append(object)
+        index.add(object, len(self.objects) - 1)
         return self
 
     def add_objects(self, objects: List[FabricObject]) -> "Image":
-        self.objects.extend(objects)
+        for object in objects:
+            self.add_object(object)
         return self
 
-    def remove_object(self, object: FabricObject) -> "Image":
-        self.objects = [obj for obj in self.objects if obj.id != object.id]
+    def update_object(self, object: FabricObject) -> "Image":
+        """Re-index a child object after changing its position, size or transform."""
+        self._get_object_index().update(object)
+        return self
+
+    def update_objects(self, objects: List[FabricObject]) -> "Image":
+        index = self._get_object_index()
+        for object in objects:
+            index.update(object)
         return self
 
+    def remove_object(self, object: FabricObject) -> "Image":
+        return self.remove_objects([object])
+
     def remove_objects(self, objects: List[FabricObject]) -> "Image":
-        object_ids = set([obj.id for obj in objects])
-        self.objects = [obj for obj in self.objects if obj.id not in object_ids]
+        index = self._get_object_index()
+        object_ids = set(obj.id for obj in objects)
+        positions = sorted(
+            (
+                position
+                for object_id in object_ids
+                if (position := index.position_of(object_id)) is not None
+            ),
+            reverse=True,
+        )
+        for position in positions:
+            del self.objects[position]
+
+        index.remove(object_ids)
         return self
 
+    def _get_object_index(self) -> ObjectIndex:
+        if self._object_index is None or not self._object_index.is_current(
+            self.objects
+        ):
+            self._object_index = ObjectIndex(self.objects)
+        return self._object_index
+
     def apply_filter(self, filter: FabricFilter) -> "Image":
         for object in self.objects:
             if isinstance(object, FabricImage):
@@ -0,0 +1,163 @@
+import math
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from app.core.chat2edit.models.fabric.objects import FabricObject
+
+ORIGIN_OFFSETS = {"left": 0.0, "top": 0.0, "center": 0.5, "right": 1.0, "bottom": 1.0}
+
+# Side of a grid cell, in image pixels
+DEFAULT_CELL_SIZE = 128
+# Objects covering more cells are kept in a list checked by every query
+MAX_OBJECT_CELLS = 1024
+
+BBox = Tuple[float, float, float, float]
+Geometry = Tuple[float, float, float, float]
+Cell = Tuple[int, int]
+
+
+def get_object_geometry(obj: FabricObject) -> Geometry:
+    """Exact position and size, used to recognise the same object added twice."""
+    return (obj.left, obj.top, obj.width, obj.height)
+
+
+def get_object_bbox(obj: FabricObject) -> BBox:
+    """Axis-aligned (left, top, right, bottom) box containing the object.
+
+    Coordinates are relative to the image center, like the object positions.
+    Rotated or skewed objects get a box around the circle they can sweep, which
+    is never smaller than the exact one.
+    """
+    width = obj.width * abs(obj.scaleX)
+    height = obj.height * abs(obj.scaleY)
+    left = obj.left - ORIGIN_OFFSETS.get(obj.originX, 0.5) * width
+    top = obj.top - ORIGIN_OFFSETS.get(obj.originY, 0.5) * height
+
+    if obj.angle % 360 == 0 and obj.skewX == 0 and obj.skewY == 0:
+        return (left, top, left + width, top + height)
+
+    center_x, center_y = left + width / 2, top + height / 2
+    radius = math.hypot(width, height) / 2 * (
+        1 + abs(math.tan(math.radians(obj.skewX))) + abs(math.tan(math.radians(obj.skewY)))
+    )
+    return (center_x - radius, center_y - radius, center_x + radius, center_y + radius)
+
+
+class ObjectIndex:
+    """Lookup structures over the children of an image.
+
+    Keeps the position of each object id, the ids per exact geometry and a
+    uniform grid over object bounding boxes, so that lookups by id, duplicate
+    checks and overlap queries do not scan every child.
+    """
+
+    def __init__(
+        self, objects: List[FabricObject], cell_size: int = DEFAULT_CELL_SIZE
+    ) -> None:
+        # The indexed list, to detect when it is replaced or changed directly
+        self.objects = objects
+        self.size = 0
+        self._cell_size = cell_size
+        self._positions: Dict[str, int] = {}
+        self._geometries: Dict[str, Geometry] = {}
+        self._cells: Dict[str, List[Cell]] = {}
+        self._ids_by_geometry: Dict[Geometry, Set[str]] = defaultdict(set)
+        self._ids_by_cell: Dict[Cell, Set[str]] = defaultdict(set)
+        self._oversized_ids: Set[str] = set()
+
+        for position, obj in enumerate(objects):
+            self.add(obj, position)
+
+    def is_current(self, objects: List[FabricObject]) -> bool:
+        return objects is self.objects and len(objects) == self.size
+
+    def position_of(self, object_id: str) -> Optional[int]:
+        return self._positions.get(object_id)
+
+    def ids_with_geometry(self, geometry: Geometry) -> Set[str]:
+        return set(self._ids_by_geometry.get(geometry, ()))
+
+    def ids_overlapping(self, bbox: BBox) -> Set[str]:
+        """Ids of objects whose grid cells intersect `bbox` (a superset of overlaps)."""
+        cells = self._get_cells(bbox)
+        if cells is None:
+            return set(self._positions)
+
+        ids = set(self._oversized_ids)
+        for cell in cells:
+            ids.update(self._ids_by_cell.get(cell, ()))
+        return ids
+
+    def add(self, obj: FabricObject, position: int) -> None:
+        if obj.id in self._geometries:
+            self._unindex_geometry(obj.id)
+        self._positions[obj.id] = position
+        self._index_geometry(obj)
+        self.size += 1
+
+    def update(self, obj: FabricObject) -> None:
+        """Re-index an object after it was moved, resized or transformed."""
+        if obj.id not in self._positions:
+            return
+
+        self._unindex_geometry(obj.id)
+        self._index_geometry(obj)
+
+    def remove(self, object_ids: Iterable[str]) -> None:
+        """Forget removed objects and shift the positions of those after them."""
+        first_position = None
+        for object_id in object_ids:
+            position = self._positions.pop(object_id, None)
+            if position is None:
+                continue
+
+            self._unindex_geometry(object_id)
+            self.size -= 1
+            if first_position is None or position < first_position:
+                first_position = position
+
+        if first_position is not None:
+            for position in range(first_position, len(self.objects)):
+                self._positions[self.objects[position].id] = position
+
+    def _index_geometry(self, obj: FabricObject) -> None:
+        geometry = get_object_geometry(obj)
+        cells = self._get_cells(get_object_bbox(obj))
+
+        self._geometries[obj.id] = geometry
+        self._ids_by_geometry[geometry].add(obj.id)
+        if cells is None:
+            self._oversized_ids.add(obj.id)
+            cells = []
+        self._cells[obj.id] = cells
+        for cell in cells:
+            self._ids_by_cell[cell].add(obj.id)
+
+    def _unindex_geometry(self, object_id: str) -> None:
+        geometry = self._geometries.pop(object_id)
+        ids = self._ids_by_geometry[geometry]
+        ids.discard(object_id)
+        if not ids:
+            del self._ids_by_geometry[geometry]
+
+        self._oversized_ids.discard(object_id)
+        for cell in self._cells.pop(object_id):
+            ids = self._ids_by_cell[cell]
+            ids.discard(object_id)
+            if not ids:
+                del self._ids_by_cell[cell]
+
+    def _get_cells(self, bbox: BBox) -> Optional[List[Cell]]:
+        """Grid cells covered by `bbox`, or None if there are too many."""
+        if not all(math.isfinite(value) for value in bbox):
+            return None
+
+        left, top, right, bottom = (
+            math.floor(value / self._cell_size) for value in bbox
+        )
+        if (right - left + 1) * (bottom - top + 1) > MAX_OBJECT_CELLS:
+            return None
+
+        return [
+            (x, y) for x in range(left, right + 1) for y in range(top, bottom + 1)
+        ]
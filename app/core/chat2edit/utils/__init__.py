@@ -5,6 +5,7 @@ from app.core.chat2edit.utils.inpaint_utils import (
     inpaint_objects_with_prompt,
     inpaint_uninpainted_objects_in_entities,
 )
+from app.core.chat2edit.utils.render_utils import render_image
 
 __all__ = [
     "get_own_objects",
@@ -13,4 +14,5 @@ __all__ = [
     "inpaint_objects_with_prompt",
     "inpaint_uninpainted_objects_in_entities",
     "create_composite_mask",
+    "render_image",
 ]
@@ -0,0 +1,93 @@
+import asyncio
+import logging
+from typing import Dict, Optional
+
+from app.clients.inference_client import inference_client
+from app.core.chat2edit.models import Image
+from app.core.chat2edit.utils.image_utils import get_image_fingerprint
+from app.env import AESTHETIC_PREWARM_ENABLED, AESTHETIC_SCORE_TIMEOUT
+from app.utils.caches import LruCache
+from app.utils.filter_utils import get_filtered_image
+
+logger = logging.getLogger(__name__)
+
+# Scoring tasks by image version, so each version is scored at most once
+_aesthetic_scores: LruCache[asyncio.Task] = LruCache(max_size=256)
+
+
+async def get_aesthetic_scores(
+    image: Image, timeout: float = AESTHETIC_SCORE_TIMEOUT
+) -> Optional[Dict[str, float]]:
+    """Aesthetic scores of the image as `image.get_image()` returns it.
+
+    Scores are cached per image version (base pixels and filters). Waits at most
+    `timeout` seconds and returns None if the scores are not available by then;
+    scoring carries on in the background, so a later call can still use them.
+
+    With AESTHETIC_PREWARM_ENABLED, versions are scored ahead of time by
+    `prewarm_aesthetic_scores` and this never waits: scores that are not ready
+    yet are treated as unavailable.
+    """
+    task = _get_scoring_task(image)
+    if task is None:
+        return None
+
+    if AESTHETIC_PREWARM_ENABLED:
+        if not task.done() or task.cancelled() or task.exception() is not None:
+            return None
+        return task.result()
+
+    try:
+        return await asyncio.wait_for(asyncio.shield(task), timeout)
+    except asyncio.TimeoutError:
+        logger.info("Aesthetic scores not ready in time, skipping")
+    except Exception:
+        pass
+
+    return None
+
+
+def prewarm_aesthetic_scores(image: Image) -> None:
+    """Start scoring a new image version in the background (AESTHETIC_PREWARM_ENABLED)."""
+    if not AESTHETIC_PREWARM_ENABLED:
+        return
+
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return
+
+    _get_scoring_task(image)
+
+
+def _get_scoring_task(image: Image) -> Optional[asyncio.Task]:
+    try:
+        key = get_image_fingerprint(image)
+    except (ValueError, AttributeError):
+        return None
+
+    task = _aesthetic_scores.get(key)
+    if task is not None:
+        return task
+
+    # Snapshot the version now, as the image may be edited while it is scored
+    base_image = image.objects[0]
+    src, filters = base_image.src, list(base_image.filters)
+    src_digest = base_image.get_src_digest()
+
+    async def _score() -> Dict[str, float]:
+        pil_image = await asyncio.to_thread(get_filtered_image, src, filters, src_digest)
+        return await inference_client.aesthetic_regressor_score(pil_image)
+
+    task = asyncio.get_running_loop().create_task(_score())
+    task.add_done_callback(lambda task: _forget_failed_task(key, task))
+    _aesthetic_scores.set(key, task)
+    return task
+
+
+def _forget_failed_task(key: str, task: asyncio.Task) -> None:
+    if task.cancelled() or task.exception() is not None:
+        if not task.cancelled():
+            logger.warning(f"Aesthetic scoring failed: {task.exception()}")
+        if _aesthetic_scores.get(key) is task:
+            _aesthetic_scores.pop(key)
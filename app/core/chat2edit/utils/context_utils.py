@@ -0,0 +1,159 @@
+import base64
+import json
+import re
+import struct
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Tuple, Union
+
+# File signature of binary contexts; the last byte is the format version
+CONTEXT_CONTAINER_MAGIC = b"MIC2ECX\x01"
+
+_LENGTH = struct.Struct("<Q")
+_SECTION_KEY = "$section"
+
+Buffer = Union[bytes, bytearray, memoryview]
+
+
+class LazyContextValue:
+    """Stored context value that is only validated once the program uses it.
+
+    Has no `__dict__`, so code inspecting context values (such as the async
+    call corrector) does not walk into it.
+    """
+
+    __slots__ = ("raw", "_parse")
+
+    def __init__(self, raw: Any, parse: Callable[[Any], Any]) -> None:
+        self.raw = raw
+        self._parse = parse
+
+    def materialize(self) -> Any:
+        return self._parse(self.raw)
+
+
+def create_lazy_context(
+    tree: Dict[str, Any], parse: Callable[[Any], Any]
+) -> Dict[str, Any]:
+    """Wrap the models and lists of a JSON-able context dump; primitives are kept."""
+    return {
+        key: LazyContextValue(value, parse) if isinstance(value, (dict, list)) else value
+        for key, value in tree.items()
+    }
+
+
+def materialize_context_values(context: Dict[str, Any], varnames: Iterable[str]) -> None:
+    """Replace the lazy values of the given variables by their models, in place."""
+    for varname in varnames:
+        value = context.get(varname)
+        if isinstance(value, LazyContextValue):
+            context[varname] = value.materialize()
+
+
+def get_context_path_varname(path: str) -> str:
+    """Variable holding the value at a context path, e.g. `image_0.objects[1]`."""
+    return re.split(r"[.\[]", path, maxsplit=1)[0]
+
+
+def get_raw_context(context: Dict[str, Any]) -> Dict[str, Any]:
+    """Context to dump, with lazy values that were never used left as stored."""
+    return {
+        key: value.raw if isinstance(value, LazyContextValue) else value
+        for key, value in context.items()
+    }
+
+
+def is_context_container(data: Buffer) -> bool:
+    return bytes(data[: len(CONTEXT_CONTAINER_MAGIC)]) == CONTEXT_CONTAINER_MAGIC
+
+
+def pack_context_container(tree: Any) -> bytes:
+    """Pack a JSON-able context dump, storing image sources as raw bytes.
+
+    Layout: magic, length-prefixed JSON header, then one length-prefixed
+    section per distinct `src` data URL, holding the decoded PNG/WebP bytes.
+    In the header, each `src` is replaced by {"$section": index}.
+    """
+    return b"".join(iter_context_container(tree))
+
+
+def iter_context_container(tree: Any) -> Iterator[bytes]:
+    """`pack_context_container` in parts, decoding one section at a time."""
+    mime_types: List[str] = []
+    sources: List[str] = []
+    indices: Dict[str, int] = {}
+
+    def _extract(value: Any) -> Any:
+        if isinstance(value, list):
+            return [_extract(item) for item in value]
+        if not isinstance(value, dict):
+            return value
+
+        result = {}
+        for key, item in value.items():
+            if key == "src" and isinstance(item, str) and _is_base64_data_url(item):
+                index = indices.get(item)
+                if index is None:
+                    index = indices[item] = len(sources)
+                    mime_types.append(item[len("data:") : item.index(";base64,")])
+                    sources.append(item)
+                result[key] = {_SECTION_KEY: index}
+            else:
+                result[key] = _extract(item)
+        return result
+
+    header = json.dumps(
+        {"sections": mime_types, "context": _extract(tree)}, separators=(",", ":")
+    ).encode("utf-8")
+
+    yield CONTEXT_CONTAINER_MAGIC + _LENGTH.pack(len(header))
+    yield header
+    for source in sources:
+        section = base64.b64decode(source[source.index(";base64,") + len(";base64,") :])
+        yield _LENGTH.pack(len(section))
+        yield section
+
+
+def unpack_context_container(data: Buffer) -> Any:
+    """Inverse of `pack_context_container`, with image sources as data URLs again.
+
+    Sections are sliced from `data` without copying, so it can be an `mmap`.
+    Pixels are not decoded here; that happens when an image is first rendered.
+    """
+    if not is_context_container(data):
+        raise ValueError("Not a binary context")
+
+    view = memoryview(data)
+    offset = len(CONTEXT_CONTAINER_MAGIC)
+    header_bytes, offset = _read_section(view, offset)
+    header = json.loads(bytes(header_bytes))
+
+    sources: List[str] = []
+    for mime_type in header["sections"]:
+        section, offset = _read_section(view, offset)
+        encoded = base64.b64encode(section).decode("ascii")
+        sources.append(f"data:{mime_type};base64,{encoded}")
+
+    def _restore(value: Any) -> Any:
+        if isinstance(value, list):
+            return [_restore(item) for item in value]
+        if not isinstance(value, dict):
+            return value
+        if len(value) == 1 and _SECTION_KEY in value:
+            return sources[value[_SECTION_KEY]]
+        return {key: _restore(item) for key, item in value.items()}
+
+    return _restore(header["context"])
+
+
+def _read_section(view: memoryview, offset: int) -> Tuple[memoryview, int]:
+    if offset + _LENGTH.size > len(view):
+        raise ValueError("Truncated binary context")
+
+    (length,) = _LENGTH.unpack_from(view, offset)
+    start = offset + _LENGTH.size
+    if start + length > len(view):
+        raise ValueError("Truncated binary context")
+    return view[start : start + length], start + length
+
+
+def _is_base64_data_url(value: str) -> bool:
+    return value.startswith("data:") and ";base64," in value[:64]
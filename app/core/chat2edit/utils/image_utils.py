@@ -1,22 +1,75 @@
-from typing import List
-from app.core.chat2edit.models import Image
-from app.core.chat2edit.models.fabric.objects import FabricObject
+import hashlib
+from typing import List, Set
+
+from app.core.chat2edit.models import Image, Object
+from app.core.chat2edit.models.fabric.objects import FabricImage, FabricObject
+from app.core.chat2edit.models.object_index import get_object_bbox
+from app.core.chat2edit.utils.mask_utils import (
+    compute_mask_iou,
+    get_mask_iou_upper_bound,
+    get_packed_mask,
+)
+from app.env import OBJECT_DEDUP_IOU_THRESHOLD
 
 
 def get_own_objects(image: Image, objects: List[FabricObject]) -> List[FabricObject]:
-    object_ids = set(obj.id for obj in objects)
-    return [obj for obj in image.get_objects() if obj.id in object_ids]
+    return image.get_objects_by_ids(obj.id for obj in objects)
 
 
 def get_same_objects(image: Image, objects: List[FabricObject]) -> List[FabricObject]:
-    coord_label_set = set(map(_get_coord_label, objects))
-    same_objects = [
-        obj for obj in image.get_objects()
-        if _get_coord_label(obj) in coord_label_set
-    ]
+    """Child objects that duplicate any of `objects`.
+
+    Objects with exactly the same position and size are duplicates, and so are
+    segmented objects whose masks overlap with an IoU of at least
+    OBJECT_DEDUP_IOU_THRESHOLD, e.g. the same cat segmented from a slightly
+    different box.
+    """
+    same_object_ids = set(
+        same_object.id
+        for obj in objects
+        for same_object in image.get_objects_with_geometry(obj)
+    )
+    if OBJECT_DEDUP_IOU_THRESHOLD > 0:
+        for obj in objects:
+            same_object_ids.update(_get_overlapping_mask_ids(image, obj))
+
+    return image.get_objects_by_ids(same_object_ids)
+
+
+def get_image_fingerprint(image: Image) -> str:
+    """Hash the base image pixels and filters, i.e. what `image.get_image()` returns."""
+    if len(image.objects) == 0 or not isinstance(image.objects[0], FabricImage):
+        raise ValueError("No base image found")
+
+    base_image = image.objects[0]
+    hasher = hashlib.blake2b(base_image.get_src_digest().encode("utf-8"), digest_size=16)
+    for filter in base_image.filters:
+        hasher.update(filter.model_dump_json().encode("utf-8"))
+
+    return hasher.hexdigest()
+
+
+
+def _get_overlapping_mask_ids(image: Image, obj: FabricObject) -> Set[str]:
+    if not isinstance(obj, Object):
+        return set()
+
+    mask = get_packed_mask(obj)
+    if mask is None:
+        return set()
 
-    return same_objects
+    ids = set()
+    # Grid cells and the area bound leave few candidates for the exact IoU
+    for candidate in image.get_objects_overlapping(get_object_bbox(obj)):
+        if not isinstance(candidate, Object) or candidate.id == obj.id:
+            continue
 
+        candidate_mask = get_packed_mask(candidate)
+        if candidate_mask is None:
+            continue
+        if get_mask_iou_upper_bound(mask, candidate_mask) < OBJECT_DEDUP_IOU_THRESHOLD:
+            continue
+        if compute_mask_iou(mask, candidate_mask) >= OBJECT_DEDUP_IOU_THRESHOLD:
+            ids.add(candidate.id)
 
-def _get_coord_label(obj: FabricObject) -> str:
-    return f"{obj.left}-{obj.top}-{obj.width}-{obj.height}"
\ No newline at end of file
+    return ids
@@ -1,6 +1,7 @@
-from typing import List, Union
+from typing import Awaitable, Callable, List, Optional, Tuple, Union
 
 from PIL import Image as PILImage
+from PIL import ImageFilter
 
 from app.clients.inference_client import inference_client
 from app.core.chat2edit.models.box import Box
@@ -8,18 +9,33 @@ from app.core.chat2edit.models.image import Image
 from app.core.chat2edit.models.object import Object
 from app.core.chat2edit.models.point import Point
 from app.core.chat2edit.models.text import Text
+from app.core.chat2edit.utils.aesthetic_utils import prewarm_aesthetic_scores
+from app.env import (
+    INPAINT_REGION_ENABLED,
+    INPAINT_REGION_FEATHER,
+    INPAINT_REGION_PADDING,
+    INPAINT_REGION_SIZE,
+)
 from app.utils.image_utils import convert_data_url_to_image, expand_mask_image
 
+# Above this fraction of the frame, inpainting the full image is just as cheap
+MAX_INPAINT_REGION_AREA_RATIO = 0.7
+
 
 async def inpaint_objects(image: Image, objects: List[Object]) -> Image:
     composite_mask = create_composite_mask(image, objects)
     expanded_mask = expand_mask_image(composite_mask)
     pil_image = image.get_image()
 
-    inpainted_image = await inference_client.object_clear_inpaint(
-        pil_image, expanded_mask, "remove the instance of the object"
+    inpainted_image = await inpaint_region(
+        pil_image,
+        expanded_mask,
+        lambda region_image, region_mask: inference_client.object_clear_inpaint(
+            region_image, region_mask, "remove the instance of the object"
+        ),
     )
     image.set_image(inpainted_image)
+    prewarm_aesthetic_scores(image)
 
     for object in objects:
         object.inpainted = True
@@ -44,13 +60,18 @@ async def inpaint_objects_with_prompt(
     expanded_mask = expand_mask_image(composite_mask)
     pil_image = image.get_image()
 
-    inpainted_image = await inference_client.sd_inpaint(
-        image=pil_image,
-        mask=expanded_mask,
-        prompt=prompt,
+    inpainted_image = await inpaint_region(
+        pil_image,
+        expanded_mask,
+        lambda region_image, region_mask: inference_client.sd_inpaint(
+            image=region_image,
+            mask=region_mask,
+            prompt=prompt,
+        ),
     )
 
     image.set_image(inpainted_image)
+    prewarm_aesthetic_scores(image)
 
     for object in objects:
         object.inpainted = True
@@ -89,3 +110,79 @@ def create_composite_mask(image: Image, objects: List[Object]) -> PILImage.Image
         )
 
     return mask
+
+
+async def inpaint_region(
+    image: PILImage.Image,
+    mask: PILImage.Image,
+    inpaint: Callable[[PILImage.Image, PILImage.Image], Awaitable[PILImage.Image]],
+) -> PILImage.Image:
+    """Inpaint `mask` in `image` with `inpaint`, sending only the area around the mask.
+
+    With INPAINT_REGION_ENABLED, a context window around the mask bounding box is
+    cropped, resized to INPAINT_REGION_SIZE if larger, inpainted and feathered
+    back into the image; pixels outside the mask are kept. Otherwise, or when the
+    window would cover most of the frame, the full image is inpainted.
+    """
+    if not INPAINT_REGION_ENABLED:
+        return await inpaint(image, mask)
+
+    mask = mask.convert("L")
+    window = _get_inpaint_window(mask.getbbox(), image.size)
+    if window is None:
+        return await inpaint(image, mask)
+
+    window_size = (window[2] - window[0], window[3] - window[1])
+    region_image = image.convert("RGB").crop(window)
+    region_mask = mask.crop(window)
+
+    # Diffusion models want sides that are multiples of 8
+    scale = min(1.0, INPAINT_REGION_SIZE / max(window_size))
+    model_size = (
+        max(8, round(window_size[0] * scale / 8) * 8),
+        max(8, round(window_size[1] * scale / 8) * 8),
+    )
+    inpainted_region = await inpaint(
+        region_image.resize(model_size, PILImage.Resampling.LANCZOS),
+        region_mask.resize(model_size, PILImage.Resampling.NEAREST),
+    )
+    inpainted_region = inpainted_region.convert("RGB").resize(
+        window_size, PILImage.Resampling.LANCZOS
+    )
+
+    # Grow the mask by the feather width, then soften it, so the whole masked
+    # area is replaced and the seam fades out around it
+    feather = INPAINT_REGION_FEATHER
+    blend_mask = region_mask
+    if feather > 0:
+        blend_mask = blend_mask.filter(ImageFilter.MaxFilter(2 * feather + 1))
+        blend_mask = blend_mask.filter(ImageFilter.GaussianBlur(feather / 2))
+
+    result = image.convert("RGB")
+    result.paste(
+        PILImage.composite(inpainted_region, region_image, blend_mask), window[:2]
+    )
+    return result
+
+
+def _get_inpaint_window(
+    bbox: Optional[Tuple[int, int, int, int]], image_size: Tuple[int, int]
+) -> Optional[Tuple[int, int, int, int]]:
+    """Square-ish window around `bbox`, or None if the full frame should be used."""
+    if bbox is None:
+        return None
+
+    img_width, img_height = image_size
+    bbox_width, bbox_height = bbox[2] - bbox[0], bbox[3] - bbox[1]
+    padding = INPAINT_REGION_PADDING * max(bbox_width, bbox_height)
+    width = min(img_width, max(INPAINT_REGION_SIZE, round(bbox_width + 2 * padding)))
+    height = min(img_height, max(INPAINT_REGION_SIZE, round(bbox_height + 2 * padding)))
+
+    if width * height > MAX_INPAINT_REGION_AREA_RATIO * img_width * img_height:
+        return None
+
+    # Center the window on the mask and shift it back inside the image
+    center_x, center_y = (bbox[0] + bbox[2]) / 2, (bbox[1] + bbox[3]) / 2
+    left = min(max(0, round(center_x - width / 2)), img_width - width)
+    top = min(max(0, round(center_y - height / 2)), img_height - height)
+    return left, top, left + width, top + height
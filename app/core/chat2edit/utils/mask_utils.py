@@ -0,0 +1,135 @@
+import math
+import threading
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+import numpy as np
+
+from app.core.chat2edit.models import Object
+from app.env import PACKED_MASK_CACHE_SIZE
+from app.utils.caches import LruCache
+from app.utils.image_utils import convert_data_url_to_image
+
+# Number of set bits per byte value
+_POPCOUNT = np.array([bin(value).count("1") for value in range(256)], dtype=np.uint8)
+
+
+@dataclass(frozen=True)
+class PackedMask:
+    """Object mask with one bit per pixel, aligned to whole bytes of image columns.
+
+    Row `y` of `bits` covers image row `top + y`, and byte `x` covers image
+    columns `8 * (byte_left + x)` to `8 * (byte_left + x) + 7`, so two masks can
+    be intersected by slicing bytes without shifting bits.
+    """
+
+    bits: np.ndarray
+    top: int
+    byte_left: int
+    count: int
+
+    @property
+    def bbox(self) -> Tuple[int, int, int, int]:
+        """(left, top, right, bottom) in image pixels, byte-aligned horizontally."""
+        return (
+            self.byte_left * 8,
+            self.top,
+            (self.byte_left + self.bits.shape[1]) * 8,
+            self.top + self.bits.shape[0],
+        )
+
+
+# Packed masks by object source digest and position
+_packed_masks: LruCache[PackedMask] = LruCache(
+    max_bytes=PACKED_MASK_CACHE_SIZE * 1024 * 1024, get_size=lambda mask: mask.bits.nbytes
+)
+_packed_masks_lock = threading.Lock()
+
+
+def get_packed_mask(obj: Object) -> Optional[PackedMask]:
+    """Bit-packed alpha mask of a segmented object, or None if it is transformed.
+
+    Positions are in pixels from the image center, as the object's `left`/`top`;
+    only the relative placement of two masks matters for their IoU.
+    """
+    if not obj.src or not _is_untransformed(obj):
+        return None
+
+    left = math.floor(obj.left - obj.width / 2)
+    top = math.floor(obj.top - obj.height / 2)
+    key = (obj.get_src_digest(), left, top)
+    with _packed_masks_lock:
+        packed_mask = _packed_masks.get(key)
+    if packed_mask is not None:
+        return packed_mask
+
+    alpha = np.asarray(convert_data_url_to_image(obj.src).convert("RGBA").getchannel("A"))
+    # Pad on the left so that byte boundaries fall on multiples of 8 columns
+    padding = left % 8
+    mask = np.pad(alpha > 0, ((0, 0), (padding, 0)))
+    bits = np.packbits(mask, axis=1)
+    packed_mask = PackedMask(
+        bits=bits,
+        top=top,
+        byte_left=(left - padding) // 8,
+        count=int(_POPCOUNT[bits].sum(dtype=np.int64)),
+    )
+
+    with _packed_masks_lock:
+        _packed_masks.set(key, packed_mask)
+    return packed_mask
+
+
+def get_mask_iou_upper_bound(a: PackedMask, b: PackedMask) -> float:
+    """Cheap upper bound of `compute_mask_iou`, from mask areas and boxes only.
+
+    IoU = I / (|a| + |b| - I), and I is at most min(|a|, |b|, overlap area).
+    """
+    intersection_box = _intersect_boxes(a.bbox, b.bbox)
+    if intersection_box is None or a.count == 0 or b.count == 0:
+        return 0.0
+
+    left, top, right, bottom = intersection_box
+    max_intersection = min(a.count, b.count, (right - left) * (bottom - top))
+    return max_intersection / (a.count + b.count - max_intersection)
+
+
+def compute_mask_iou(a: PackedMask, b: PackedMask) -> float:
+    intersection_box = _intersect_boxes(a.bbox, b.bbox)
+    if intersection_box is None or a.count == 0 or b.count == 0:
+        return 0.0
+
+    a_bits = _crop(a, *intersection_box)
+    b_bits = _crop(b, *intersection_box)
+    intersection = int(_POPCOUNT[a_bits & b_bits].sum(dtype=np.int64))
+    return intersection / (a.count + b.count - intersection)
+
+
+def _crop(mask: PackedMask, left: int, top: int, right: int, bottom: int) -> np.ndarray:
+    return mask.bits[
+        top - mask.top : bottom - mask.top,
+        left // 8 - mask.byte_left : right // 8 - mask.byte_left,
+    ]
+
+
+def _intersect_boxes(
+    a: Tuple[int, int, int, int], b: Tuple[int, int, int, int]
+) -> Optional[Tuple[int, int, int, int]]:
+    box = (max(a[0], b[0]), max(a[1], b[1]), min(a[2], b[2]), min(a[3], b[3]))
+    if box[0] >= box[2] or box[1] >= box[3]:
+        return None
+    return box
+
+
+def _is_untransformed(obj: Object) -> bool:
+    return (
+        obj.scaleX == 1
+        and obj.scaleY == 1
+        and obj.angle % 360 == 0
+        and obj.skewX == 0
+        and obj.skewY == 0
+        and not obj.flipX
+        and not obj.flipY
+        and obj.originX == "center"
+        and obj.originY == "center"
+    )
@@ -0,0 +1,26 @@
+from typing import Dict
+
+from PIL import Image as PILImage
+
+from app.core.chat2edit.models import Image
+from app.core.chat2edit.utils.render_utils import render_image
+from app.env import IMAGE_PREVIEW_SIZES
+from app.utils.image_utils import (
+    convert_image_to_webp_bytes,
+    create_image_pyramid,
+    resize_image_to_max_size,
+)
+
+
+def create_image_previews(image: Image) -> Dict[int, bytes]:
+    """Render the image and encode one WebP preview per configured size."""
+    pyramid = create_image_pyramid(render_image(image), IMAGE_PREVIEW_SIZES)
+    return {
+        max_size: convert_image_to_webp_bytes(preview)
+        for max_size, preview in pyramid.items()
+    }
+
+
+def get_image_preview(image: Image, max_size: int) -> PILImage.Image:
+    """Render the image, downscaled so that its longer edge is at most `max_size`."""
+    return resize_image_to_max_size(render_image(image), max_size)
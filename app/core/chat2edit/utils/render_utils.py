@@ -0,0 +1,370 @@
+import math
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Dict, Hashable, Iterator, List, Optional, Tuple
+
+import numpy as np
+from PIL import Image as PILImage
+
+from app.core.chat2edit.models import Image
+from app.core.chat2edit.models.fabric.objects import FabricImage
+from app.env import RENDER_CACHE_SIZE, RENDER_LAYER_CACHE_SIZE
+from app.utils.caches import LruCache
+from app.utils.image_utils import get_image_nbytes
+
+ORIGIN_OFFSETS = {"left": 0.0, "top": 0.0, "center": 0.5, "right": 1.0, "bottom": 1.0}
+
+# Above this fraction of the canvas, recompositing everything is cheaper
+MAX_DIRTY_AREA_RATIO = 0.5
+
+
+@dataclass(frozen=True)
+class _Layer:
+    """A transformed, filtered object ready to be composited.
+
+    `left`/`top` are relative to the integer part of the object's center, so
+    the same layer can be reused when the object is moved by whole pixels.
+    """
+
+    image: PILImage.Image
+    left: int
+    top: int
+
+
+@dataclass(frozen=True)
+class _PlacedLayer:
+    key: Hashable
+    left: int
+    top: int
+    width: int
+    height: int
+    # Held here so that the layer survives eviction from the cache
+    layer: _Layer = field(compare=False)
+
+    @property
+    def box(self) -> Tuple[int, int, int, int]:
+        return self.left, self.top, self.left + self.width, self.top + self.height
+
+
+@dataclass
+class _Render:
+    canvas: PILImage.Image
+    layers: List[_PlacedLayer]
+
+    @property
+    def nbytes(self) -> int:
+        # The placed layers keep their images alive, even once evicted
+        layer_images = {id(layer.layer.image): layer.layer.image for layer in self.layers}
+        return get_image_nbytes(self.canvas) + sum(
+            get_image_nbytes(image) for image in layer_images.values()
+        )
+
+
+class ImageRenderer:
+    """Flattens an `Image` group into pixels the way Fabric.js draws it.
+
+    Child images are drawn in stacking order with their position, origin, scale,
+    flip, skew, rotation, opacity, crop and filters. Annotation objects (boxes,
+    points, scribbles, texts) are overlays and are not drawn, and neither are
+    nested groups.
+
+    Transformed layers are cached by object state, and the last render of each
+    image is kept so that when only some objects change, just the region they
+    cover before and after the change is recomposited. Both caches are bounded
+    by the memory of their pixels. Renders of different images run in parallel;
+    renders of the same image wait for each other, as they share its last render.
+    """
+
+    def __init__(
+        self,
+        max_layer_bytes: int = RENDER_LAYER_CACHE_SIZE * 1024 * 1024,
+        max_render_bytes: int = RENDER_CACHE_SIZE * 1024 * 1024,
+    ):
+        self._layers: LruCache[_Layer] = LruCache(
+            max_bytes=max_layer_bytes,
+            get_size=lambda layer: get_image_nbytes(layer.image),
+        )
+        self._renders: LruCache[_Render] = LruCache(
+            max_bytes=max_render_bytes, get_size=lambda render: render.nbytes
+        )
+        # Guards the caches and the per-image locks, never held while drawing
+        self._lock = threading.Lock()
+        self._image_locks: Dict[str, Tuple[threading.Lock, int]] = {}
+
+    def render(self, image: Image) -> PILImage.Image:
+        with self._lock_image(image.id):
+            size = _get_canvas_size(image)
+            layers = [
+                placed_layer
+                for obj in image.objects
+                if (placed_layer := self._place_layer(obj, size)) is not None
+            ]
+
+            with self._lock:
+                previous = self._renders.get(image.id)
+            if previous is None or previous.canvas.size != size:
+                canvas = self._composite(size, layers, (0, 0) + size)
+            else:
+                canvas = self._recomposite(previous, layers)
+
+            with self._lock:
+                self._renders.set(image.id, _Render(canvas=canvas, layers=layers))
+            return canvas.copy()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._layers.clear()
+            self._renders.clear()
+
+    @contextmanager
+    def _lock_image(self, image_id: str) -> Iterator[None]:
+        with self._lock:
+            lock, num_users = self._image_locks.get(image_id, (threading.Lock(), 0))
+            self._image_locks[image_id] = (lock, num_users + 1)
+
+        try:
+            with lock:
+                yield
+        finally:
+            with self._lock:
+                lock, num_users = self._image_locks[image_id]
+                if num_users == 1:
+                    del self._image_locks[image_id]
+                else:
+                    self._image_locks[image_id] = (lock, num_users - 1)
+
+    def _place_layer(
+        self, obj: object, canvas_size: Tuple[int, int]
+    ) -> Optional[_PlacedLayer]:
+        if not isinstance(obj, FabricImage) or not obj.visible or not obj.src:
+            return None
+        if obj.opacity <= 0 or obj.width <= 0 or obj.height <= 0:
+            return None
+
+        matrix = _get_linear_matrix(obj)
+        center_x, center_y = _get_center(obj, matrix, canvas_size)
+        anchor_x, anchor_y = math.floor(center_x), math.floor(center_y)
+        fraction = (round(center_x - anchor_x, 2), round(center_y - anchor_y, 2))
+
+        key = _get_layer_key(obj, fraction)
+        with self._lock:
+            layer = self._layers.get(key)
+        if layer is None:
+            layer = _create_layer(obj, matrix, fraction)
+            with self._lock:
+                self._layers.set(key, layer)
+
+        return _PlacedLayer(
+            key=key,
+            left=anchor_x + layer.left,
+            top=anchor_y + layer.top,
+            width=layer.image.width,
+            height=layer.image.height,
+            layer=layer,
+        )
+
+    def _recomposite(
+        self, previous: _Render, layers: List[_PlacedLayer]
+    ) -> PILImage.Image:
+        canvas = previous.canvas
+        previous_layers = set(previous.layers)
+        current_layers = set(layers)
+        changed_layers = previous_layers ^ current_layers
+        if not changed_layers:
+            # Nothing was added, removed or moved, but the order may have changed
+            if previous.layers == layers:
+                return canvas
+            return self._composite(canvas.size, layers, (0, 0) + canvas.size)
+
+        unchanged_layers = previous_layers & current_layers
+        if [layer for layer in previous.layers if layer in unchanged_layers] != [
+            layer for layer in layers if layer in unchanged_layers
+        ]:
+            return self._composite(canvas.size, layers, (0, 0) + canvas.size)
+
+        dirty_box = _clip_box(
+            _union_boxes([layer.box for layer in changed_layers]), canvas.size
+        )
+        if dirty_box is None:
+            return canvas
+
+        dirty_area = (dirty_box[2] - dirty_box[0]) * (dirty_box[3] - dirty_box[1])
+        if dirty_area > MAX_DIRTY_AREA_RATIO * canvas.width * canvas.height:
+            return self._composite(canvas.size, layers, (0, 0) + canvas.size)
+
+        region = self._composite(canvas.size, layers, dirty_box)
+        canvas = canvas.copy()
+        canvas.paste(region, dirty_box[:2])
+        return canvas
+
+    def _composite(
+        self,
+        canvas_size: Tuple[int, int],
+        layers: List[_PlacedLayer],
+        box: Tuple[int, int, int, int],
+    ) -> PILImage.Image:
+        """Composite the layers within `box` of the canvas (source-over)."""
+        left, top, right, bottom = box
+        region = PILImage.new("RGBA", (right - left, bottom - top), (0, 0, 0, 0))
+
+        for placed_layer in layers:
+            overlap = _intersect_boxes(placed_layer.box, box)
+            if overlap is None:
+                continue
+
+            region.alpha_composite(
+                placed_layer.layer.image,
+                dest=(overlap[0] - left, overlap[1] - top),
+                source=(
+                    overlap[0] - placed_layer.left,
+                    overlap[1] - placed_layer.top,
+                    overlap[2] - placed_layer.left,
+                    overlap[3] - placed_layer.top,
+                ),
+            )
+
+        return region
+
+
+def _get_canvas_size(image: Image) -> Tuple[int, int]:
+    width, height = round(image.width), round(image.height)
+    if width > 0 and height > 0:
+        return width, height
+
+    base_image = image.objects[0] if image.objects else None
+    if not isinstance(base_image, FabricImage):
+        raise ValueError("No base image found")
+
+    return (
+        round(base_image.width * abs(base_image.scaleX)),
+        round(base_image.height * abs(base_image.scaleY)),
+    )
+
+
+def _get_linear_matrix(obj: FabricImage) -> np.ndarray:
+    """Rotation · scale/flip · skewX · skewY, as in Fabric's `composeMatrix`."""
+    angle = math.radians(obj.angle)
+    rotation = np.array(
+        [[math.cos(angle), -math.sin(angle)], [math.sin(angle), math.cos(angle)]]
+    )
+    scale = np.diag(
+        [-obj.scaleX if obj.flipX else obj.scaleX, -obj.scaleY if obj.flipY else obj.scaleY]
+    )
+    skew_x = np.array([[1.0, math.tan(math.radians(obj.skewX))], [0.0, 1.0]])
+    skew_y = np.array([[1.0, 0.0], [math.tan(math.radians(obj.skewY)), 1.0]])
+    return rotation @ scale @ skew_x @ skew_y
+
+
+def _get_center(
+    obj: FabricImage, matrix: np.ndarray, canvas_size: Tuple[int, int]
+) -> Tuple[float, float]:
+    # Child positions are relative to the group center
+    origin_offset = np.array(
+        [
+            (0.5 - ORIGIN_OFFSETS.get(obj.originX, 0.5)) * obj.width,
+            (0.5 - ORIGIN_OFFSETS.get(obj.originY, 0.5)) * obj.height,
+        ]
+    )
+    center_x, center_y = matrix @ origin_offset
+    return (
+        canvas_size[0] / 2 + obj.left + center_x,
+        canvas_size[1] / 2 + obj.top + center_y,
+    )
+
+
+def _get_layer_key(obj: FabricImage, fraction: Tuple[float, float]) -> Hashable:
+    return (
+        obj.get_src_digest(),
+        obj.width,
+        obj.height,
+        obj.cropX,
+        obj.cropY,
+        obj.scaleX,
+        obj.scaleY,
+        obj.angle,
+        obj.flipX,
+        obj.flipY,
+        obj.skewX,
+        obj.skewY,
+        obj.opacity,
+        tuple(filter.model_dump_json() for filter in obj.filters),
+        fraction,
+    )
+
+
+def _create_layer(
+    obj: FabricImage, matrix: np.ndarray, fraction: Tuple[float, float]
+) -> _Layer:
+    source = obj.get_image().convert("RGBA")
+
+    width, height = round(obj.width), round(obj.height)
+    crop_x, crop_y = round(obj.cropX), round(obj.cropY)
+    source = source.crop((crop_x, crop_y, crop_x + width, crop_y + height))
+
+    if obj.opacity < 1:
+        pixels = np.array(source)
+        pixels[..., 3] = (pixels[..., 3] * obj.opacity).astype(np.uint8)
+        source = PILImage.fromarray(pixels, "RGBA")
+
+    center = np.array(fraction)
+    half_size = np.array([obj.width / 2, obj.height / 2])
+    corners = np.array(
+        [[-half_size[0], -half_size[1]], [half_size[0], -half_size[1]],
+         [half_size[0], half_size[1]], [-half_size[0], half_size[1]]]
+    )
+    transformed_corners = corners @ matrix.T + center
+    left, top = np.floor(transformed_corners.min(axis=0) + 1e-6).astype(int)
+    right, bottom = np.ceil(transformed_corners.max(axis=0) - 1e-6).astype(int)
+
+    # Plain translation by whole pixels: no resampling needed
+    if np.allclose(matrix, np.eye(2)) and np.allclose(center - half_size, [left, top]):
+        return _Layer(image=source, left=int(left), top=int(top))
+
+    # PIL maps output pixels back to input pixels
+    inverse = np.linalg.inv(matrix)
+    offset = half_size - inverse @ (center - np.array([left, top]))
+    layer_image = source.transform(
+        (int(right - left), int(bottom - top)),
+        PILImage.Transform.AFFINE,
+        data=(
+            inverse[0, 0], inverse[0, 1], offset[0],
+            inverse[1, 0], inverse[1, 1], offset[1],
+        ),
+        resample=PILImage.Resampling.BICUBIC,
+    )
+    return _Layer(image=layer_image, left=int(left), top=int(top))
+
+
+def _union_boxes(
+    boxes: List[Tuple[int, int, int, int]],
+) -> Tuple[int, int, int, int]:
+    return (
+        min(box[0] for box in boxes),
+        min(box[1] for box in boxes),
+        max(box[2] for box in boxes),
+        max(box[3] for box in boxes),
+    )
+
+
+def _intersect_boxes(
+    a: Tuple[int, int, int, int], b: Tuple[int, int, int, int]
+) -> Optional[Tuple[int, int, int, int]]:
+    box = (max(a[0], b[0]), max(a[1], b[1]), min(a[2], b[2]), min(a[3], b[3]))
+    if box[0] >= box[2] or box[1] >= box[3]:
+        return None
+    return box
+
+
+def _clip_box(
+    box: Tuple[int, int, int, int], size: Tuple[int, int]
+) -> Optional[Tuple[int, int, int, int]]:
+    return _intersect_boxes(box, (0, 0) + size)
+
+
+image_renderer = ImageRenderer()
+
+
+def render_image(image: Image) -> PILImage.Image:
+    """Flatten an image with its child objects into a single RGBA image."""
+    return image_renderer.render(image)
@@ -0,0 +1,149 @@
+import asyncio
+import logging
+from typing import Hashable, List, Optional, Tuple
+
+from PIL import Image as PILImage
+
+from app.clients.inference_client import inference_client
+from app.core.chat2edit.models import Box, Image, Point
+from app.core.chat2edit.utils.image_utils import get_image_fingerprint
+from app.env import SAM3_PREFETCH_TTL, SAM3_PROXY_MAX_SIZE
+from app.schemas.common_schemas import Box as InferenceBox
+from app.schemas.common_schemas import MaskLabeledPoint
+from app.utils.caches import TtlCache
+from app.utils.image_utils import resize_image_to_max_size, upscale_mask_image
+
+logger = logging.getLogger(__name__)
+
+# Masks speculatively requested for user annotations while the LLM is generating
+_prefetched_masks: TtlCache[asyncio.Task] = TtlCache(ttl=SAM3_PREFETCH_TTL)
+
+
+def create_segmentation_proxy(
+    pil_image: PILImage.Image,
+) -> Tuple[PILImage.Image, float]:
+    """Return the image to send to SAM3 and its scale relative to `pil_image`.
+
+    With SAM3_PROXY_MAX_SIZE set, large images are downscaled so that upload
+    size and GPU time shrink; masks are brought back with `restore_mask_resolution`.
+    """
+    if not SAM3_PROXY_MAX_SIZE:
+        return pil_image, 1.0
+
+    proxy_image = resize_image_to_max_size(pil_image, SAM3_PROXY_MAX_SIZE)
+    return proxy_image, proxy_image.width / pil_image.width
+
+
+def restore_mask_resolution(
+    mask: PILImage.Image, pil_image: PILImage.Image
+) -> PILImage.Image:
+    if mask.size == pil_image.size:
+        return mask
+
+    return upscale_mask_image(mask, pil_image)
+
+
+def create_inference_box(
+    box: Box, img_width: int, img_height: int, scale: float = 1.0
+) -> InferenceBox:
+    adjusted_left = int((box.left + img_width / 2) * scale)
+    adjusted_top = int((box.top + img_height / 2) * scale)
+    adjusted_right = int(adjusted_left + box.width * scale)
+    adjusted_bottom = int(adjusted_top + box.height * scale)
+
+    return InferenceBox(
+        x_min=adjusted_left,
+        y_min=adjusted_top,
+        x_max=adjusted_right,
+        y_max=adjusted_bottom,
+    )
+
+
+def create_mask_labeled_points(
+    points: List[Point],
+    label: int,
+    img_width: int,
+    img_height: int,
+    scale: float = 1.0,
+) -> List[MaskLabeledPoint]:
+    return [
+        MaskLabeledPoint(
+            x=int((point.left + img_width / 2) * scale),
+            y=int((point.top + img_height / 2) * scale),
+            label=label,
+        )
+        for point in points
+    ]
+
+
+def prefetch_mask(
+    image: Image, box: Optional[Box] = None, point: Optional[Point] = None
+) -> None:
+    """Start segmenting an annotated box or point in the background.
+
+    The result is kept for a short time so that a following
+    `segment_object(image, box=box)` or `segment_object(image, positive_points=[point])`
+    on the same image reuses it instead of calling SAM3 again.
+    """
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        return
+
+    key = _get_prefetch_key(image, box, point)
+    if key in _prefetched_masks:
+        return
+
+    async def _generate_mask() -> PILImage.Image:
+        pil_image = await asyncio.to_thread(image.get_image)
+        proxy_image, scale = create_segmentation_proxy(pil_image)
+        img_width, img_height = pil_image.size
+        return await inference_client.sam3_generate_mask(
+            proxy_image,
+            points=(
+                create_mask_labeled_points([point], 1, img_width, img_height, scale)
+                if point is not None
+                else None
+            ),
+            box=(
+                create_inference_box(box, img_width, img_height, scale)
+                if box is not None
+                else None
+            ),
+        )
+
+    task = loop.create_task(_generate_mask())
+    task.add_done_callback(_log_prefetch_failure)
+    _prefetched_masks.set(key, task)
+
+
+async def pop_prefetched_mask(
+    image: Image, box: Optional[Box] = None, point: Optional[Point] = None
+) -> Optional[PILImage.Image]:
+    """Return the prefetched mask for this annotation, or None if there is none.
+
+    The mask is at the resolution sent to SAM3 (see `create_segmentation_proxy`).
+    """
+    task = _prefetched_masks.pop(_get_prefetch_key(image, box, point))
+    if task is None:
+        return None
+
+    try:
+        return await task
+    except Exception:
+        return None
+
+
+def _get_prefetch_key(
+    image: Image, box: Optional[Box], point: Optional[Point]
+) -> Hashable:
+    return (
+        get_image_fingerprint(image),
+        (box.left, box.top, box.width, box.height) if box is not None else None,
+        (point.left, point.top) if point is not None else None,
+    )
+
+
+def _log_prefetch_failure(task: asyncio.Task) -> None:
+    if not task.cancelled() and task.exception() is not None:
+        logger.warning(f"Mask prefetch failed: {task.exception()}")
@@ -10,6 +10,7 @@ GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
 INFERENCE_API_URL = os.getenv("INFERENCE_API_URL")
 STORAGE_API_URL = os.getenv("STORAGE_API_URL")
 DASHSCOPE_API_KEY = os.getenv("DASHSCOPE_API_KEY")
+DASHSCOPE_API_URL = os.getenv("DASHSCOPE_API_URL", "https://dashscope-intl.aliyuncs.com/api/v1")
 
 # Redis configuration - supports both "host:port" format and separate variables
 REDIS_HOST_ENV = os.getenv("REDIS_HOST", "")
@@ -25,3 +26,86 @@ else:
 # Validate Redis configuration
 if not REDIS_HOST:
     raise ValueError("REDIS_HOST must be set. Use format 'host:port' or set REDIS_HOST and REDIS_PORT separately")
+
+# Speculative SAM3 pre-segmentation of annotated boxes/points (opt-in)
+SAM3_PREFETCH_ENABLED = os.getenv("SAM3_PREFETCH_ENABLED", "false").lower() == "true"
+SAM3_PREFETCH_TTL = float(os.getenv("SAM3_PREFETCH_TTL", "120"))
+
+# Provider-side caching of the static prompt prefix (function stubs and exemplars, opt-in);
+# Gemini bills the storage of its cached content for GEMINI_PROMPT_CACHE_TTL seconds
+LLM_PROMPT_CACHE_ENABLED = os.getenv("LLM_PROMPT_CACHE_ENABLED", "false").lower() == "true"
+GEMINI_PROMPT_CACHE_TTL = float(os.getenv("GEMINI_PROMPT_CACHE_TTL", "3600"))
+
+# Downscaled previews uploaded alongside image attachments (opt-in, longest edge in pixels)
+IMAGE_PREVIEWS_ENABLED = os.getenv("IMAGE_PREVIEWS_ENABLED", "false").lower() == "true"
+IMAGE_PREVIEW_SIZES = [
+    int(size) for size in os.getenv("IMAGE_PREVIEW_SIZES", "256,1024").split(",") if size
+]
+
+# Run SAM3 on a copy downscaled to this longest edge and upscale the masks (0 disables)
+SAM3_PROXY_MAX_SIZE = int(os.getenv("SAM3_PROXY_MAX_SIZE", "0"))
+
+# Inpaint only a context window around the mask instead of the full frame (opt-in)
+INPAINT_REGION_ENABLED = os.getenv("INPAINT_REGION_ENABLED", "false").lower() == "true"
+# Side of the (square) window sent to the inpainting models
+INPAINT_REGION_SIZE = int(os.getenv("INPAINT_REGION_SIZE", "1024"))
+# Context kept around the mask, as a fraction of the mask bounding box size
+INPAINT_REGION_PADDING = float(os.getenv("INPAINT_REGION_PADDING", "0.5"))
+# Width in pixels of the blend between the inpainted window and the original
+INPAINT_REGION_FEATHER = int(os.getenv("INPAINT_REGION_FEATHER", "8"))
+
+# Server-side compositing caches: transformed layers and the last render of each image (MB)
+RENDER_LAYER_CACHE_SIZE = int(os.getenv("RENDER_LAYER_CACHE_SIZE", "256"))
+RENDER_CACHE_SIZE = int(os.getenv("RENDER_CACHE_SIZE", "256"))
+
+# Decoded and filtered image sources kept in memory, base images and objects (MB)
+FILTERED_IMAGE_CACHE_SIZE = int(os.getenv("FILTERED_IMAGE_CACHE_SIZE", "256"))
+
+# Aesthetic scoring for filter feedback: scorer input size and how long an edit may wait for it
+AESTHETIC_SCORE_MAX_SIZE = int(os.getenv("AESTHETIC_SCORE_MAX_SIZE", "512"))
+AESTHETIC_SCORE_TIMEOUT = float(os.getenv("AESTHETIC_SCORE_TIMEOUT", "1.5"))
+# Score each new image version in the background so apply_filter only looks scores up (opt-in)
+AESTHETIC_PREWARM_ENABLED = os.getenv("AESTHETIC_PREWARM_ENABLED", "false").lower() == "true"
+
+# Objects whose masks overlap at least this much (IoU) are treated as the same object (0 disables)
+OBJECT_DEDUP_IOU_THRESHOLD = float(os.getenv("OBJECT_DEDUP_IOU_THRESHOLD", "0.85"))
+# Bit-packed object masks kept in memory for that comparison (MB)
+PACKED_MASK_CACHE_SIZE = int(os.getenv("PACKED_MASK_CACHE_SIZE", "64"))
+
+# Omit Fabric.js defaults from Redis progress payloads; stored contexts always omit them
+COMPACT_PROGRESS_ENABLED = os.getenv("COMPACT_PROGRESS_ENABLED", "false").lower() == "true"
+
+# Store contexts as a JSON header plus raw image sections instead of one JSON document
+BINARY_CONTEXT_ENABLED = os.getenv("BINARY_CONTEXT_ENABLED", "false").lower() == "true"
+
+# Validate stored context variables only when the generated program uses them (opt-in)
+LAZY_CONTEXT_ENABLED = os.getenv("LAZY_CONTEXT_ENABLED", "false").lower() == "true"
+
+# Downloaded and uploaded storage files kept locally by file id (sizes in MB, no directory disables disk)
+STORAGE_CACHE_MEMORY_SIZE = int(os.getenv("STORAGE_CACHE_MEMORY_SIZE", "256"))
+STORAGE_CACHE_DIR = os.getenv("STORAGE_CACHE_DIR", "")
+STORAGE_CACHE_DISK_SIZE = int(os.getenv("STORAGE_CACHE_DISK_SIZE", "2048"))
+
+# Stream context uploads (chunked multipart) and downloads instead of buffering them (opt-in)
+STORAGE_STREAMING_ENABLED = os.getenv("STORAGE_STREAMING_ENABLED", "false").lower() == "true"
+
+# Compression of uploaded contexts (and attachments, opt-in): "gzip", "zstd" or empty to disable
+STORAGE_COMPRESSION = os.getenv("STORAGE_COMPRESSION", "").lower()
+STORAGE_COMPRESSION_LEVEL = int(os.getenv("STORAGE_COMPRESSION_LEVEL", "3"))
+# Dictionary from scripts/train_zstd_dictionary.py; keep it while files compressed with it are stored
+STORAGE_ZSTD_DICTIONARY = os.getenv("STORAGE_ZSTD_DICTIONARY", "")
+STORAGE_COMPRESS_ATTACHMENTS = os.getenv("STORAGE_COMPRESS_ATTACHMENTS", "false").lower() == "true"
+
+# Storage uploads run at the same time when finishing a response
+STORAGE_UPLOAD_CONCURRENCY = int(os.getenv("STORAGE_UPLOAD_CONCURRENCY", "4"))
+
+# Publish `complete` before response files are stored, then `persisted` once they are (opt-in)
+EARLY_COMPLETE_ENABLED = os.getenv("EARLY_COMPLETE_ENABLED", "false").lower() == "true"
+# Attempts per storage upload when finishing a response, with exponential backoff
+STORAGE_UPLOAD_RETRIES = int(os.getenv("STORAGE_UPLOAD_RETRIES", "3"))
+
+# Qwen image edit task polling: the interval grows from the initial to the max (seconds)
+QWEN_POLL_INITIAL_INTERVAL = float(os.getenv("QWEN_POLL_INITIAL_INTERVAL", "0.25"))
+QWEN_POLL_MAX_INTERVAL = float(os.getenv("QWEN_POLL_MAX_INTERVAL", "2"))
+# Seconds a Qwen image edit may take, task polling included
+QWEN_TASK_TIMEOUT = float(os.getenv("QWEN_TASK_TIMEOUT", "300"))
@@ -3,6 +3,13 @@ from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
 
+from app.clients.inference_client import inference_client
+from app.clients.qwen_client import qwen_client
+from app.clients.redis_client import redis_client
+from app.clients.storage_client import storage_client
+from app.core.chat2edit.llms import llm_pool
+from app.services.impl.chat2edit_service_impl import Chat2EditServiceImpl
+
 logger = logging.getLogger(__name__)
 
 
@@ -11,7 +18,17 @@ async def lifespan(app: FastAPI):
     # No Redis initialization needed here - it's handled in redis_client.py
     logger.info("Application startup")
 
+    # One service (and its LLM clients and HTTP connections) shared by all requests
+    app.state.chat2edit_service = Chat2EditServiceImpl(
+        storage_client, redis_client, llm_pool, qwen_client
+    )
+
     yield
 
-    # Cleanup if needed
     logger.info("Application shutdown")
+    # Results published early are still being stored with these clients
+    await app.state.chat2edit_service.close()
+    await llm_pool.close()
+    await storage_client.close()
+    await inference_client.close()
+    await qwen_client.close()
@@ -21,6 +21,15 @@ router = APIRouter(prefix="/chat2edit", tags=["chat2edit"])
 logger = logging.getLogger(__name__)
 
 
+def _is_final_event(event: dict) -> bool:
+    """`error`, `persisted`, or a `complete` event not followed by `persisted`."""
+    if event.get("type") in ["error", "persisted"]:
+        return True
+    if event.get("type") == "complete":
+        return (event.get("data") or {}).get("persisted", True)
+    return False
+
+
 @router.post("/generate", response_model=ResponseModel[Chat2EditGenerateResponseModel])
 async def generate(
     request: Chat2EditGenerateRequestModel,
@@ -81,8 +90,8 @@ async def websocket_progress(
                 event = json.loads(message["data"])
                 await websocket.send_json(event)
 
-                # Close connection after complete or error event
-                if event.get("type") in ["complete", "error"]:
+                # Close connection after the last event of the generation
+                if _is_final_event(event):
                     logger.info(
                         f"Generation finished for cycle {cycle_id}, closing WebSocket"
                     )
@@ -8,8 +8,11 @@ from app.env import GOOGLE_API_KEY
 
 
 class AttachmentModel(BaseModel):
-    file_id: str
+    # None in an early `complete` event: the file is not stored yet
+    file_id: Optional[str] = Field(default=None)
     filename: str
+    # File IDs of downscaled WebP renders, keyed by their longest edge in pixels
+    previews: Dict[str, str] = Field(default_factory=dict)
 
 
 class MessageModel(BaseModel):
@@ -42,17 +45,30 @@ class Chat2EditGenerateRequestModel(BaseModel):
     history: List[ChatCycle] = Field(default=[])
     context_file_id: Optional[str] = Field(default=None)
     use_qwen: bool = Field(default=False)
+    # Stream the LLM answer and execute commands while they are generated
+    stream: bool = Field(default=False)
 
 
 class Chat2EditGenerateResponseModel(BaseModel):
     message: Optional[MessageModel] = Field(default=None)
     cycle: ChatCycle
-    context_file_id: str
+    context_file_id: Optional[str] = Field(default=None)
+    # False in an early `complete` event: attachments and the context have no
+    # file ids until the `persisted` event, which matches them by filename
+    persisted: bool = Field(default=True)
 
 
 class Chat2EditProgressEventModel(BaseModel):
     type: Literal[
-        "request", "prompt", "answer", "extract", "execute", "complete", "error"
+        "request",
+        "prompt",
+        "answer",
+        "answer_delta",
+        "extract",
+        "execute",
+        "complete",
+        "persisted",
+        "error",
     ]
     message: Optional[str] = Field(default=None)
     # Use Any here because some callbacks currently publish strings or other
@@ -1,18 +1,63 @@
 import asyncio
-from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+import json
+import logging
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    Union,
+)
 
-from chat2edit import Chat2Edit, Chat2EditCallbacks
-from chat2edit.models import ExecutionBlock, Message
-from chat2edit.prompting.llms import GoogleLlm, Llm, OpenAILlm
+from chat2edit.models import ChatCycle, ExecutionBlock, Message
+from chat2edit.prompting.llms import Llm
 from pydantic import TypeAdapter
 
+from app.clients.qwen_client import QwenClient
 from app.clients.redis_client import RedisClient
-from app.clients.storage_client import StorageClient
+from app.clients.storage_client import StorageClient, UploadBatch
+from app.core.chat2edit.llms import LlmPool
+from app.core.chat2edit.mic2e_chat2edit import Mic2eChat2Edit, Mic2eChat2EditCallbacks
 from app.core.chat2edit.mic2e_context_provider import Mic2eContextProvider
-from app.core.chat2edit.mic2e_context_strategy import CONTEXT_TYPE, Mic2eContextStrategy
+from app.core.chat2edit.mic2e_context_strategy import (
+    CONTEXT_ADAPTER,
+    CONTEXT_ITEM_ADAPTER,
+    Mic2eContextStrategy,
+)
+from app.core.chat2edit.mic2e_execution_strategy import Mic2eExecutionStrategy
 from app.core.chat2edit.mic2e_prompting_strategy import Mic2ePromptingStrategy
 from app.core.chat2edit.models import Image
-from app.env import GOOGLE_API_KEY, OPENAI_API_KEY
+from app.core.chat2edit.models.fabric.serialization import COMPACT_CONTEXT
+from app.core.chat2edit.utils.context_utils import (
+    create_lazy_context,
+    get_raw_context,
+    is_context_container,
+    iter_context_container,
+    materialize_context_values,
+    pack_context_container,
+    unpack_context_container,
+)
+from app.core.chat2edit.utils.preview_utils import (
+    create_image_previews,
+    get_image_preview,
+)
+from app.env import (
+    AESTHETIC_PREWARM_ENABLED,
+    BINARY_CONTEXT_ENABLED,
+    COMPACT_PROGRESS_ENABLED,
+    EARLY_COMPLETE_ENABLED,
+    IMAGE_PREVIEWS_ENABLED,
+    LAZY_CONTEXT_ENABLED,
+    SAM3_PREFETCH_ENABLED,
+    STORAGE_COMPRESS_ATTACHMENTS,
+    STORAGE_STREAMING_ENABLED,
+)
 from app.schemas.chat2edit_schemas import (
     AttachmentModel,
     Chat2EditGenerateRequestModel,
@@ -23,14 +68,45 @@ from app.schemas.chat2edit_schemas import (
 from app.services.chat2edit_service import Chat2EditService
 from app.utils.factories import create_uuid4
 
+logger = logging.getLogger(__name__)
+
+# Longest edge of the rendered image sent to the Qwen image edit API
+QWEN_MAX_DIMENSION = 1024
+
+IMAGE_ADAPTER = TypeAdapter(Image)
+# Serializes values by their runtime type, as context values are heterogeneous
+CONTEXT_DUMP_ADAPTER = TypeAdapter(Dict[str, Any])
+CONTEXT_VALUE_DUMP_ADAPTER = TypeAdapter(Any)
+# Serialization context of models published as progress events
+PROGRESS_DUMP_CONTEXT = COMPACT_CONTEXT if COMPACT_PROGRESS_ENABLED else None
+
 
 class Chat2EditServiceImpl(Chat2EditService):
-    def __init__(self, storage_client: StorageClient, redis_client: RedisClient):
+    def __init__(
+        self,
+        storage_client: StorageClient,
+        redis_client: RedisClient,
+        llm_pool: LlmPool,
+        qwen_client: QwenClient,
+    ):
         self._storage_client = storage_client
         self._redis_client = redis_client
+        self._llm_pool = llm_pool
+        self._qwen_client = qwen_client
         self._context_provider = Mic2eContextProvider()
-        self._context_strategy = Mic2eContextStrategy()
+        self._context_strategy = Mic2eContextStrategy(
+            prefetch_masks=SAM3_PREFETCH_ENABLED,
+            prewarm_aesthetic_scores=AESTHETIC_PREWARM_ENABLED,
+        )
         self._prompting_strategy = Mic2ePromptingStrategy()
+        self._execution_strategy = Mic2eExecutionStrategy()
+        # Results still being stored after an early `complete` event
+        self._persist_tasks: Set[asyncio.Task] = set()
+
+    async def close(self) -> None:
+        """Wait for results that are still being stored."""
+        if self._persist_tasks:
+            await asyncio.gather(*self._persist_tasks, return_exceptions=True)
 
     async def generate(
         self, request: Chat2EditGenerateRequestModel, cycle_id: Optional[str] = None
@@ -54,135 +130,33 @@ class Chat2EditServiceImpl(Chat2EditService):
                 )
             try:
                 # 1. Resolve and download source image
-                pil_image = None
+                source_image = None
                 if request.message.attachments:
                     file_id = request.message.attachments[0].file_id
-                    core_image = await self._download_image_attachment(file_id)
-                    pil_image = core_image.get_image()
+                    source_image = await self._download_image_attachment(file_id)
                 elif request.context_file_id:
                     context = await self._download_context(request.context_file_id)
                     from app.core.chat2edit.models.image import Image as CoreImage
-                    for val in context.values():
-                        if isinstance(val, CoreImage):
-                            pil_image = val.get_image()
+                    for varname in list(context):
+                        # Values of a lazy context are only validated on use
+                        materialize_context_values(context, [varname])
+                        if isinstance(context[varname], CoreImage):
+                            source_image = context[varname]
                             break
 
-                if not pil_image:
+                if not source_image:
                     raise ValueError("No input image found in attachments or context")
 
+                # Render the edited image at a maximum dimension of 1024 to keep base64
+                # payload size small and prevent ReadError
+                pil_image = await asyncio.to_thread(
+                    get_image_preview, source_image, QWEN_MAX_DIMENSION
+                )
+
                 # 2. Call DashScope Qwen API
-                import base64
-                import httpx
-                from io import BytesIO
-                from PIL import Image as PILImage
-                from app.env import DASHSCOPE_API_KEY
-
-                if not DASHSCOPE_API_KEY:
-                    raise ValueError("DASHSCOPE_API_KEY is not configured")
-
-                clean_api_key = DASHSCOPE_API_KEY.strip('"' + "'")
-
-                # Resize image to a maximum dimension of 1024 to keep base64 payload size small and prevent ReadError
-                max_dimension = 1024
-                if max(pil_image.width, pil_image.height) > max_dimension:
-                    pil_image.thumbnail((max_dimension, max_dimension))
-
-                buffered = BytesIO()
-                rgb_image = pil_image.convert("RGB") if pil_image.mode != "RGB" else pil_image
-                rgb_image.save(buffered, format="JPEG", quality=85)
-                img_str = base64.b64encode(buffered.getvalue()).decode("utf-8")
-                image_data_url = f"data:image/jpeg;base64,{img_str}"
-
-                headers = {
-                    "Authorization": f"Bearer {clean_api_key}",
-                    "Content-Type": "application/json"
-                }
-
-                payload = {
-                    "model": "qwen-image-edit",
-                    "input": {
-                        "messages": [
-                            {
-                                "role": "user",
-                                "content": [
-                                    {"image": image_data_url},
-                                    {"text": request.message.text}
-                                ]
-                            }
-                        ]
-                    }
-                }
-
-                async with httpx.AsyncClient(timeout=300.0) as client:
-                    url = "https://dashscope-intl.aliyuncs.com/api/v1/services/aigc/multimodal-generation/generation"
-                    try:
-                        response = await client.post(url, json=payload, headers=headers)
-                        if response.status_code == 200:
-                            print(f"[Qwen API Success] Status: {response.status_code}, Body: {response.text}")
-                        else:
-                            print(f"[Qwen API Error] Status: {response.status_code}, Body: {response.text}")
-                        response.raise_for_status()
-                    except httpx.HTTPStatusError as err:
-                        error_body = err.response.text
-                        print(f"[Qwen API HTTPStatusError] Status: {err.response.status_code}, Body: {error_body}")
-                        raise RuntimeError(f"Qwen API error (HTTP {err.response.status_code}): {error_body}") from err
-
-                    res_data = response.json()
-
-                    # Handle asynchronous tasks (if task_id is present, poll for completion)
-                    task_id = res_data.get("output", {}).get("task_id")
-                    if task_id:
-                        status_url = f"https://dashscope-intl.aliyuncs.com/api/v1/tasks/{task_id}"
-                        while True:
-                            await asyncio.sleep(2)
-                            try:
-                                status_resp = await client.get(status_url, headers=headers)
-                                if status_resp.status_code != 200:
-                                    print(f"[Qwen Task Status Error] Status: {status_resp.status_code}, Body: {status_resp.text}")
-                                status_resp.raise_for_status()
-                            except httpx.HTTPStatusError as err:
-                                error_body = err.response.text
-                                print(f"[Qwen Task Status HTTPStatusError] Status: {err.response.status_code}, Body: {error_body}")
-                                raise RuntimeError(f"Qwen task status check error (HTTP {err.response.status_code}): {error_body}") from err
-                            status_data = status_resp.json()
-                            task_status = status_data.get("output", {}).get("task_status")
-                            if task_status == "SUCCEEDED":
-                                res_data = status_data
-                                break
-                            elif task_status in ["FAILED", "CANCELED"]:
-                                raise RuntimeError(f"Qwen task {task_status}: {status_data.get('output', {}).get('message')}")
-
-                    # Extract result image URL
-                    # Primary path: output.choices[0].message.content[0].image
-                    # (actual response format from qwen-image-edit intl endpoint)
-                    output_url = None
-                    choices = res_data.get("output", {}).get("choices", [])
-                    if choices:
-                        content = choices[0].get("message", {}).get("content", [])
-                        if isinstance(content, list):
-                            for item in content:
-                                if "image" in item:
-                                    output_url = item["image"]
-                                    break
-
-                    # Fallback path: output.results[0].url (older/async task format)
-                    if not output_url:
-                        output_results = res_data.get("output", {}).get("results", [])
-                        if output_results:
-                            output_url = output_results[0].get("url")
-
-                    if not output_url:
-                        raise RuntimeError(f"Could not extract result image URL from Qwen response: {res_data}")
-
-                    print(f"[Qwen API] Extracted output image URL: {output_url}")
-
-                    try:
-                        img_resp = await client.get(output_url)
-                        img_resp.raise_for_status()
-                    except httpx.HTTPStatusError as err:
-                        print(f"[Qwen Image Download Error] Status: {err.response.status_code}")
-                        raise RuntimeError(f"Failed to download Qwen result image: {err}") from err
-                    edited_pil_image = PILImage.open(BytesIO(img_resp.content)).convert("RGB")
+                edited_pil_image = await self._qwen_client.edit_image(
+                    pil_image, request.message.text
+                )
 
                 # 3. Create CoreImage representation and upload
                 from app.core.chat2edit.models.image import Image as CoreImage
@@ -215,39 +189,25 @@ class Chat2EditServiceImpl(Chat2EditService):
                         "selectable": False,
                     }]
                 })
-                res_file_id = await self._upload_image_attachment(output_core_image)
 
                 # 4. Construct result
                 response_text = "Here is your edited image."
                 response_message = Chat2EditMessage(text=response_text, attachments=[output_core_image])
 
                 updated_context = {"image": output_core_image}
-                context_file_id = await self._upload_context(updated_context)
 
-                request_attachments = []
-                if request.message.attachments:
-                    orig_file_id = request.message.attachments[0].file_id
-                    orig_core_image = await self._download_image_attachment(orig_file_id)
-                    request_attachments.append(orig_core_image)
+                # The source image is the downloaded request attachment
+                request_attachments = (
+                    [source_image] if request.message.attachments else []
+                )
 
                 request_chat2edit_msg = Chat2EditMessage(text=request.message.text, attachments=request_attachments)
                 chat_cycle = ChatCycle(request=request_chat2edit_msg, cycles=[])
 
-                result = Chat2EditGenerateResponseModel(
-                    cycle=chat_cycle,
-                    message=await self._create_response_message(response_message),
-                    context_file_id=context_file_id,
+                return await self._complete(
+                    cycle_id, chat_cycle, response_message, updated_context
                 )
 
-                if cycle_id:
-                    await self._redis_client.publish_progress(
-                        cycle_id,
-                        "complete",
-                        message="Generation completed successfully",
-                        data=result.model_dump(mode="json"),
-                    )
-                return result
-
             except Exception as e:
                 if cycle_id:
                     await self._redis_client.publish_progress(
@@ -263,11 +223,13 @@ class Chat2EditServiceImpl(Chat2EditService):
         if cycle_id:
             callbacks, flush_progress = self._create_callbacks(cycle_id)
 
-        chat2edit = Chat2Edit(
+        chat2edit = Mic2eChat2Edit(
+            stream=request.stream,
             llm=self._create_llm(request.llm_config),
             context_provider=self._context_provider,
             context_strategy=self._context_strategy,
             prompting_strategy=self._prompting_strategy,
+            execution_strategy=self._execution_strategy,
             config=request.chat2edit_config,
             callbacks=callbacks,
         )
@@ -284,27 +246,10 @@ class Chat2EditServiceImpl(Chat2EditService):
                 message, request.history, context
             )
 
-            result = Chat2EditGenerateResponseModel(
-                cycle=cycle,
-                message=(
-                    await self._create_response_message(response) if response else None
-                ),
-                context_file_id=await self._upload_context(updated_context),
-            )
-
             if flush_progress:
                 await flush_progress()
 
-            # Publish completion event if cycle_id is provided
-            if cycle_id:
-                await self._redis_client.publish_progress(
-                    cycle_id,
-                    "complete",
-                    message="Generation completed successfully",
-                    data=result.model_dump(mode="json"),
-                )
-
-            return result
+            return await self._complete(cycle_id, cycle, response, updated_context)
         except Exception as e:
             if flush_progress:
                 await flush_progress()
@@ -319,16 +264,9 @@ class Chat2EditServiceImpl(Chat2EditService):
             raise
 
     def _create_llm(self, config: LlmConfig) -> Llm:
-        if config.provider == "openai":
-            llm = OpenAILlm(config.model, **config.params)
-            llm.set_api_key(config.api_key or OPENAI_API_KEY)
-            return llm
-        elif config.provider == "google":
-            llm = GoogleLlm(config.model, **config.params)
-            llm.set_api_key(config.api_key or GOOGLE_API_KEY)
-            return llm
-        else:
-            raise ValueError(f"Invalid LLM provider: {config.provider}")
+        return self._llm_pool.get(
+            config.provider, config.model, config.api_key, config.params
+        )
 
     async def _create_request_message(self, message: MessageModel) -> Message:
         file_ids = [attachment.file_id for attachment in message.attachments]
@@ -337,36 +275,252 @@ class Chat2EditServiceImpl(Chat2EditService):
         )
         return Message(text=message.text, attachments=attachments)
 
-    async def _create_response_message(self, message: Message) -> MessageModel:
-        file_ids = await asyncio.gather(
-            *map(self._upload_image_attachment, message.attachments)
+    async def _complete(
+        self,
+        cycle_id: Optional[str],
+        cycle: ChatCycle,
+        response: Optional[Message],
+        context: Dict[str, Any],
+    ) -> Chat2EditGenerateResponseModel:
+        """Store the response files and context, publishing the `complete` event.
+
+        With EARLY_COMPLETE_ENABLED, `complete` is published and returned before
+        anything is stored, with no file ids. The files are stored in the
+        background and the stored result is published in a `persisted` event,
+        or an `error` event if storing fails.
+        """
+        filenames = (
+            [f"{create_uuid4()}.fig.json" for _ in response.attachments]
+            if response
+            else []
+        )
+        if not cycle_id or not EARLY_COMPLETE_ENABLED:
+            result = await self._store_result(cycle, response, context, filenames)
+            if cycle_id:
+                await self._publish_result(
+                    cycle_id, "complete", "Generation completed successfully", result
+                )
+            return result
+
+        result = self._create_early_result(cycle, response, filenames)
+        await self._publish_result(
+            cycle_id,
+            "complete",
+            "Generation completed successfully, storing files...",
+            result,
+        )
+
+        task = asyncio.create_task(
+            self._persist_result(cycle_id, cycle, response, context, filenames)
+        )
+        self._persist_tasks.add(task)
+        task.add_done_callback(self._persist_tasks.discard)
+        return result
+
+    async def _persist_result(
+        self,
+        cycle_id: str,
+        cycle: ChatCycle,
+        response: Optional[Message],
+        context: Dict[str, Any],
+        filenames: List[str],
+    ) -> None:
+        try:
+            result = await self._store_result(cycle, response, context, filenames)
+        except Exception as e:
+            logger.exception(f"Storing the result of cycle {cycle_id} failed")
+            await self._redis_client.publish_progress(
+                cycle_id, "error", message=f"Failed to store files: {e}"
+            )
+            return
+
+        await self._publish_result(
+            cycle_id, "persisted", "Files stored successfully", result
+        )
+
+    async def _store_result(
+        self,
+        cycle: ChatCycle,
+        response: Optional[Message],
+        context: Dict[str, Any],
+        filenames: List[str],
+    ) -> Chat2EditGenerateResponseModel:
+        response_model, context_file_id = await self._upload_response(
+            response, context, filenames
+        )
+        return Chat2EditGenerateResponseModel(
+            cycle=cycle,
+            message=response_model,
+            context_file_id=context_file_id,
+        )
+
+    def _create_early_result(
+        self, cycle: ChatCycle, response: Optional[Message], filenames: List[str]
+    ) -> Chat2EditGenerateResponseModel:
+        message = None
+        if response:
+            message = MessageModel(
+                text=response.text,
+                attachments=[AttachmentModel(filename=filename) for filename in filenames],
+            )
+
+        return Chat2EditGenerateResponseModel(
+            cycle=cycle, message=message, persisted=False
+        )
+
+    async def _publish_result(
+        self,
+        cycle_id: str,
+        event_type: str,
+        message: str,
+        result: Chat2EditGenerateResponseModel,
+    ) -> None:
+        await self._redis_client.publish_progress(
+            cycle_id,
+            event_type,
+            message=message,
+            data=result.model_dump(mode="json", context=PROGRESS_DUMP_CONTEXT),
+        )
+
+    async def _upload_response(
+        self, message: Optional[Message], context: Dict[str, Any], filenames: List[str]
+    ) -> Tuple[Optional[MessageModel], str]:
+        """Upload the response attachments, their previews and the context together."""
+        uploads = UploadBatch(self._storage_client)
+        context_upload = self._upload_context(context, uploads)
+        if message is None:
+            return None, await context_upload
+
+        response_model, context_file_id = await asyncio.gather(
+            self._create_response_message(message, uploads, filenames), context_upload
         )
-        filenames = [f"{create_uuid4()}.fig.json" for _ in file_ids]
-        attachments = [
-            AttachmentModel(file_id=file_id, filename=filename)
-            for file_id, filename in zip(file_ids, filenames)
-        ]
-        return MessageModel(text=message.text, attachments=attachments)
+        return response_model, context_file_id
+
+    async def _create_response_message(
+        self, message: Message, uploads: UploadBatch, filenames: List[str]
+    ) -> MessageModel:
+        attachments = await asyncio.gather(
+            *(
+                self._create_response_attachment(image, filename, uploads)
+                for image, filename in zip(message.attachments, filenames)
+            )
+        )
+        return MessageModel(text=message.text, attachments=list(attachments))
+
+    async def _create_response_attachment(
+        self, image: Image, filename: str, uploads: UploadBatch
+    ) -> AttachmentModel:
+        file_id, previews = await asyncio.gather(
+            self._upload_image_attachment(image, uploads),
+            self._upload_image_previews(image, uploads),
+        )
+        return AttachmentModel(file_id=file_id, filename=filename, previews=previews)
 
     async def _download_image_attachment(self, file_id: str) -> Image:
         image_bytes = await self._storage_client.download_file(file_id)
-        return TypeAdapter(Image).validate_json(image_bytes)
+        return IMAGE_ADAPTER.validate_json(image_bytes)
+
+    async def _upload_image_attachment(self, image: Image, uploads: UploadBatch) -> str:
+        # Serialized off the loop: attachments carry their images as data URLs
+        image_json = await asyncio.to_thread(image.model_dump_json)
+        image_bytes = image_json.encode("utf-8")
+        # Attachments are also read by the frontend, so they are compressed on request
+        return await uploads.upload_file(
+            image_bytes, "image.fig.json", compress=STORAGE_COMPRESS_ATTACHMENTS
+        )
+
+    async def _upload_image_previews(
+        self, image: Image, uploads: UploadBatch
+    ) -> Dict[str, str]:
+        if not IMAGE_PREVIEWS_ENABLED or not isinstance(image, Image):
+            return {}
 
-    async def _upload_image_attachment(self, image: Image) -> str:
-        image_bytes = image.model_dump_json().encode("utf-8")
-        return await self._storage_client.upload_file(image_bytes, "image.fig.json")
+        try:
+            previews = await asyncio.to_thread(create_image_previews, image)
+        except ValueError:
+            # Nothing to render, e.g. an image without a base image
+            return {}
+
+        file_ids = await asyncio.gather(
+            *(
+                uploads.upload_file(data, f"preview_{max_size}.webp")
+                for max_size, data in previews.items()
+            )
+        )
+        return {
+            str(max_size): file_id for max_size, file_id in zip(previews, file_ids)
+        }
 
     async def _download_context(self, file_id: str) -> Dict[str, Any]:
-        context_bytes = await self._storage_client.download_file(file_id)
-        return TypeAdapter(CONTEXT_TYPE).validate_json(context_bytes)
+        if not STORAGE_STREAMING_ENABLED:
+            context_bytes = await self._storage_client.download_file(file_id)
+            return self._parse_context(context_bytes)
+
+        # Chunks are appended as they arrive instead of being joined at the end
+        context_buffer = bytearray()
+        async for chunk in self._storage_client.download_file_stream(file_id):
+            context_buffer += chunk
+        return self._parse_context(context_buffer)
+
+    async def _upload_context(self, context: Dict[str, Any], uploads: UploadBatch) -> str:
+        filename = "context.bin" if BINARY_CONTEXT_ENABLED else "context.json"
+        if not STORAGE_STREAMING_ENABLED:
+            # Serialized off the loop, so attachments are uploaded meanwhile
+            context_bytes = await asyncio.to_thread(self._dump_context, context)
+            return await uploads.upload_file(context_bytes, filename, compress=True)
+
+        async def _chunks() -> AsyncIterator[bytes]:
+            for chunk in self._iter_context_chunks(context):
+                yield chunk
+
+        # A retried upload serializes the context again
+        return await uploads.upload_file_stream(_chunks, filename, compress=True)
+
+    def _parse_context(self, context_bytes: Union[bytes, bytearray]) -> Dict[str, Any]:
+        # Both formats are read, so contexts stored before a switch stay usable
+        if is_context_container(context_bytes):
+            tree = unpack_context_container(context_bytes)
+        elif LAZY_CONTEXT_ENABLED:
+            tree = json.loads(context_bytes)
+        else:
+            return CONTEXT_ADAPTER.validate_json(context_bytes)
+
+        if LAZY_CONTEXT_ENABLED:
+            return create_lazy_context(tree, CONTEXT_ITEM_ADAPTER.validate_python)
+        return CONTEXT_ADAPTER.validate_python(tree)
+
+    def _dump_context(self, context: Dict[str, Any]) -> bytes:
+        context = get_raw_context(context)
+        # Fabric.js defaults are restored when the context is parsed again
+        if BINARY_CONTEXT_ENABLED:
+            return pack_context_container(
+                CONTEXT_DUMP_ADAPTER.dump_python(
+                    context, mode="json", context=COMPACT_CONTEXT
+                )
+            )
+        return CONTEXT_DUMP_ADAPTER.dump_json(context, context=COMPACT_CONTEXT)
+
+    def _iter_context_chunks(self, context: Dict[str, Any]) -> Iterator[bytes]:
+        """`_dump_context` in parts: one per variable, or per image of a binary context."""
+        context = get_raw_context(context)
+        if BINARY_CONTEXT_ENABLED:
+            yield from iter_context_container(
+                CONTEXT_DUMP_ADAPTER.dump_python(
+                    context, mode="json", context=COMPACT_CONTEXT
+                )
+            )
+            return
 
-    async def _upload_context(self, context: Dict[str, Any]) -> str:
-        context_bytes = TypeAdapter(Dict[str, Any]).dump_json(context)
-        return await self._storage_client.upload_file(context_bytes, "context.json")
+        yield b"{"
+        for index, (varname, value) in enumerate(context.items()):
+            separator = b"," if index else b""
+            yield separator + json.dumps(varname).encode("utf-8") + b":"
+            yield CONTEXT_VALUE_DUMP_ADAPTER.dump_json(value, context=COMPACT_CONTEXT)
+        yield b"}"
 
     def _create_callbacks(
         self, cycle_id: str
-    ) -> Tuple[Chat2EditCallbacks, Callable[[], Awaitable[None]]]:
+    ) -> Tuple[Mic2eChat2EditCallbacks, Callable[[], Awaitable[None]]]:
         """Create callbacks that publish progress to Redis in order."""
 
         redis_client = self._redis_client
@@ -409,27 +563,34 @@ class Chat2EditServiceImpl(Chat2EditService):
             except Exception as e:
                 print(f"Error enqueueing {event_type} progress: {e}")
 
+        def _dump_progress(model: Any) -> Dict[str, Any]:
+            return model.model_dump(context=PROGRESS_DUMP_CONTEXT)
+
         def on_request(message: Message) -> None:
-            _enqueue_progress("request", message="Sending request to LLM...", data=message.model_dump())
+            _enqueue_progress("request", message="Sending request to LLM...", data=_dump_progress(message))
 
         def on_prompt(message: Message) -> None:
-            _enqueue_progress("prompt", message="Generating prompt...", data=message.model_dump())
+            _enqueue_progress("prompt", message="Generating prompt...", data=_dump_progress(message))
 
         def on_answer(message: Message) -> None:
-            _enqueue_progress("answer", message="Received answer from LLM...", data=message.model_dump())
+            _enqueue_progress("answer", message="Received answer from LLM...", data=_dump_progress(message))
+
+        def on_answer_delta(delta: str) -> None:
+            _enqueue_progress("answer_delta", data=delta)
 
         def on_extract(code: str) -> None:
             _enqueue_progress("extract", message="Extracting code...", data=code)
 
         def on_execute(block: ExecutionBlock) -> None:
             block_type = getattr(block, 'type', None) or getattr(block, 'block_type', None) or str(type(block).__name__)
-            _enqueue_progress("execute", message=f"Executing: {block_type}", data=block.model_dump())
+            _enqueue_progress("execute", message=f"Executing: {block_type}", data=_dump_progress(block))
 
         return (
-            Chat2EditCallbacks(
+            Mic2eChat2EditCallbacks(
                 on_request=on_request,
                 on_prompt=on_prompt,
                 on_answer=on_answer,
+                on_answer_delta=on_answer_delta,
                 on_extract=on_extract,
                 on_execute=on_execute,
             ),
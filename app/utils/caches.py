@@ -0,0 +1,127 @@
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Generic, Hashable, Optional, Tuple, TypeVar
+
+V = TypeVar("V")
+
+
+class TtlCache(Generic[V]):
+    """Small in-memory cache whose entries expire `ttl` seconds after insertion.
+
+    The least recently inserted entries are evicted once `max_size` is reached.
+    """
+
+    def __init__(self, ttl: float, max_size: int = 256):
+        self._ttl = ttl
+        self._max_size = max_size
+        self._entries: "OrderedDict[Hashable, Tuple[float, V]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        self._purge()
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self.get(key) is not None
+
+    def get(self, key: Hashable) -> Optional[V]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+
+        return value
+
+    def set(self, key: Hashable, value: V) -> None:
+        self._purge()
+        self._entries.pop(key, None)
+        self._entries[key] = (time.monotonic() + self._ttl, value)
+
+        while len(self._entries) > self._max_size:
+            self._entries.popitem(last=False)
+
+    def pop(self, key: Hashable) -> Optional[V]:
+        value = self.get(key)
+        self._entries.pop(key, None)
+        return value
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def _purge(self) -> None:
+        now = time.monotonic()
+        expired_keys = [
+            key for key, (expires_at, _) in self._entries.items() if expires_at < now
+        ]
+        for key in expired_keys:
+            del self._entries[key]
+
+
+class LruCache(Generic[V]):
+    """Small in-memory cache that evicts the least recently used entries.
+
+    With `max_bytes`, entries are also evicted once their total size, as given
+    by `get_size`, exceeds it; larger values are not cached at all.
+    """
+
+    def __init__(
+        self,
+        max_size: int = 256,
+        max_bytes: Optional[int] = None,
+        get_size: Optional[Callable[[V], int]] = None,
+    ):
+        if max_bytes is not None and get_size is None:
+            raise ValueError("get_size is required with max_bytes")
+
+        self._max_size = max_size
+        self._max_bytes = max_bytes
+        self._get_size = get_size
+        self._entries: "OrderedDict[Hashable, V]" = OrderedDict()
+        self._sizes: Dict[Hashable, int] = {}
+        self._bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._entries
+
+    @property
+    def bytes(self) -> int:
+        return self._bytes
+
+    def get(self, key: Hashable) -> Optional[V]:
+        if key not in self._entries:
+            return None
+
+        self._entries.move_to_end(key)
+        return self._entries[key]
+
+    def set(self, key: Hashable, value: V) -> None:
+        self.pop(key)
+
+        size = self._get_size(value) if self._max_bytes is not None else 0
+        if self._max_bytes is not None and size > self._max_bytes:
+            return
+
+        self._entries[key] = value
+        self._sizes[key] = size
+        self._bytes += size
+
+        while len(self._entries) > self._max_size or (
+            self._max_bytes is not None and self._bytes > self._max_bytes
+        ):
+            evicted_key, _ = self._entries.popitem(last=False)
+            self._bytes -= self._sizes.pop(evicted_key)
+
+    def pop(self, key: Hashable) -> Optional[V]:
+        self._bytes -= self._sizes.pop(key, 0)
+        return self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._sizes.clear()
+        self._bytes = 0
@@ -0,0 +1,104 @@
+import zlib
+from typing import AsyncIterable, AsyncIterator, Optional
+
+import zstandard
+
+GZIP_MAGIC = b"\x1f\x8b"
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+
+# zlib window bits: gzip container when compressing, gzip or zlib when decompressing
+_GZIP_WBITS = 16 + zlib.MAX_WBITS
+_AUTO_WBITS = 32 + zlib.MAX_WBITS
+
+
+class FileCompressor:
+    """Compresses uploaded files with gzip or zstd and decompresses downloads.
+
+    Compressed files are recognised by their magic bytes, so downloads are
+    decompressed whatever the current setting is, and files stored
+    uncompressed are returned as they are. A zstd dictionary (see
+    scripts/train_zstd_dictionary.py) must stay available for as long as files
+    compressed with it are stored.
+    """
+
+    def __init__(
+        self,
+        method: str = "gzip",
+        level: int = 3,
+        zstd_dictionary: Optional[bytes] = None,
+    ):
+        if method not in ("gzip", "zstd"):
+            raise ValueError(f"Unsupported compression method: {method}")
+
+        self.method = method
+        self._level = level
+        self._zstd_dictionary = (
+            zstandard.ZstdCompressionDict(zstd_dictionary)
+            if zstd_dictionary
+            else None
+        )
+
+    @property
+    def suffix(self) -> str:
+        return ".zst" if self.method == "zstd" else ".gz"
+
+    def compress(self, data: bytes) -> bytes:
+        compressor = self._create_compressor()
+        return compressor.compress(data) + compressor.flush()
+
+    async def compress_chunks(
+        self, chunks: AsyncIterable[bytes]
+    ) -> AsyncIterator[bytes]:
+        compressor = self._create_compressor()
+        async for chunk in chunks:
+            compressed = compressor.compress(chunk)
+            if compressed:
+                yield compressed
+        yield compressor.flush()
+
+    def decompress(self, data: bytes) -> bytes:
+        decompressor = self._create_decompressor(data)
+        if decompressor is None:
+            return data
+        return decompressor.decompress(data)
+
+    async def decompress_chunks(
+        self, chunks: AsyncIterable[bytes]
+    ) -> AsyncIterator[bytes]:
+        # Buffer until the magic bytes are known
+        head = b""
+        iterator = chunks.__aiter__()
+        async for chunk in iterator:
+            head += chunk
+            if len(head) >= len(ZSTD_MAGIC):
+                break
+
+        decompressor = self._create_decompressor(head)
+        if decompressor is None:
+            if head:
+                yield head
+            async for chunk in iterator:
+                yield chunk
+            return
+
+        yield decompressor.decompress(head)
+        async for chunk in iterator:
+            decompressed = decompressor.decompress(chunk)
+            if decompressed:
+                yield decompressed
+
+    def _create_compressor(self):
+        if self.method == "zstd":
+            return zstandard.ZstdCompressor(
+                level=self._level, dict_data=self._zstd_dictionary
+            ).compressobj()
+        return zlib.compressobj(self._level, zlib.DEFLATED, _GZIP_WBITS)
+
+    def _create_decompressor(self, head: bytes):
+        if head.startswith(GZIP_MAGIC):
+            return zlib.decompressobj(_AUTO_WBITS)
+        if head.startswith(ZSTD_MAGIC):
+            return zstandard.ZstdDecompressor(
+                dict_data=self._zstd_dictionary
+            ).decompressobj()
+        return None
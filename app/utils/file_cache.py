@@ -0,0 +1,143 @@
+import hashlib
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+
+class FileCache:
+    """Least recently used cache of file contents, in memory and optionally on disk.
+
+    Both levels are bounded by their total size in bytes. Entries evicted from
+    memory stay on disk, so they can be read again without downloading them.
+    Disk entries survive restarts and are picked up again on construction.
+    """
+
+    def __init__(
+        self,
+        memory_max_bytes: int,
+        disk_dir: Optional[str] = None,
+        disk_max_bytes: int = 0,
+    ):
+        self._memory_max_bytes = memory_max_bytes
+        self._memory: "OrderedDict[str, bytes]" = OrderedDict()
+        self._memory_bytes = 0
+
+        self._disk_dir = disk_dir if disk_dir and disk_max_bytes > 0 else None
+        self._disk_max_bytes = disk_max_bytes
+        # File sizes by disk path, least recently used first
+        self._disk: "OrderedDict[str, int]" = OrderedDict()
+        self._disk_bytes = 0
+
+        self._lock = threading.Lock()
+        if self._disk_dir:
+            os.makedirs(self._disk_dir, exist_ok=True)
+            self._load_disk_index()
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            data = self._memory.get(key)
+            if data is not None:
+                self._memory.move_to_end(key)
+                return data
+
+        if not self._disk_dir:
+            return None
+
+        path = self._get_path(key)
+        try:
+            with open(path, "rb") as file:
+                data = file.read()
+            os.utime(path)
+        except OSError:
+            return None
+
+        with self._lock:
+            if path in self._disk:
+                self._disk.move_to_end(path)
+            self._set_memory(key, data)
+        return data
+
+    def set(self, key: str, data: bytes) -> None:
+        with self._lock:
+            self._set_memory(key, data)
+
+        if not self._disk_dir or len(data) > self._disk_max_bytes:
+            return
+
+        path = self._get_path(key)
+        try:
+            # Write to a temporary file first, so readers never see partial files
+            fd, temp_path = tempfile.mkstemp(dir=self._disk_dir, suffix=".tmp")
+            with os.fdopen(fd, "wb") as file:
+                file.write(data)
+            os.replace(temp_path, path)
+        except OSError:
+            return
+
+        with self._lock:
+            self._disk_bytes -= self._disk.pop(path, 0)
+            self._disk[path] = len(data)
+            self._disk_bytes += len(data)
+            self._evict_disk()
+
+    def pop(self, key: str) -> None:
+        with self._lock:
+            data = self._memory.pop(key, None)
+            if data is not None:
+                self._memory_bytes -= len(data)
+
+            if self._disk_dir:
+                path = self._get_path(key)
+                self._disk_bytes -= self._disk.pop(path, 0)
+                self._remove_file(path)
+
+    def _set_memory(self, key: str, data: bytes) -> None:
+        previous = self._memory.pop(key, None)
+        if previous is not None:
+            self._memory_bytes -= len(previous)
+
+        if len(data) > self._memory_max_bytes:
+            return
+
+        self._memory[key] = data
+        self._memory_bytes += len(data)
+        while self._memory_bytes > self._memory_max_bytes:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_bytes -= len(evicted)
+
+    def _evict_disk(self) -> None:
+        while self._disk_bytes > self._disk_max_bytes:
+            path, size = self._disk.popitem(last=False)
+            self._disk_bytes -= size
+            self._remove_file(path)
+
+    def _load_disk_index(self) -> None:
+        entries = []
+        for name in os.listdir(self._disk_dir):
+            path = os.path.join(self._disk_dir, name)
+            if name.endswith(".tmp"):
+                self._remove_file(path)
+                continue
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, path, stat.st_size))
+
+        for _, path, size in sorted(entries):
+            self._disk[path] = size
+            self._disk_bytes += size
+        self._evict_disk()
+
+    def _get_path(self, key: str) -> str:
+        name = hashlib.sha256(key.encode("utf-8")).hexdigest()
+        return os.path.join(self._disk_dir, name)
+
+    @staticmethod
+    def _remove_file(path: str) -> None:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
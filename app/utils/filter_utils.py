@@ -0,0 +1,195 @@
+import threading
+from typing import Any, Optional, Sequence
+
+import numpy as np
+from PIL import Image, ImageFilter
+
+from app.env import FILTERED_IMAGE_CACHE_SIZE
+from app.utils.caches import LruCache
+from app.utils.image_utils import (
+    convert_data_url_to_image,
+    get_data_url_digest,
+    get_image_nbytes,
+)
+
+# ITU-R 601-2 luma, as used by PIL for "L" conversions
+LUMA_WEIGHTS = np.array([0.299, 0.587, 0.114])
+
+# Filters applied per channel through a lookup table
+LUT_FILTER_TYPES = {"Brightness", "Contrast", "Invert"}
+# Filters mixing channels, applied one at a time as PIL does
+GREY_FILTER_TYPES = {"Saturation", "BlackWhite"}
+
+_LUT_VALUES = np.arange(256, dtype=np.float32)
+
+# Filtered images by (source digest, filter chain), shared by base images and objects
+_filtered_images: LruCache[Image.Image] = LruCache(
+    max_bytes=FILTERED_IMAGE_CACHE_SIZE * 1024 * 1024, get_size=get_image_nbytes
+)
+_filtered_images_lock = threading.Lock()
+
+
+class _FilterPipeline:
+    """Applies a filter chain with as few passes over the pixels as possible.
+
+    Consecutive lookup-table filters are composed into a single table, which is
+    only applied when a channel-mixing filter or a blur follows. Those are
+    applied with the same PIL calls as before, so results match the per-filter
+    implementation; once the image is grey, further channel mixing is skipped.
+    Alpha is kept aside and only used by blur, which works on premultiplied
+    colours.
+    """
+
+    def __init__(self, image: Image.Image):
+        self._alpha: Optional[Image.Image] = (
+            image.convert("RGBA").getchannel("A") if _has_alpha(image) else None
+        )
+        self._rgb = image.convert("RGB")
+        self._lut: Optional[np.ndarray] = None
+        # Set once all channels are equal, which every later filter preserves
+        self._grey = False
+
+    def apply(self, filter: Any) -> None:
+        filter_type = getattr(filter, "type", None)
+
+        if filter_type in LUT_FILTER_TYPES:
+            lut = self._create_lut(filter_type, filter)
+            if lut is not None:
+                self._lut = lut if self._lut is None else np.take_along_axis(
+                    lut, self._lut.astype(np.intp), axis=1
+                )
+        elif filter_type in GREY_FILTER_TYPES and not self._grey:
+            self._flush_lut()
+            self._mix(filter_type, filter)
+        elif filter_type == "Blur":
+            self._flush_lut()
+            self._blur(filter)
+
+    def result(self) -> Image.Image:
+        self._flush_lut()
+        if self._alpha is None:
+            return self._rgb
+
+        result = self._rgb.copy()
+        result.putalpha(self._alpha)
+        return result
+
+    def _create_lut(self, filter_type: str, filter: Any) -> Optional[np.ndarray]:
+        """Per-channel table (3 x 256) reproducing PIL's ImageEnhance/ImageOps."""
+        if filter_type == "Brightness":
+            factor = np.float32(1.0 + getattr(filter, "brightness", 0))
+            table = np.tile(_truncate(factor * _LUT_VALUES), (3, 1))
+        elif filter_type == "Contrast":
+            factor = np.float32(1.0 + getattr(filter, "contrast", 0))
+            mean = np.float32(self._get_mean_luma())
+            table = np.tile(_truncate(mean + factor * (_LUT_VALUES - mean)), (3, 1))
+        elif filter_type == "Invert":
+            if not getattr(filter, "invert", True):
+                return None
+            table = np.tile(255 - _LUT_VALUES, (3, 1)).astype(np.uint8)
+        else:
+            return None
+
+        return table
+
+    def _get_mean_luma(self) -> int:
+        """Mean of the grey image, as `ImageEnhance.Contrast` uses it, rounded.
+
+        Computed from the channel histograms, so a pending table does not need
+        to be applied first.
+        """
+        histograms = np.array(self._rgb.histogram(), dtype=np.float64).reshape(3, 256)
+        values = np.tile(np.arange(256, dtype=np.float64), (3, 1))
+        if self._lut is not None:
+            values = self._lut.astype(np.float64)
+
+        channel_means = (histograms * values).sum(axis=1) / histograms.sum(axis=1)
+        return int(float(LUMA_WEIGHTS @ channel_means) + 0.5)
+
+    def _mix(self, filter_type: str, filter: Any) -> None:
+        """Saturation and black & white, as `ImageEnhance.Color` and PIL do them.
+
+        PIL rounds the grey image and truncates the blend; composing these into
+        one colour matrix skips that rounding, and the error grows with each
+        filter of a chain.
+        """
+        grey = self._rgb.convert("L").convert("RGB")
+        if filter_type == "BlackWhite":
+            self._rgb = grey
+            self._grey = True
+        else:
+            factor = 1.0 + getattr(filter, "saturation", 0)
+            self._rgb = Image.blend(grey, self._rgb, factor)
+
+    def _blur(self, filter: Any) -> None:
+        # Blur value in [-1.0, 1.0] -> radius in [0, ~10]
+        radius = abs(getattr(filter, "blur", 0)) * 10
+        if radius <= 0:
+            return
+
+        blur = ImageFilter.GaussianBlur(radius=radius)
+        if self._alpha is None:
+            self._rgb = self._rgb.filter(blur)
+            return
+
+        # Blur premultiplied colours so transparent pixels do not bleed in
+        rgba = self._rgb.copy()
+        rgba.putalpha(self._alpha)
+        blurred = rgba.convert("RGBa").filter(blur).convert("RGBA")
+        self._rgb = blurred.convert("RGB")
+        self._alpha = blurred.getchannel("A")
+
+    def _flush_lut(self) -> None:
+        if self._lut is not None:
+            self._rgb = self._rgb.point(self._lut.astype(np.uint8).flatten().tolist())
+            self._lut = None
+
+
+def apply_filters(image: Image.Image, filters: Sequence[Any]) -> Image.Image:
+    """Apply Fabric.js filters (dispatched on their `type`) to an image.
+
+    Values are in range [-1.0, 1.0], which corresponds to [-100%, +100%].
+    Unknown filter types are ignored. The result is RGB, or RGBA when the input
+    has an alpha channel, which the colour filters leave untouched.
+    """
+    if not filters:
+        return image
+
+    pipeline = _FilterPipeline(image)
+    for filter in filters:
+        pipeline.apply(filter)
+
+    return pipeline.result()
+
+
+def get_filtered_image(
+    src: str, filters: Sequence[Any], src_digest: Optional[str] = None
+) -> Image.Image:
+    """Decode an image data URL and apply its filters, reusing earlier results.
+
+    Results are cached by the digest of the source and the filter chain, so an
+    object or base image is only decoded and filtered again after its pixels or
+    filters change. Pass `src_digest` when it is already known. The returned
+    image is a copy and may be modified.
+    """
+    key = (
+        src_digest or get_data_url_digest(src),
+        tuple(filter.model_dump_json() for filter in filters),
+    )
+    with _filtered_images_lock:
+        filtered_image = _filtered_images.get(key)
+
+    if filtered_image is None:
+        filtered_image = apply_filters(convert_data_url_to_image(src), filters)
+        with _filtered_images_lock:
+            _filtered_images.set(key, filtered_image)
+
+    return filtered_image.copy()
+
+
+def _truncate(values: np.ndarray) -> np.ndarray:
+    return np.clip(np.floor(values), 0, 255).astype(np.uint8)
+
+
+def _has_alpha(image: Image.Image) -> bool:
+    return "A" in image.getbands() or "transparency" in image.info
@@ -1,11 +1,12 @@
 import base64
+import hashlib
 import io
 import re
-from typing import List, Tuple
+from typing import Dict, Iterable, List, Tuple
 
 import numpy as np
 from PIL import Image
-from scipy.ndimage import binary_dilation
+from scipy.ndimage import binary_dilation, uniform_filter
 
 
 def convert_ndarray_to_mask_image(image: np.ndarray) -> Image.Image:
@@ -47,6 +48,16 @@ def convert_image_to_data_url(image: Image.Image) -> str:
     return f"data:image/png;base64,{base64.b64encode(png_bytes).decode('utf-8')}"
 
 
+def get_data_url_digest(data_url: str) -> str:
+    """Digest of a data URL, to key caches by content without keeping the URL."""
+    return hashlib.blake2b(data_url.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def get_image_nbytes(image: Image.Image) -> int:
+    """Memory used by the decoded pixels of an image."""
+    return image.width * image.height * len(image.getbands())
+
+
 def convert_data_url_to_image(data_url: str) -> Image.Image:
     match = re.search(r"data:image/(.*?);base64,(.*)", data_url)
     if not match:
@@ -133,3 +144,82 @@ def convert_mask_image_to_points(
         return []
     indices = np.linspace(0, xs.size - 1, count, dtype=int)
     return [(int(xs[i]), int(ys[i])) for i in indices]
+
+
+def resize_image_to_max_size(image: Image.Image, max_size: int) -> Image.Image:
+    """Downscale so that the longer edge is at most `max_size`, keeping aspect ratio."""
+    if max(image.width, image.height) <= max_size:
+        return image
+
+    resized_image = image.copy()
+    # reducing_gap first shrinks by an integer factor, which is much faster
+    resized_image.thumbnail(
+        (max_size, max_size), Image.Resampling.LANCZOS, reducing_gap=3.0
+    )
+    return resized_image
+
+
+def create_image_pyramid(
+    image: Image.Image, max_sizes: Iterable[int]
+) -> Dict[int, Image.Image]:
+    """Create downscaled copies of an image, one per maximum edge length.
+
+    Each level is derived from the next larger one rather than from the original.
+    """
+    pyramid: Dict[int, Image.Image] = {}
+    current_image = image
+    for max_size in sorted(max_sizes, reverse=True):
+        current_image = resize_image_to_max_size(current_image, max_size)
+        pyramid[max_size] = current_image
+
+    return pyramid
+
+
+def convert_image_to_webp_bytes(image: Image.Image, quality: int = 80) -> bytes:
+    buffer = io.BytesIO()
+    image.save(buffer, format="WEBP", quality=quality)
+    return buffer.getvalue()
+
+
+def upscale_mask_image(
+    mask_image: Image.Image, guide_image: Image.Image, eps: float = 1e-3
+) -> Image.Image:
+    """Upsample a low-resolution mask to the size of `guide_image`.
+
+    The mask is resized bilinearly and its edges are then snapped to the edges of
+    the guide with a guided filter, which recovers detail lost by the downscale.
+    Only the area around the mask is filtered.
+    """
+    scale = guide_image.width / mask_image.width
+    soft_mask = mask_image.convert("L").resize(guide_image.size, Image.Resampling.BILINEAR)
+    bbox = soft_mask.getbbox()
+    if bbox is None:
+        return soft_mask
+
+    radius = max(2, int(np.ceil(scale)) * 2)
+    margin = radius * 2
+    x1, y1 = max(0, bbox[0] - margin), max(0, bbox[1] - margin)
+    x2 = min(guide_image.width, bbox[2] + margin)
+    y2 = min(guide_image.height, bbox[3] + margin)
+
+    guide = np.asarray(
+        guide_image.convert("L").crop((x1, y1, x2, y2)), dtype=np.float32
+    ) / 255
+    mask = np.asarray(soft_mask.crop((x1, y1, x2, y2)), dtype=np.float32) / 255
+
+    def box_mean(array: np.ndarray) -> np.ndarray:
+        return uniform_filter(array, size=2 * radius + 1, mode="reflect")
+
+    mean_guide = box_mean(guide)
+    mean_mask = box_mean(mask)
+    covariance = box_mean(guide * mask) - mean_guide * mean_mask
+    variance = box_mean(guide * guide) - mean_guide * mean_guide
+    a = covariance / (variance + eps)
+    b = mean_mask - a * mean_guide
+    refined = box_mean(a) * guide + box_mean(b)
+
+    upscaled_mask = Image.new("L", guide_image.size, 0)
+    upscaled_mask.paste(
+        Image.fromarray(((refined > 0.5) * 255).astype(np.uint8)), (x1, y1)
+    )
+    return upscaled_mask
@@ -0,0 +1,120 @@
+"""
+Benchmark parsing and dumping of chat2edit contexts.
+
+Builds a realistic context (several images, each with segmented objects,
+annotations and filters), then times `validate_json` and `dump_json` the way
+`Chat2EditServiceImpl` downloads and uploads contexts:
+
+    python scripts/benchmark_context.py --images 4 --objects 50
+
+Run with BINARY_CONTEXT_ENABLED=true to measure the binary context format, and
+with LAZY_CONTEXT_ENABLED=true to measure loading without validating values.
+"""
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+from PIL import Image as PILImage
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+def _create_context(num_images: int, num_objects: int, size: int) -> dict:
+    from app.core.chat2edit.models import Box, Image, Object, Point, Text
+    from app.core.chat2edit.models.fabric.filters import (
+        BrightnessFilter,
+        ContrastFilter,
+        InvertFilter,
+    )
+    from app.utils.image_utils import convert_image_to_data_url
+
+    rng = np.random.default_rng(0)
+    context = {}
+    for i in range(num_images):
+        pixels = rng.integers(0, 255, (size, size, 3), dtype=np.uint8)
+        image = Image.model_validate(
+            {
+                "width": size,
+                "height": size,
+                "objects": [
+                    {
+                        "type": "Image",
+                        "src": convert_image_to_data_url(PILImage.fromarray(pixels)),
+                        "width": size,
+                        "height": size,
+                        "filters": [{"type": "Brightness", "brightness": 0.1}],
+                    }
+                ],
+            }
+        )
+
+        objects = []
+        for j in range(num_objects):
+            mask = rng.integers(0, 255, (32, 32, 4), dtype=np.uint8)
+            obj = Object(
+                src=convert_image_to_data_url(PILImage.fromarray(mask, "RGBA")),
+                width=32,
+                height=32,
+                left=float(rng.uniform(-size / 2, size / 2)),
+                top=float(rng.uniform(-size / 2, size / 2)),
+                image_id=image.id,
+            )
+            obj.filters = [BrightnessFilter(brightness=0.2), ContrastFilter(contrast=-0.1)]
+            if j % 3 == 0:
+                obj.filters.append(InvertFilter())
+            objects.append(obj)
+            context[f"object_{i}_{j}"] = obj
+
+        image.add_objects(objects)
+        image.add_objects(
+            [Box(left=0, top=0, width=40, height=40), Point(left=5, top=5)]
+            + [Text(text="label", left=10, top=10)]
+        )
+        context[f"image_{i}"] = image
+        context[f"objects_{i}"] = objects
+
+    context["count"] = num_images
+    return context
+
+
+def _time(function, repeats: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeats):
+        function()
+    return (time.perf_counter() - start) / repeats
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--images", type=int, default=4)
+    parser.add_argument("--objects", type=int, default=50, help="Objects per image")
+    parser.add_argument("--size", type=int, default=256, help="Image edge in pixels")
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    os.environ.setdefault("PORT", "8000")
+    from app.services.impl.chat2edit_service_impl import (
+        CONTEXT_DUMP_ADAPTER,
+        Chat2EditServiceImpl,
+    )
+
+    context = _create_context(args.images, args.objects, args.size)
+    service = Chat2EditServiceImpl.__new__(Chat2EditServiceImpl)
+
+    context_bytes = service._dump_context(context)
+    full_context_bytes = CONTEXT_DUMP_ADAPTER.dump_json(context)
+    dump_time = _time(lambda: service._dump_context(context), args.repeats)
+    parse_time = _time(lambda: service._parse_context(context_bytes), args.repeats)
+
+    print(f"context size  {len(context_bytes) / 1e6:8.2f} MB")
+    print(f"  with defaults {len(full_context_bytes) / 1e6:6.2f} MB")
+    print(f"dump          {dump_time * 1000:8.1f} ms")
+    print(f"parse         {parse_time * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""
+Benchmark sequential vs batched segmentation against the fake inference server.
+
+Runs `segment_objects` once per prompt and then once with all prompts batched
+into a single request, and does the same for `segment_object` with boxes.
+Without `--url`, a fake inference server is started in-process:
+
+    python scripts/benchmark_segmentation.py --prompts cat dog bird --size 2048
+
+Pass `--proxy-max-size 1024` to segment on a downscaled proxy (SAM3_PROXY_MAX_SIZE).
+"""
+
+import argparse
+import asyncio
+import os
+import socket
+import sys
+import threading
+import time
+from pathlib import Path
+
+import httpx
+import numpy as np
+import uvicorn
+from PIL import Image as PILImage
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+def _start_fake_server() -> str:
+    from scripts.fake_inference_server import app as fake_app
+
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+
+    server = uvicorn.Server(
+        uvicorn.Config(fake_app, host="127.0.0.1", port=port, log_level="warning")
+    )
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+
+    return f"http://127.0.0.1:{port}"
+
+
+async def _get_stats(url: str) -> dict:
+    async with httpx.AsyncClient() as client:
+        response = await client.get(f"{url}/stats")
+        return response.json()
+
+
+async def _run(url: str, prompts: list, size: int, repeats: int) -> None:
+    from app.core.chat2edit.functions.segment_object import segment_object
+    from app.core.chat2edit.functions.segment_objects import segment_objects
+    from app.core.chat2edit.models import Box, Image
+    from app.utils.image_utils import convert_image_to_data_url
+
+    rng = np.random.default_rng(0)
+    pil_image = PILImage.fromarray(
+        rng.integers(0, 255, (size, size, 3), dtype=np.uint8)
+    )
+    image = Image.model_validate(
+        {
+            "width": size,
+            "height": size,
+            "objects": [
+                {
+                    "type": "Image",
+                    "src": convert_image_to_data_url(pil_image),
+                    "width": size,
+                    "height": size,
+                }
+            ],
+        }
+    )
+    boxes = [
+        Box(left=-size / 4 + i * 20, top=-size / 4, width=size / 8, height=size / 8)
+        for i in range(len(prompts))
+    ]
+
+    # The chat2edit decorators require call results to be assigned
+    async def sequential_texts():
+        for prompt in prompts:
+            objects = await segment_objects(image, prompt, 1)
+
+    async def batched_texts():
+        grouped_objects = await segment_objects(image, prompts, 1)
+
+    async def sequential_boxes():
+        for box in boxes:
+            obj = await segment_object(image, box=box)
+
+    async def batched_boxes():
+        objects = await segment_object(image, box=boxes)
+
+    for name, run in [
+        ("segment_objects sequential", sequential_texts),
+        ("segment_objects batched", batched_texts),
+        ("segment_object sequential", sequential_boxes),
+        ("segment_object batched", batched_boxes),
+    ]:
+        before = await _get_stats(url)
+        start = time.perf_counter()
+        for _ in range(repeats):
+            await run()
+        elapsed = (time.perf_counter() - start) / repeats
+        after = await _get_stats(url)
+
+        requests = (after["request_count"] - before["request_count"]) / repeats
+        uploaded = (after["uploaded_bytes"] - before["uploaded_bytes"]) / repeats
+        print(
+            f"{name:<28} {elapsed * 1000:8.1f} ms  "
+            f"{requests:4.0f} requests  {uploaded / 1e6:8.2f} MB uploaded"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--url", default=None, help="Inference API URL")
+    parser.add_argument("--prompts", nargs="+", default=["cat", "dog"])
+    parser.add_argument("--size", type=int, default=1024, help="Image edge in pixels")
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument(
+        "--proxy-max-size", type=int, default=0, help="SAM3 proxy longest edge"
+    )
+    args = parser.parse_args()
+
+    url = args.url or _start_fake_server()
+    os.environ.setdefault("PORT", "8000")
+    os.environ["INFERENCE_API_URL"] = url
+    os.environ["SAM3_PROXY_MAX_SIZE"] = str(args.proxy_max_size)
+
+    asyncio.run(_run(url, args.prompts, args.size, args.repeats))
+
+
+if __name__ == "__main__":
+    main()
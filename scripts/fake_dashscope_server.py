@@ -0,0 +1,133 @@
+"""
+Local stand-in for the DashScope Qwen image edit API used for development and testing.
+
+Implements the endpoints called by `QwenClient`: the generation request, task
+status and the result image download. The "edit" inverts the colours of the
+request image after a simulated latency:
+
+    python scripts/fake_dashscope_server.py --port 8002
+    DASHSCOPE_API_URL=http://localhost:8002/api/v1 DASHSCOPE_API_KEY=fake python run.py
+
+With `--async-tasks` the generation request returns a task id, and the task
+succeeds `--task-latency` seconds later; otherwise the request itself takes
+that long and returns the result directly.
+"""
+
+import argparse
+import asyncio
+import base64
+import os
+import time
+from io import BytesIO
+from typing import Any, Dict
+
+import uvicorn
+from fastapi import FastAPI, Request, Response
+from fastapi.responses import JSONResponse
+from PIL import Image, ImageOps
+
+TASK_LATENCY = float(os.getenv("FAKE_DASHSCOPE_TASK_LATENCY", "1.0"))
+ASYNC_TASKS = os.getenv("FAKE_DASHSCOPE_ASYNC_TASKS", "false").lower() == "true"
+
+app = FastAPI()
+app.state.task_latency = TASK_LATENCY
+app.state.async_tasks = ASYNC_TASKS
+app.state.request_count = 0
+app.state.status_count = 0
+app.state.download_count = 0
+# Tasks by id: finish time and result image (PNG bytes)
+app.state.tasks = {}
+
+
+def _edit_image(data_url: str) -> bytes:
+    _, encoded = data_url.split(",", 1)
+    image = Image.open(BytesIO(base64.b64decode(encoded))).convert("RGB")
+    buffer = BytesIO()
+    ImageOps.invert(image).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def _get_result_url(request: Request, task_id: str) -> str:
+    return str(request.url_for("get_result", task_id=task_id))
+
+
+def _succeeded_output(request: Request, task_id: str) -> Dict[str, Any]:
+    return {
+        "task_id": task_id,
+        "task_status": "SUCCEEDED",
+        "choices": [
+            {
+                "message": {
+                    "role": "assistant",
+                    "content": [{"image": _get_result_url(request, task_id)}],
+                }
+            }
+        ],
+    }
+
+
+@app.post("/api/v1/services/aigc/multimodal-generation/generation")
+async def generation(request: Request):
+    app.state.request_count += 1
+    if not request.headers.get("authorization", "").startswith("Bearer "):
+        return JSONResponse({"code": "InvalidApiKey"}, status_code=401)
+
+    payload = await request.json()
+    content = payload["input"]["messages"][0]["content"]
+    data_url = next(item["image"] for item in content if "image" in item)
+    result = await asyncio.to_thread(_edit_image, data_url)
+
+    task_id = f"task-{len(app.state.tasks)}"
+    app.state.tasks[task_id] = {
+        "finish_time": time.monotonic() + app.state.task_latency,
+        "result": result,
+    }
+
+    if app.state.async_tasks:
+        return {"output": {"task_id": task_id, "task_status": "PENDING"}}
+
+    await asyncio.sleep(app.state.task_latency)
+    return {"output": _succeeded_output(request, task_id)}
+
+
+@app.get("/api/v1/tasks/{task_id}")
+async def get_task(task_id: str, request: Request):
+    app.state.status_count += 1
+    task = app.state.tasks.get(task_id)
+    if task is None:
+        return JSONResponse({"code": "NotFound"}, status_code=404)
+
+    if time.monotonic() < task["finish_time"]:
+        return {"output": {"task_id": task_id, "task_status": "RUNNING"}}
+    return {"output": _succeeded_output(request, task_id)}
+
+
+@app.get("/results/{task_id}.png", name="get_result")
+async def get_result(task_id: str):
+    app.state.download_count += 1
+    task = app.state.tasks.get(task_id)
+    if task is None:
+        return Response(status_code=404)
+    return Response(content=task["result"], media_type="image/png")
+
+
+@app.get("/stats")
+async def stats():
+    return {
+        "request_count": app.state.request_count,
+        "status_count": app.state.status_count,
+        "download_count": app.state.download_count,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8002)
+    parser.add_argument("--task-latency", type=float, default=TASK_LATENCY)
+    parser.add_argument("--async-tasks", action="store_true", default=ASYNC_TASKS)
+    args = parser.parse_args()
+
+    app.state.task_latency = args.task_latency
+    app.state.async_tasks = args.async_tasks
+    uvicorn.run(app, host=args.host, port=args.port)
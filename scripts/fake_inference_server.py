@@ -0,0 +1,252 @@
+"""
+Local stand-in for the inference API used for development, testing and benchmarks.
+
+Implements the endpoints called by `InferenceClient` with deterministic, cheap
+outputs (ellipse masks, mean-colour inpainting) and a configurable simulated
+latency, so the agent can be exercised without GPUs:
+
+    python scripts/fake_inference_server.py --port 8001
+    INFERENCE_API_URL=http://localhost:8001 python run.py
+
+Latency model (seconds): every request costs `--request-latency`, plus
+`--prompt-latency` per prompt (text, box or point set) it contains.
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+from email.parser import BytesParser
+from email.policy import HTTP
+from io import BytesIO
+from typing import Any, Dict, List, Tuple
+from zipfile import ZipFile
+
+import uvicorn
+from fastapi import FastAPI, Request, Response
+from PIL import Image, ImageDraw, ImageStat
+
+REQUEST_LATENCY = float(os.getenv("FAKE_INFERENCE_REQUEST_LATENCY", "0.05"))
+PROMPT_LATENCY = float(os.getenv("FAKE_INFERENCE_PROMPT_LATENCY", "0.1"))
+
+app = FastAPI()
+app.state.request_latency = REQUEST_LATENCY
+app.state.prompt_latency = PROMPT_LATENCY
+app.state.request_count = 0
+app.state.uploaded_bytes = 0
+
+
+async def _parse_form(request: Request) -> Tuple[Dict[str, str], Dict[str, bytes]]:
+    """Parse a multipart/form-data body without python-multipart."""
+    body = await request.body()
+    app.state.request_count += 1
+    app.state.uploaded_bytes += len(body)
+
+    content_type = request.headers.get("content-type", "")
+    if not content_type.startswith("multipart/form-data"):
+        return {}, {}
+
+    message = BytesParser(policy=HTTP).parsebytes(
+        f"Content-Type: {content_type}\r\n\r\n".encode("utf-8") + body
+    )
+    fields: Dict[str, str] = {}
+    files: Dict[str, bytes] = {}
+    for part in message.iter_parts():
+        name = part.get_param("name", header="content-disposition")
+        payload = part.get_payload(decode=True) or b""
+        if part.get_filename() is not None:
+            files[name] = payload
+        else:
+            fields[name] = payload.decode("utf-8")
+
+    return fields, files
+
+
+async def _simulate_latency(num_prompts: int) -> None:
+    await asyncio.sleep(
+        app.state.request_latency + app.state.prompt_latency * num_prompts
+    )
+
+
+def _open_image(data: bytes) -> Image.Image:
+    return Image.open(BytesIO(data)).convert("RGB")
+
+
+def _encode_png(image: Image.Image) -> bytes:
+    buffer = BytesIO()
+    image.save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def _png_response(image: Image.Image) -> Response:
+    return Response(content=_encode_png(image), media_type="image/png")
+
+
+def _zip_response(entries: List[Tuple[str, Image.Image]]) -> Response:
+    buffer = BytesIO()
+    with ZipFile(buffer, "w") as zip_file:
+        for filename, image in entries:
+            zip_file.writestr(filename, _encode_png(image))
+    return Response(content=buffer.getvalue(), media_type="application/zip")
+
+
+def _ellipse_mask(size: Tuple[int, int], bbox: List[float]) -> Image.Image:
+    mask = Image.new("L", size, 0)
+    x_min, y_min, x_max, y_max = bbox
+    ImageDraw.Draw(mask).ellipse(
+        [x_min, y_min, max(x_min + 1, x_max), max(y_min + 1, y_max)], fill=255
+    )
+    return mask
+
+
+def _mask_from_box(size: Tuple[int, int], box: Dict[str, Any]) -> Image.Image:
+    return _ellipse_mask(size, [box["x_min"], box["y_min"], box["x_max"], box["y_max"]])
+
+
+def _mask_from_points(size: Tuple[int, int], points: List[Dict[str, Any]]) -> Image.Image:
+    radius = max(8, min(size) // 10)
+    mask = Image.new("L", size, 0)
+    draw = ImageDraw.Draw(mask)
+    for point in points:
+        if point.get("label", 1) == 1:
+            x, y = point["x"], point["y"]
+            draw.ellipse([x - radius, y - radius, x + radius, y + radius], fill=255)
+    return mask
+
+
+def _masks_from_text(size: Tuple[int, int], text: str) -> List[Tuple[float, Image.Image]]:
+    """Derive 1-3 deterministic ellipse masks from the prompt text."""
+    digest = hashlib.sha256(text.encode("utf-8")).digest()
+    width, height = size
+    masks = []
+    for i in range(digest[0] % 3 + 1):
+        cx = (digest[1 + i] / 255) * width * 0.6 + width * 0.2
+        cy = (digest[4 + i] / 255) * height * 0.6 + height * 0.2
+        rx = width * (0.05 + digest[7 + i] / 255 * 0.1)
+        ry = height * (0.05 + digest[10 + i] / 255 * 0.1)
+        score = round(0.5 + digest[13 + i] / 510, 4) + i * 1e-4
+        masks.append((score, _ellipse_mask(size, [cx - rx, cy - ry, cx + rx, cy + ry])))
+    return masks
+
+
+def _fill_mask_with_mean(image: Image.Image, mask: Image.Image) -> Image.Image:
+    mask = mask.convert("L").resize(image.size)
+    mean = tuple(int(v) for v in ImageStat.Stat(image).mean[:3])
+    result = image.copy()
+    result.paste(Image.new("RGB", image.size, mean), (0, 0), mask)
+    return result
+
+
+@app.post("/sam3/generate-mask")
+async def sam3_generate_mask(request: Request):
+    fields, files = await _parse_form(request)
+    image = _open_image(files["image"])
+    await _simulate_latency(1)
+
+    if "box" in fields:
+        return _png_response(_mask_from_box(image.size, json.loads(fields["box"])))
+    return _png_response(_mask_from_points(image.size, json.loads(fields["points"])))
+
+
+@app.post("/sam3/generate-masks")
+async def sam3_generate_masks(request: Request):
+    fields, files = await _parse_form(request)
+    image = _open_image(files["image"])
+    await _simulate_latency(1)
+
+    masks = _masks_from_text(image.size, fields["text"])
+    return _zip_response([(f"{score}.png", mask) for score, mask in masks])
+
+
+@app.post("/sam3/generate-mask/batch")
+async def sam3_generate_mask_batch(request: Request):
+    fields, files = await _parse_form(request)
+    image = _open_image(files["image"])
+    boxes = json.loads(fields["boxes"])
+    await _simulate_latency(len(boxes))
+
+    return _zip_response(
+        [(f"{i}.png", _mask_from_box(image.size, box)) for i, box in enumerate(boxes)]
+    )
+
+
+@app.post("/sam3/generate-masks/batch")
+async def sam3_generate_masks_batch(request: Request):
+    fields, files = await _parse_form(request)
+    image = _open_image(files["image"])
+    texts = json.loads(fields["texts"])
+    await _simulate_latency(len(texts))
+
+    entries = []
+    for i, text in enumerate(texts):
+        for score, mask in _masks_from_text(image.size, text):
+            entries.append((f"{i}/{score}.png", mask))
+    return _zip_response(entries)
+
+
+@app.post("/object-clear/inpaint")
+@app.post("/sd-inpaint/inpaint")
+async def inpaint(request: Request):
+    _, files = await _parse_form(request)
+    image = _open_image(files["image"])
+    mask = Image.open(BytesIO(files["mask"]))
+    await _simulate_latency(1)
+
+    return _png_response(_fill_mask_with_mean(image, mask))
+
+
+@app.post("/gligen/inpaint")
+async def gligen_inpaint(request: Request):
+    _, files = await _parse_form(request)
+    image = _open_image(files["image"])
+    await _simulate_latency(1)
+
+    return _png_response(image)
+
+
+@app.post("/flux/generate")
+async def flux_generate(request: Request):
+    await _parse_form(request)
+    await _simulate_latency(1)
+
+    return _png_response(Image.new("RGB", (512, 512), (127, 127, 127)))
+
+
+@app.post("/aesthetic-regressor/score")
+async def aesthetic_regressor_score(request: Request):
+    _, files = await _parse_form(request)
+    image = _open_image(files["image"])
+    await _simulate_latency(1)
+
+    # Nudge each statistic towards a mid value, in percent
+    stat = ImageStat.Stat(image)
+    brightness = sum(stat.mean) / 3
+    contrast = sum(stat.stddev) / 3
+    saturation = ImageStat.Stat(image.convert("HSV")).mean[1]
+    return {
+        "brightness": round((128 - brightness) / 128 * 20, 2),
+        "saturation": round((110 - saturation) / 110 * 20, 2),
+        "contrast": round((60 - contrast) / 60 * 20, 2),
+    }
+
+
+@app.get("/stats")
+async def stats():
+    return {
+        "request_count": app.state.request_count,
+        "uploaded_bytes": app.state.uploaded_bytes,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument("--request-latency", type=float, default=REQUEST_LATENCY)
+    parser.add_argument("--prompt-latency", type=float, default=PROMPT_LATENCY)
+    args = parser.parse_args()
+
+    app.state.request_latency = args.request_latency
+    app.state.prompt_latency = args.prompt_latency
+    uvicorn.run(app, host=args.host, port=args.port)
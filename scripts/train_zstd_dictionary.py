@@ -0,0 +1,56 @@
+"""
+Train a zstd dictionary for compressing stored contexts.
+
+Fabric JSON repeats the same keys and values in every object, which a
+dictionary lets zstd exploit even in small files. Samples are the variables of
+the given context files (JSON contexts, as downloaded from storage):
+
+    python scripts/train_zstd_dictionary.py contexts/*.json -o context.zdict
+
+Set STORAGE_COMPRESSION=zstd and STORAGE_ZSTD_DICTIONARY=context.zdict to use
+it. Files compressed with a dictionary can only be read with that dictionary.
+"""
+
+import argparse
+import json
+from pathlib import Path
+from typing import List
+
+import zstandard
+
+
+def _load_samples(paths: List[Path]) -> List[bytes]:
+    samples = []
+    for path in paths:
+        context = json.loads(path.read_bytes())
+        for value in context.values():
+            samples.append(json.dumps(value, separators=(",", ":")).encode("utf-8"))
+    return samples
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("contexts", type=Path, nargs="+", help="JSON context files")
+    parser.add_argument("-o", "--output", type=Path, required=True)
+    parser.add_argument("--size", type=int, default=112640, help="Dictionary size in bytes")
+    parser.add_argument("--level", type=int, default=3, help="Compression level to check")
+    args = parser.parse_args()
+
+    samples = _load_samples(args.contexts)
+    dictionary = zstandard.train_dictionary(args.size, samples)
+    args.output.write_bytes(dictionary.as_bytes())
+
+    plain = zstandard.ZstdCompressor(level=args.level)
+    trained = zstandard.ZstdCompressor(level=args.level, dict_data=dictionary)
+    total = sum(len(sample) for sample in samples)
+    plain_size = sum(len(plain.compress(sample)) for sample in samples)
+    trained_size = sum(len(trained.compress(sample)) for sample in samples)
+
+    print(f"samples          {len(samples):8d} ({total / 1e6:.2f} MB)")
+    print(f"without dict     {plain_size / total:8.1%}")
+    print(f"with dict        {trained_size / total:8.1%}")
+    print(f"dictionary       {args.output} (id {dictionary.dict_id()})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""
+Compare the fused filter engine against applying each filter on its own.
+
+Random filter chains are applied to a random photo-like image with
+`apply_filters` and with the previous one-PIL-call-per-filter implementation,
+and the pixel differences and timings are reported:
+
+    python scripts/validate_filters.py --size 2048 --chains 50
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+from PIL import Image as PILImage
+from PIL import ImageEnhance, ImageFilter, ImageOps
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+FILTER_TYPES = ["Brightness", "Contrast", "Saturation", "Blur", "Invert", "BlackWhite"]
+
+
+def apply_filter_reference(image: PILImage.Image, filter) -> PILImage.Image:
+    """The per-filter implementation that `apply_filters` replaces."""
+    if filter.type == "Brightness":
+        return ImageEnhance.Brightness(image).enhance(1.0 + filter.brightness)
+    elif filter.type == "Contrast":
+        return ImageEnhance.Contrast(image).enhance(1.0 + filter.contrast)
+    elif filter.type == "Saturation":
+        return ImageEnhance.Color(image).enhance(1.0 + filter.saturation)
+    elif filter.type == "Blur":
+        radius = max(0, abs(filter.blur) * 10)
+        if radius > 0:
+            return image.filter(ImageFilter.GaussianBlur(radius=radius))
+        return image
+    elif filter.type == "Invert":
+        return ImageOps.invert(image.convert("RGB")).convert(image.mode)
+    elif filter.type == "BlackWhite":
+        return image.convert("L").convert("RGB")
+    return image
+
+
+def _create_image(size: int, rng: np.random.Generator) -> PILImage.Image:
+    # Smooth gradients plus noise, closer to a photo than uniform noise
+    y, x = np.mgrid[0:size, 0:size] / size
+    channels = [
+        np.sin(x * 3 + phase) * np.cos(y * 2 - phase) * 90 + 128
+        for phase in (0.0, 1.3, 2.6)
+    ]
+    pixels = np.stack(channels, axis=-1) + rng.normal(0, 12, (size, size, 3))
+    return PILImage.fromarray(np.clip(pixels, 0, 255).astype(np.uint8))
+
+
+def _create_chain(rng: np.random.Generator, max_length: int, with_blur: bool) -> list:
+    from app.core.chat2edit.models.fabric.filters.black_white_filter import (
+        BlackWhiteFilter,
+    )
+    from app.core.chat2edit.models.fabric.filters.blur_filter import BlurFilter
+    from app.core.chat2edit.models.fabric.filters.brightness_filter import (
+        BrightnessFilter,
+    )
+    from app.core.chat2edit.models.fabric.filters.contrast_filter import ContrastFilter
+    from app.core.chat2edit.models.fabric.filters.invert_filter import InvertFilter
+    from app.core.chat2edit.models.fabric.filters.saturation_filter import (
+        SaturationFilter,
+    )
+
+    filter_types = [t for t in FILTER_TYPES if with_blur or t != "Blur"]
+    chain = []
+    for _ in range(rng.integers(1, max_length + 1)):
+        filter_type = filter_types[rng.integers(len(filter_types))]
+        value = round(float(rng.uniform(-0.8, 0.8)), 2)
+        if filter_type == "Brightness":
+            chain.append(BrightnessFilter(brightness=value))
+        elif filter_type == "Contrast":
+            chain.append(ContrastFilter(contrast=value))
+        elif filter_type == "Saturation":
+            chain.append(SaturationFilter(saturation=value))
+        elif filter_type == "Blur":
+            chain.append(BlurFilter(blur=abs(value) / 4))
+        elif filter_type == "Invert":
+            chain.append(InvertFilter())
+        else:
+            chain.append(BlackWhiteFilter())
+    return chain
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--size", type=int, default=1024, help="Image edge in pixels")
+    parser.add_argument("--chains", type=int, default=20)
+    parser.add_argument("--max-length", type=int, default=6)
+    parser.add_argument("--no-blur", action="store_true", help="Point-wise filters only")
+    args = parser.parse_args()
+
+    from app.utils.filter_utils import apply_filters
+
+    rng = np.random.default_rng(0)
+    image = _create_image(args.size, rng)
+
+    reference_time = fused_time = 0.0
+    max_diffs, mean_diffs = [], []
+    for _ in range(args.chains):
+        chain = _create_chain(rng, args.max_length, not args.no_blur)
+
+        start = time.perf_counter()
+        expected = image
+        for filter in chain:
+            expected = apply_filter_reference(expected, filter)
+        reference_time += time.perf_counter() - start
+
+        start = time.perf_counter()
+        actual = apply_filters(image, chain)
+        fused_time += time.perf_counter() - start
+
+        diff = np.abs(
+            np.asarray(expected.convert("RGB"), dtype=np.int16)
+            - np.asarray(actual.convert("RGB"), dtype=np.int16)
+        )
+        max_diffs.append(int(diff.max()))
+        mean_diffs.append(float(diff.mean()))
+
+    print(f"reference  {reference_time / args.chains * 1000:8.1f} ms/chain")
+    print(f"fused      {fused_time / args.chains * 1000:8.1f} ms/chain")
+    print(f"max abs diff   {max(max_diffs)} (median {int(np.median(max_diffs))})")
+    print(f"mean abs diff  {max(mean_diffs):.4f} (worst chain)")
+
+
+if __name__ == "__main__":
+    main()
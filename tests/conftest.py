@@ -0,0 +1,6 @@
+import os
+
+# app.env reads these at import time
+os.environ.setdefault("PORT", "8000")
+os.environ.setdefault("INFERENCE_API_URL", "http://inference.test")
+os.environ.setdefault("STORAGE_API_URL", "http://storage.test")
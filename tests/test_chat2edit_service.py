@@ -0,0 +1,198 @@
+import asyncio
+from functools import partial
+from typing import Any, AsyncIterable, Dict, List, Optional
+
+import httpx
+import pytest
+from chat2edit.models import ChatCycle, Message
+from PIL import Image as PILImage
+
+from app.clients.storage_client import UploadBatch
+from app.core.chat2edit.models import Image
+from app.schemas.chat2edit_schemas import Chat2EditGenerateRequestModel, MessageModel
+from app.services.impl import chat2edit_service_impl
+from app.services.impl.chat2edit_service_impl import Chat2EditServiceImpl
+from app.utils.image_utils import convert_image_to_data_url
+
+
+class FakeStorageClient:
+    """Stores files in memory once `released` is set.
+
+    The first `stream_failures` streamed uploads fail with a retryable error.
+    """
+
+    def __init__(self, stream_failures: int = 0) -> None:
+        self.released = asyncio.Event()
+        self.files: Dict[str, bytes] = {}
+        self.num_stream_attempts = 0
+        self._stream_failures = stream_failures
+
+    async def upload_file(self, file_bytes: bytes, filename: str, compress: bool = False) -> str:
+        await self.released.wait()
+        return self._store(file_bytes)
+
+    async def upload_file_stream(
+        self, chunks: AsyncIterable[bytes], filename: str, compress: bool = False
+    ) -> str:
+        await self.released.wait()
+        file_bytes = b"".join([chunk async for chunk in chunks])
+        self.num_stream_attempts += 1
+        if self.num_stream_attempts <= self._stream_failures:
+            request = httpx.Request("POST", "http://storage.test/files")
+            raise httpx.HTTPStatusError(
+                "503", request=request, response=httpx.Response(503, request=request)
+            )
+        return self._store(file_bytes)
+
+    async def download_file(self, file_id: str) -> bytes:
+        return self.files[file_id]
+
+    def _store(self, file_bytes: bytes) -> str:
+        file_id = f"file-{len(self.files)}"
+        self.files[file_id] = file_bytes
+        return file_id
+
+
+class FakeRedisClient:
+    def __init__(self) -> None:
+        self.events: List[Dict[str, Any]] = []
+
+    async def publish_progress(
+        self,
+        cycle_id: str,
+        event_type: str,
+        message: Optional[str] = None,
+        data: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        self.events.append({"type": event_type, "message": message, "data": data})
+
+
+class FakeQwenClient:
+    def __init__(self) -> None:
+        self.edited_images: List[PILImage.Image] = []
+
+    async def edit_image(self, image: PILImage.Image, text: str) -> PILImage.Image:
+        self.edited_images.append(image)
+        return PILImage.new("RGB", image.size, (255, 0, 0))
+
+
+@pytest.fixture(autouse=True)
+def early_complete(monkeypatch):
+    monkeypatch.setattr(chat2edit_service_impl, "EARLY_COMPLETE_ENABLED", True)
+    monkeypatch.setattr(chat2edit_service_impl, "STORAGE_STREAMING_ENABLED", True)
+    monkeypatch.setattr(chat2edit_service_impl, "IMAGE_PREVIEWS_ENABLED", False)
+
+
+def _create_image() -> Image:
+    return Image.model_validate(
+        {"objects": [{"type": "Image", "src": "data:image/png;base64,AAAA"}]}
+    )
+
+
+async def _complete(storage_client: FakeStorageClient, cycle_id: Optional[str] = "cycle"):
+    redis_client = FakeRedisClient()
+    service = Chat2EditServiceImpl(storage_client, redis_client, None, None)
+    image = _create_image()
+    response = Message(text="Done.", attachments=[image])
+    cycle = ChatCycle(request=Message(text="Edit it."))
+
+    # Files are held back until `released`, so waiting for them would time out
+    result = await asyncio.wait_for(
+        service._complete(cycle_id, cycle, response, {"image": image}), timeout=5
+    )
+    num_files_on_return = len(storage_client.files)
+    events_on_return = list(redis_client.events)
+
+    storage_client.released.set()
+    await service.close()
+    return result, num_files_on_return, events_on_return, redis_client.events
+
+
+def test_early_complete_is_published_before_files_are_stored():
+    storage_client = FakeStorageClient()
+
+    result, num_files_on_return, events_on_return, events = asyncio.run(
+        _complete(storage_client)
+    )
+
+    assert num_files_on_return == 0
+    assert [event["type"] for event in events_on_return] == ["complete"]
+    assert not result.persisted
+    assert result.context_file_id is None
+    assert [attachment.file_id for attachment in result.message.attachments] == [None]
+
+    assert [event["type"] for event in events] == ["complete", "persisted"]
+    complete, persisted = events[0]["data"], events[1]["data"]
+    assert persisted["persisted"]
+    assert persisted["context_file_id"] in storage_client.files
+    assert persisted["message"]["attachments"][0]["file_id"] in storage_client.files
+    # The attachments of both events are matched by filename
+    assert [a["filename"] for a in persisted["message"]["attachments"]] == [
+        a["filename"] for a in complete["message"]["attachments"]
+    ]
+
+
+def test_streamed_context_upload_is_retried_in_the_background():
+    storage_client = FakeStorageClient(stream_failures=2)
+
+    _, _, _, events = asyncio.run(_complete(storage_client))
+
+    assert [event["type"] for event in events] == ["complete", "persisted"]
+    assert storage_client.num_stream_attempts == 3
+    context_file_id = events[1]["data"]["context_file_id"]
+    # Each attempt serializes the whole context again
+    assert storage_client.files[context_file_id].startswith(b'{"image":')
+
+
+def test_failed_storage_is_reported_as_an_error_event(monkeypatch):
+    monkeypatch.setattr(
+        chat2edit_service_impl, "UploadBatch", partial(UploadBatch, max_attempts=1)
+    )
+    storage_client = FakeStorageClient(stream_failures=1)
+
+    _, _, _, events = asyncio.run(_complete(storage_client))
+
+    assert [event["type"] for event in events] == ["complete", "error"]
+
+
+def test_without_a_cycle_id_files_are_stored_before_returning():
+    storage_client = FakeStorageClient()
+    storage_client.released.set()
+
+    result, num_files_on_return, _, events = asyncio.run(
+        _complete(storage_client, cycle_id=None)
+    )
+
+    assert num_files_on_return == 2
+    assert result.persisted
+    assert result.context_file_id in storage_client.files
+    assert events == []
+
+
+def test_qwen_edit_reads_its_image_from_a_lazy_context(monkeypatch):
+    monkeypatch.setattr(chat2edit_service_impl, "LAZY_CONTEXT_ENABLED", True)
+    monkeypatch.setattr(chat2edit_service_impl, "STORAGE_STREAMING_ENABLED", False)
+    storage_client = FakeStorageClient()
+    storage_client.released.set()
+    qwen_client = FakeQwenClient()
+    service = Chat2EditServiceImpl(storage_client, FakeRedisClient(), None, qwen_client)
+
+    src = convert_image_to_data_url(PILImage.new("RGB", (8, 6), (0, 0, 255)))
+    image = Image.model_validate(
+        {
+            "width": 8,
+            "height": 6,
+            "objects": [{"type": "Image", "src": src, "width": 8, "height": 6}],
+        }
+    )
+    context_file_id = storage_client._store(service._dump_context({"count": 1, "image": image}))
+    request = Chat2EditGenerateRequestModel(
+        message=MessageModel(text="Make it red."),
+        context_file_id=context_file_id,
+        use_qwen=True,
+    )
+
+    result = asyncio.run(service.generate(request))
+
+    assert [edited.size for edited in qwen_client.edited_images] == [(8, 6)]
+    assert result.context_file_id in storage_client.files
@@ -0,0 +1,111 @@
+from typing import Optional
+
+import numpy as np
+import pytest
+from PIL import Image as PILImage
+
+from app.core.chat2edit.models import Image, Object
+from app.core.chat2edit.models.fabric.filters.brightness_filter import BrightnessFilter
+from app.utils import filter_utils
+from app.utils.caches import LruCache
+from app.utils.filter_utils import apply_filters
+from app.utils.image_utils import (
+    convert_data_url_to_image,
+    convert_image_to_data_url,
+    get_image_nbytes,
+)
+from scripts.validate_filters import (
+    _create_chain,
+    _create_image,
+    apply_filter_reference,
+)
+
+
+@pytest.mark.parametrize("with_blur", [False, True])
+def test_fused_filters_match_the_per_filter_implementation(with_blur):
+    rng = np.random.default_rng(0)
+    image = _create_image(128, rng)
+
+    for _ in range(50):
+        chain = _create_chain(rng, 8, with_blur)
+        expected = image
+        for filter in chain:
+            expected = apply_filter_reference(expected, filter)
+
+        actual = apply_filters(image, chain)
+
+        assert actual.mode == "RGB"
+        assert np.array_equal(np.asarray(actual), np.asarray(expected.convert("RGB")))
+
+
+def test_unfiltered_images_keep_their_mode():
+    image = _create_image(16, np.random.default_rng(0)).convert("L")
+
+    assert apply_filters(image, []) is image
+
+
+def _create_src(seed: int, size: int = 32) -> str:
+    pixels = np.random.default_rng(seed).integers(0, 255, (size, size, 3), dtype=np.uint8)
+    return convert_image_to_data_url(PILImage.fromarray(pixels))
+
+
+def _create_group(seed: int, nested: Optional[Image] = None) -> Image:
+    objects = [
+        {"type": "Image", "src": _create_src(seed), "width": 32, "height": 32},
+        {"type": "Image", "src": _create_src(seed + 1, 8), "width": 8, "height": 8},
+    ]
+    image = Image.model_validate({"width": 32, "height": 32, "objects": objects})
+    if nested is not None:
+        image.objects.append(nested)
+    return image
+
+
+@pytest.fixture
+def decoded_srcs(monkeypatch):
+    filter_utils._filtered_images.clear()
+    decoded_srcs = []
+
+    def convert_data_url_to_image(src):
+        decoded_srcs.append(src)
+        return original(src)
+
+    original = filter_utils.convert_data_url_to_image
+    monkeypatch.setattr(filter_utils, "convert_data_url_to_image", convert_data_url_to_image)
+    return decoded_srcs
+
+
+def test_entity_filters_are_applied_to_the_entity_pixels_and_cached(decoded_srcs):
+    nested = _create_group(10)
+    image = _create_group(0, nested)
+    brightness = BrightnessFilter(brightness=0.4)
+    image.apply_filter(brightness)
+
+    entities = [image.objects[0], image.objects[1], nested.objects[0], nested.objects[1]]
+    for entity in entities:
+        expected = apply_filters(convert_data_url_to_image(entity.src), [brightness])
+        assert np.array_equal(np.asarray(entity.get_image()), np.asarray(expected))
+    assert np.array_equal(np.asarray(nested.get_image()), np.asarray(nested.objects[0].get_image()))
+
+    assert len(decoded_srcs) == len(entities)
+
+
+def test_filtered_images_are_keyed_by_source_content(decoded_srcs):
+    first, second = Object(src=_create_src(0)), Object(src=_create_src(0))
+
+    first.get_image()
+    second.get_image()
+
+    assert len(decoded_srcs) == 1
+    assert len(filter_utils._filtered_images) == 1
+    assert all(len(key[0]) == 32 for key in filter_utils._filtered_images._entries)
+
+
+def test_filtered_images_stay_within_their_byte_budget(decoded_srcs, monkeypatch):
+    cache = LruCache(max_bytes=3 * 32 * 32 * 3, get_size=get_image_nbytes)
+    monkeypatch.setattr(filter_utils, "_filtered_images", cache)
+
+    for seed in range(6):
+        Object(src=_create_src(seed)).get_image()
+
+    assert len(cache) == 3
+    assert cache.bytes == 3 * 32 * 32 * 3
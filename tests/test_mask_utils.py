@@ -0,0 +1,47 @@
+import numpy as np
+from PIL import Image as PILImage
+
+from app.core.chat2edit.models import Object
+from app.core.chat2edit.utils import mask_utils
+from app.core.chat2edit.utils.mask_utils import get_packed_mask
+from app.utils.caches import LruCache
+from app.utils.image_utils import convert_image_to_data_url
+
+
+def _create_object(seed: int, size: int = 32) -> Object:
+    rng = np.random.default_rng(seed)
+    pixels = rng.integers(0, 255, (size, size, 4), dtype=np.uint8)
+    pixels[..., 3] = np.where(rng.random((size, size)) < 0.5, 255, 0)
+    src = convert_image_to_data_url(PILImage.fromarray(pixels, "RGBA"))
+    return Object(src=src, width=size, height=size)
+
+
+def test_packed_masks_count_the_opaque_pixels():
+    obj = _create_object(0)
+    mask_utils._packed_masks.clear()
+
+    mask = get_packed_mask(obj)
+
+    alpha = np.asarray(obj.get_image().getchannel("A"))
+    assert mask.count == int((alpha > 0).sum())
+
+
+def test_packed_masks_are_keyed_by_source_content():
+    first, second = _create_object(0), _create_object(0)
+    mask_utils._packed_masks.clear()
+
+    assert get_packed_mask(first) is get_packed_mask(second)
+    assert len(mask_utils._packed_masks) == 1
+    assert all(len(key[0]) == 32 for key in mask_utils._packed_masks._entries)
+
+
+def test_packed_masks_stay_within_their_byte_budget(monkeypatch):
+    mask_nbytes = get_packed_mask(_create_object(0)).bits.nbytes
+    cache = LruCache(max_bytes=3 * mask_nbytes, get_size=lambda mask: mask.bits.nbytes)
+    monkeypatch.setattr(mask_utils, "_packed_masks", cache)
+
+    for seed in range(6):
+        get_packed_mask(_create_object(seed))
+
+    assert len(cache) == 3
+    assert cache.bytes == 3 * mask_nbytes
@@ -0,0 +1,202 @@
+import asyncio
+from typing import Any, Dict, List, Optional, Tuple
+
+import pytest
+from chat2edit.execution.strategies import DefaultExecutionStrategy
+from chat2edit.models import ChatCycle, Message
+
+from app.core.chat2edit.llms import StreamingLlm
+from app.core.chat2edit.mic2e_chat2edit import Mic2eChat2Edit, _CommandStreamParser
+from app.core.chat2edit.mic2e_context_strategy import Mic2eContextStrategy
+from app.core.chat2edit.mic2e_execution_strategy import Mic2eExecutionStrategy
+
+parse = DefaultExecutionStrategy().parse
+
+
+class FakeStreamingLlm(StreamingLlm):
+    """Answers prompts with canned texts, streamed in chunks of `chunk_size`.
+
+    An answer that is an exception is raised after streaming its `args[1]`.
+    """
+
+    def __init__(self, answers: List[Any], chunk_size: int = 7) -> None:
+        self._answers = list(answers)
+        self._chunk_size = chunk_size
+        self.num_calls = 0
+
+    async def generate(
+        self, prompt: Message, history: List[Tuple[Message, Message]]
+    ) -> Message:
+        text = ""
+        async for delta in self.stream(prompt, history):
+            text += delta
+        return Message(text=text)
+
+    async def stream(self, prompt: Message, history: List[Tuple[Message, Message]]):
+        answer = self._answers[self.num_calls]
+        self.num_calls += 1
+
+        text = answer.args[1] if isinstance(answer, Exception) else answer
+        for i in range(0, len(text), self._chunk_size):
+            yield text[i : i + self._chunk_size]
+            await asyncio.sleep(0)
+
+        if isinstance(answer, Exception):
+            raise answer
+
+    def get_info(self) -> Dict[str, Any]:
+        return {"model": "fake"}
+
+
+def _create_answer(code: str) -> str:
+    return f"thinking: Compute it.\ncommands:\n```python\n{code}\n```"
+
+
+def _feed(parser: _CommandStreamParser, text: str, chunk_size: int) -> List[str]:
+    statements = []
+    for i in range(0, len(text), chunk_size):
+        statements.extend(parser.feed(text[i : i + chunk_size]))
+    return statements
+
+
+def _describe_cycle(chat_cycle: ChatCycle) -> List[List[tuple]]:
+    return [
+        [
+            (
+                block.generated_code,
+                block.executed,
+                getattr(block.feedback, "type", None),
+                block.response.text if block.response else None,
+                block.error is not None,
+            )
+            for block in prompt_cycle.blocks
+        ]
+        for prompt_cycle in chat_cycle.cycles
+    ]
+
+
+async def _generate(
+    answers: List[Any], stream: bool
+) -> Tuple[Optional[Message], ChatCycle, Dict[str, Any], FakeStreamingLlm]:
+    llm = FakeStreamingLlm(answers)
+    chat2edit = Mic2eChat2Edit(
+        llm=llm,
+        context_strategy=Mic2eContextStrategy(),
+        execution_strategy=Mic2eExecutionStrategy(),
+        stream=stream,
+    )
+    response, chat_cycle, context = await chat2edit.generate(
+        Message(text="What is 6 times 7?")
+    )
+    return response, chat_cycle, context, llm
+
+
+def test_parser_holds_back_the_last_statement_until_the_block_closes():
+    parser = _CommandStreamParser(parse)
+
+    assert parser.feed("thinking: Add.\ncommands:\n```python\na = 1\n") == []
+    assert parser.feed("b = a + 1\n") == ["a = 1"]
+    assert parser.feed("```") == ["b = a + 1"]
+    assert parser.close() == []
+
+
+def test_parser_waits_for_statements_spanning_lines():
+    parser = _CommandStreamParser(parse)
+
+    assert parser.feed("commands:\n```python\nx = max(\n") == []
+    assert parser.feed("    1,\n") == []
+    assert parser.feed("    2,\n)\ny = x\n") == ["x = max(1, 2)"]
+    assert parser.close() == ["y = x"]
+
+
+def test_parser_ignores_incomplete_lines():
+    parser = _CommandStreamParser(parse)
+
+    assert parser.feed("commands:\n```python\na = 1\nb = 2\nc = a +") == ["a = 1"]
+    assert parser.feed(" b\n```") == ["b = 2", "c = a + b"]
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 5, 11, 1000])
+def test_parser_handles_markers_split_across_chunks(chunk_size):
+    code = 'a = 1\nfor i in range(3):\n    a += i\nrespond_to_user(f"{a}")'
+    answer = "thinking: Loop.\n```python\nignored = 1\n```\n" + _create_answer(code)
+    parser = _CommandStreamParser(parse)
+
+    statements = _feed(parser, answer, chunk_size) + parser.close()
+
+    assert statements == parse(code)
+
+
+def test_parser_only_reads_the_last_commands_block():
+    parser = _CommandStreamParser(parse)
+    text = "thinking: Use `commands:`\n```python\nwrong = 1\n```\n"
+
+    assert parser.feed(text) == ["wrong = 1"]
+    assert parser.feed(_create_answer("right = 1")) == ["right = 1"]
+
+
+def test_parser_close_emits_statements_of_an_unclosed_block():
+    parser = _CommandStreamParser(parse)
+
+    assert parser.feed("commands:\n```python\na = 1\nb = 2") == []
+    assert parser.close() == ["a = 1", "b = 2"]
+
+
+def test_parser_ignores_answers_without_commands():
+    parser = _CommandStreamParser(parse)
+
+    assert parser.feed("thinking: Nothing to do.\n") == []
+    assert parser.close() == []
+
+
+@pytest.mark.parametrize(
+    "answers",
+    [
+        [_create_answer('result = 6 * 7\nrespond_to_user(f"{result}")')],
+        [
+            _create_answer("result = 6 * 7"),
+            _create_answer('respond_to_user(f"{result}")'),
+        ],
+        [
+            _create_answer('result = 6 * 7\nrespond_to_user(f"{result}")\nextra = 1'),
+        ],
+        [
+            _create_answer("result = 6 * undefined\nother = 1"),
+            _create_answer('respond_to_user("7")'),
+        ],
+        ["thinking: No commands.", _create_answer('respond_to_user("42")')],
+    ],
+)
+def test_streaming_records_the_same_cycle_as_the_base_class(answers):
+    streamed = asyncio.run(_generate(answers, stream=True))
+    generated = asyncio.run(_generate(answers, stream=False))
+
+    assert _describe_cycle(streamed[1]) == _describe_cycle(generated[1])
+    assert [len(cycle.exchanges) for cycle in streamed[1].cycles] == [
+        len(cycle.exchanges) for cycle in generated[1].cycles
+    ]
+    assert (streamed[0] and streamed[0].text) == (generated[0] and generated[0].text)
+    assert streamed[3].num_calls == generated[3].num_calls
+
+
+def test_stream_error_ends_the_cycle():
+    answer = _create_answer('a = 1\nb = 2\nrespond_to_user("done")')
+    partial_answer = answer[: answer.index("respond_to_user")]
+    answers = [
+        RuntimeError("Stream interrupted", partial_answer),
+        _create_answer('respond_to_user("retried")'),
+    ]
+
+    response, chat_cycle, context, llm = asyncio.run(_generate(answers, stream=True))
+
+    assert llm.num_calls == 1
+    assert response is None
+    assert len(chat_cycle.cycles) == 1
+
+    prompt_cycle = chat_cycle.cycles[0]
+    assert prompt_cycle.exchanges[-1].error is not None
+    # Statements complete before the error ran; held back ones are not run
+    assert [block.generated_code for block in prompt_cycle.blocks] == ["a = 1"]
+    assert prompt_cycle.blocks[0].executed
+    assert context["a"] == 1
+    assert "b" not in context
@@ -0,0 +1,132 @@
+import threading
+
+import numpy as np
+import pytest
+from PIL import Image as PILImage
+
+from app.core.chat2edit.models import Image
+from app.core.chat2edit.utils.render_utils import ImageRenderer
+from app.utils.caches import LruCache
+from app.utils.image_utils import convert_image_to_data_url, get_image_nbytes
+
+
+def _create_pil_image(size: int, seed: int, mode: str = "RGB") -> PILImage.Image:
+    rng = np.random.default_rng(seed)
+    channels = len(mode)
+    return PILImage.fromarray(
+        rng.integers(0, 255, (size, size, channels), dtype=np.uint8), mode
+    )
+
+
+def _create_image(size: int = 128, num_objects: int = 3, seed: int = 0) -> Image:
+    objects = [
+        {
+            "type": "Image",
+            "src": convert_image_to_data_url(_create_pil_image(size, seed)),
+            "width": size,
+            "height": size,
+        }
+    ]
+    for i in range(num_objects):
+        objects.append(
+            {
+                "type": "Image",
+                "src": convert_image_to_data_url(
+                    _create_pil_image(16, seed * 100 + i + 1, "RGBA")
+                ),
+                "width": 16,
+                "height": 16,
+                "left": i * 12 - 20,
+                "top": i * 6 - 10,
+                "angle": i * 15,
+            }
+        )
+    return Image.model_validate({"width": size, "height": size, "objects": objects})
+
+
+def test_lru_cache_evicts_by_total_size():
+    cache: LruCache[bytes] = LruCache(max_bytes=10, get_size=len)
+
+    cache.set("a", b"1234")
+    cache.set("b", b"5678")
+    cache.get("a")
+    cache.set("c", b"90ab")
+
+    assert "b" not in cache
+    assert "a" in cache and "c" in cache
+    assert cache.bytes == 8
+
+
+def test_lru_cache_skips_values_larger_than_max_bytes():
+    cache: LruCache[bytes] = LruCache(max_bytes=4, get_size=len)
+
+    cache.set("a", b"12")
+    cache.set("b", b"123456")
+
+    assert "b" not in cache
+    assert cache.bytes == 2
+
+
+def test_lru_cache_requires_get_size_with_max_bytes():
+    with pytest.raises(ValueError):
+        LruCache(max_bytes=4)
+
+
+def test_renderer_caches_stay_within_their_byte_budgets():
+    max_layer_bytes = 3 * get_image_nbytes(_create_pil_image(128, 0, "RGBA"))
+    max_render_bytes = 2 * max_layer_bytes
+    renderer = ImageRenderer(
+        max_layer_bytes=max_layer_bytes, max_render_bytes=max_render_bytes
+    )
+
+    for seed in range(6):
+        renderer.render(_create_image(seed=seed))
+
+    assert 0 < renderer._layers.bytes <= max_layer_bytes
+    assert 0 < renderer._renders.bytes <= max_render_bytes
+
+
+def test_recomposited_render_matches_a_full_render():
+    image = _create_image()
+    renderer = ImageRenderer()
+    renderer.render(image)
+
+    image.objects[2].left += 7
+    image.objects[3].angle += 30
+    recomposited = renderer.render(image)
+    rendered = ImageRenderer().render(image)
+
+    assert np.array_equal(np.asarray(recomposited), np.asarray(rendered))
+
+
+def test_layers_are_keyed_by_source_content():
+    image = _create_image()
+    renderer = ImageRenderer()
+    before = renderer.render(image)
+
+    # Same size and geometry, different pixels
+    image.objects[1].src = convert_image_to_data_url(_create_pil_image(16, 999, "RGBA"))
+    after = renderer.render(image)
+
+    assert not np.array_equal(np.asarray(before), np.asarray(after))
+    assert np.array_equal(np.asarray(after), np.asarray(ImageRenderer().render(image)))
+
+
+def test_concurrent_renders_match_serial_renders():
+    images = [_create_image(seed=seed) for seed in range(4)]
+    expected = [np.asarray(ImageRenderer().render(image)) for image in images]
+    renderer = ImageRenderer()
+    results = [None] * len(images) * 2
+
+    def render(index: int) -> None:
+        results[index] = np.asarray(renderer.render(images[index % len(images)]))
+
+    threads = [threading.Thread(target=render, args=(i,)) for i in range(len(results))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    for i, result in enumerate(results):
+        assert np.array_equal(result, expected[i % len(images)])
+    assert renderer._image_locks == {}
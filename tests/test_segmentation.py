@@ -0,0 +1,157 @@
+import asyncio
+
+import httpx
+import numpy as np
+import pytest
+from PIL import Image as PILImage
+
+from app.clients.inference_client import inference_client
+from app.core.chat2edit.functions.segment_object import segment_object
+from app.core.chat2edit.functions.segment_objects import segment_objects
+from app.core.chat2edit.models import Box, Image
+from app.utils.image_utils import convert_image_to_data_url
+from scripts.fake_inference_server import app as fake_inference_app
+
+IMAGE_SIZE = 256
+PROMPTS = ["cat", "dog", "bird", "red car"]
+
+
+@pytest.fixture(autouse=True)
+def fake_inference(monkeypatch):
+    """Route the inference client to the fake inference server, in-process."""
+    fake_inference_app.state.request_latency = 0
+    fake_inference_app.state.prompt_latency = 0
+    monkeypatch.setattr(
+        inference_client,
+        "_client",
+        httpx.AsyncClient(transport=httpx.ASGITransport(app=fake_inference_app)),
+    )
+    return fake_inference_app
+
+
+def _create_image() -> Image:
+    rng = np.random.default_rng(0)
+    pil_image = PILImage.fromarray(
+        rng.integers(0, 255, (IMAGE_SIZE, IMAGE_SIZE, 3), dtype=np.uint8)
+    )
+    return Image.model_validate(
+        {
+            "width": IMAGE_SIZE,
+            "height": IMAGE_SIZE,
+            "objects": [
+                {
+                    "type": "Image",
+                    "src": convert_image_to_data_url(pil_image),
+                    "width": IMAGE_SIZE,
+                    "height": IMAGE_SIZE,
+                }
+            ],
+        }
+    )
+
+
+def _create_boxes():
+    return [
+        Box(left=-100 + i * 40, top=-90 + i * 30, width=30 + i * 10, height=40)
+        for i in range(4)
+    ]
+
+
+def _describe(obj):
+    return (obj.left, obj.top, obj.width, obj.height, obj.src)
+
+
+def _describe_groups(grouped_objects):
+    return [[_describe(obj) for obj in objects] for objects in grouped_objects]
+
+
+async def _segment_objects_one_by_one(image, prompts):
+    grouped_objects = []
+    for prompt in prompts:
+        objects = await segment_objects(image, prompt, 1)
+        grouped_objects.append(objects)
+    return grouped_objects
+
+
+async def _segment_object_one_by_one(image, boxes):
+    objects = []
+    for box in boxes:
+        obj = await segment_object(image, box=box)
+        objects.append(obj)
+    return objects
+
+
+def test_segment_objects_batched_returns_one_group_per_prompt():
+    async def run():
+        grouped_objects = await segment_objects(_create_image(), PROMPTS, 1)
+        return grouped_objects
+
+    grouped_objects = asyncio.run(run())
+
+    assert len(grouped_objects) == len(PROMPTS)
+    assert all(len(objects) > 0 for objects in grouped_objects)
+
+
+def test_segment_objects_batched_matches_one_by_one_in_order():
+    async def run():
+        batched = await segment_objects(_create_image(), PROMPTS, 1)
+        reversed_batched = await segment_objects(_create_image(), PROMPTS[::-1], 1)
+        one_by_one = await _segment_objects_one_by_one(_create_image(), PROMPTS)
+        return batched, reversed_batched, one_by_one
+
+    batched, reversed_batched, one_by_one = asyncio.run(run())
+
+    assert _describe_groups(batched) == _describe_groups(one_by_one)
+    assert _describe_groups(reversed_batched) == _describe_groups(one_by_one)[::-1]
+
+
+def test_segment_objects_batched_uploads_image_once(fake_inference):
+    async def run():
+        grouped_objects = await segment_objects(_create_image(), PROMPTS, 1)
+        return grouped_objects
+
+    request_count = fake_inference.state.request_count
+    asyncio.run(run())
+
+    assert fake_inference.state.request_count - request_count == 1
+
+
+def test_segment_objects_batched_accepts_quantity_per_prompt():
+    async def run():
+        grouped_objects = await segment_objects(
+            _create_image(), PROMPTS, [1] * len(PROMPTS)
+        )
+        return grouped_objects
+
+    assert len(asyncio.run(run())) == len(PROMPTS)
+
+
+def test_segment_object_batched_returns_one_object_per_box():
+    boxes = _create_boxes()
+
+    async def run():
+        objects = await segment_object(_create_image(), box=boxes)
+        return objects
+
+    objects = asyncio.run(run())
+
+    assert len(objects) == len(boxes)
+
+
+def test_segment_object_batched_matches_one_by_one_in_order():
+    boxes = _create_boxes()
+
+    async def run():
+        batched = await segment_object(_create_image(), box=boxes)
+        reversed_batched = await segment_object(_create_image(), box=boxes[::-1])
+        one_by_one = await _segment_object_one_by_one(_create_image(), boxes)
+        return batched, reversed_batched, one_by_one
+
+    batched, reversed_batched, one_by_one = asyncio.run(run())
+
+    assert [_describe(obj) for obj in batched] == [
+        _describe(obj) for obj in one_by_one
+    ]
+    assert [_describe(obj) for obj in reversed_batched] == [
+        _describe(obj) for obj in one_by_one[::-1]
+    ]